@@ -0,0 +1,212 @@
+# benchmarks/bench_core.py
+"""
+Benchmark tahap inti LeafHealthAI pada daun sintetis (src.utils.synthetic).
+
+    python -m benchmarks.bench_core [--resolutions 640x480,1280x960,4000x3000]
+                                    [--images 20] [--compare reports/bench_<sha>.json]
+
+Untuk tiap resolusi & tahap: latensi p50/p99, throughput (citra/detik) dan
+puncak alokasi memori (tracemalloc). Hasil disimpan sebagai JSON di reports/
+(nama berisi hash commit) agar bisa dibandingkan antar commit; --compare
+menandai tahap yang melambat melebihi --threshold (exit code 1).
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+from src.core.classifier import classify_condition
+from src.core.feature_extraction import extract_features
+from src.core.lesion_detection import detect_lesions
+from src.core.multileaf import analyze_leaves
+from src.core.pipeline import ANALYSIS_SIZE, LeafPipeline, analyze_leaf, resize_for_analysis
+from src.core.segmentation import segment_leaf
+from src.core.tiled import analyze_leaf_highres
+from src.core.workspace import Workspace
+from src.utils.helpers import load_image
+from src.utils.synthetic import BACKGROUNDS, make_leaf, make_tray
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPORTS_DIR = os.path.join(ROOT, 'reports')
+
+
+def git_commit():
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, timeout=10)
+        return out.stdout.strip() or 'unknown'
+    except Exception:
+        return 'unknown'
+
+
+def make_corpus(width, height, n_images, n_lesions):
+    """Daun sintetis bervariasi (latar, warna & bentuk lesi) — deterministik per seed."""
+    corpus = []
+    for seed in range(n_images):
+        img, _ = make_leaf(width, height, n_lesions, background=BACKGROUNDS[seed % len(BACKGROUNDS)],
+                           lesion_color='dark' if seed % 3 == 0 else 'brown', irregular=seed % 2 == 1, seed=seed)
+        corpus.append(img)
+    return corpus
+
+
+def stage_inputs(img):
+    """Input tiap tahap dihitung sekali di luar pengukuran (satu tahap diukur terisolasi)."""
+    hsv = cv2.cvtColor(img, cv2.COLOR_RGB2HSV)
+    leaf_mask, _, _ = segment_leaf(img, hsv=hsv, draw_overlay=False)
+    lesion_mask, lesions, _ = detect_lesions(img, leaf_mask, hsv=hsv, draw_overlay=False)
+    features = extract_features(img, leaf_mask, lesion_mask, lesions, hsv=hsv)
+    return {'img': img, 'hsv': hsv, 'leaf_mask': leaf_mask, 'lesion_mask': lesion_mask,
+            'lesions': lesions, 'features': features}
+
+
+def build_stages():
+    """Tahap → fungsi(x) dengan x = dict stage_inputs (+ 'path' file JPEG)."""
+    workspace = Workspace()  # end_to_end_ws: arena dipakai ulang seperti di worker batch
+    pipeline = LeafPipeline(workspace=workspace)
+    resized = (ANALYSIS_SIZE[1], ANALYSIS_SIZE[0], 3)
+    return {
+        'decode_full': lambda x: load_image(x['path']),
+        'decode_reduced': lambda x: load_image(x['path'], target_size=ANALYSIS_SIZE),
+        'resize': lambda x: resize_for_analysis(x['img']),
+        'hsv': lambda x: cv2.cvtColor(x['img'], cv2.COLOR_RGB2HSV),
+        'segment': lambda x: segment_leaf(x['img'], hsv=x['hsv'], draw_overlay=False),
+        'lesions': lambda x: detect_lesions(x['img'], x['leaf_mask'], hsv=x['hsv'], draw_overlay=False),
+        'features': lambda x: extract_features(x['img'], x['leaf_mask'], x['lesion_mask'], x['lesions'], hsv=x['hsv']),
+        'classify': lambda x: classify_condition(x['features']),
+        'end_to_end': lambda x: analyze_leaf(resize_for_analysis(load_image(x['path'], target_size=ANALYSIS_SIZE))),
+        'end_to_end_ws': lambda x: pipeline.run(resize_for_analysis(
+            load_image(x['path'], target_size=ANALYSIS_SIZE), out=workspace.get('resized', resized))),
+        'highres': lambda x: analyze_leaf_highres(x['img']),
+        # Nampan 20 daun (5×4) seukuran bingkai yang sama — bandingkan dengan end_to_end
+        'multi_leaf_tray': lambda x: analyze_leaves(x['tray']),
+    }
+
+
+def measure(fn, inputs, repeat):
+    """Latensi per panggilan (ms) setelah satu putaran pemanasan; puncak alokasi dari satu panggilan terpisah."""
+    for x in inputs[:2]:
+        fn(x)
+    latencies = []
+    for _ in range(repeat):
+        for x in inputs:
+            t0 = time.perf_counter()
+            fn(x)
+            latencies.append((time.perf_counter() - t0) * 1000.0)
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    fn(inputs[0])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    lat = np.array(latencies)
+    return {
+        'n': int(lat.size),
+        'mean_ms': float(lat.mean()),
+        'p50_ms': float(np.percentile(lat, 50)),
+        'p99_ms': float(np.percentile(lat, 99)),
+        'throughput_ips': float(1000.0 / lat.mean()) if lat.mean() > 0 else 0.0,
+        'peak_alloc_bytes': int(peak),
+    }
+
+
+def run(resolutions, n_images, n_lesions, repeat, stages=None):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for width, height in resolutions:
+            corpus = make_corpus(width, height, n_images, n_lesions)
+            inputs = []
+            for i, img in enumerate(corpus):
+                path = os.path.join(tmp, f"leaf_{width}x{height}_{i}.jpg")
+                cv2.imwrite(path, cv2.cvtColor(img, cv2.COLOR_RGB2BGR), [cv2.IMWRITE_JPEG_QUALITY, 92])
+                inputs.append({**stage_inputs(img), 'path': path, 'tray': make_tray(width, height, seed=i)[0]})
+
+            for name, fn in build_stages().items():
+                if stages and name not in stages:
+                    continue
+                if name == 'highres' and width * height <= ANALYSIS_SIZE[0] * ANALYSIS_SIZE[1]:
+                    continue
+                key = f"{name}@{width}x{height}"
+                results[key] = measure(fn, inputs, repeat)
+                r = results[key]
+                print(f"{key:<28} p50 {r['p50_ms']:9.2f} ms  p99 {r['p99_ms']:9.2f} ms  "
+                      f"{r['throughput_ips']:9.1f} img/s  peak {r['peak_alloc_bytes'] / 2**20:7.1f} MiB")
+    return results
+
+
+def compare(current, baseline, threshold):
+    """Cetak rasio p50 terhadap baseline; kembalikan daftar tahap yang regresi."""
+    regressions = []
+    print(f"\nPerbandingan vs {baseline['meta'].get('commit', '?')} (ambang {threshold:.0%}):")
+    for key, r in current['results'].items():
+        old = baseline['results'].get(key)
+        if not old or old['p50_ms'] <= 0:
+            continue
+        ratio = r['p50_ms'] / old['p50_ms']
+        # Selisih < 0.05 ms diabaikan (tahap yang sangat cepat didominasi noise pengukuran)
+        flag = '  ← REGRESI' if ratio > 1 + threshold and r['p50_ms'] - old['p50_ms'] > 0.05 else ''
+        print(f"{key:<28} {old['p50_ms']:9.2f} → {r['p50_ms']:9.2f} ms  ×{ratio:5.2f}{flag}")
+        if flag:
+            regressions.append(key)
+    return regressions
+
+
+def parse_resolutions(text):
+    return [tuple(int(v) for v in item.lower().split('x')) for item in text.split(',') if item]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.bench_core', description='Benchmark tahap inti LeafHealthAI')
+    parser.add_argument('--resolutions', default='640x480,1280x960,4000x3000', type=parse_resolutions)
+    parser.add_argument('--images', type=int, default=12, help='Jumlah daun sintetis per resolusi')
+    parser.add_argument('--lesions', type=int, default=10, help='Jumlah bercak per daun')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--stages', help='Subset tahap dipisah koma (default: semua)')
+    parser.add_argument('-o', '--output', help='File JSON hasil (default: reports/bench_<commit>.json)')
+    parser.add_argument('--compare', help='JSON benchmark sebelumnya sebagai baseline')
+    parser.add_argument('--threshold', type=float, default=0.15, help='Ambang regresi p50 (default 0.15 = 15%%)')
+    args = parser.parse_args(argv)
+
+    commit = git_commit()
+    results = run(args.resolutions, args.images, args.lesions, args.repeat,
+                  set(args.stages.split(',')) if args.stages else None)
+    report = {
+        'meta': {
+            'commit': commit,
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'opencv': cv2.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'images': args.images,
+            'lesions': args.lesions,
+            'repeat': args.repeat,
+        },
+        'results': results,
+    }
+    output = args.output or os.path.join(REPORTS_DIR, f"bench_{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"✓ Disimpan → {output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        if regressions:
+            print(f"✗ {len(regressions)} tahap regresi.")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,125 @@
+# benchmarks/bench_server.py
+"""
+Uji beban layanan HTTP (src/server.py) dengan klien lokal saja.
+
+    python -m benchmarks.bench_server [--url http://127.0.0.1:8765] [--clients 8]
+                                      [--requests 400] [--size 1280x960] [-j N]
+
+Tanpa --url, server dijalankan di proses ini pada port bebas. Klien (thread, koneksi
+keep-alive) mengirim JPEG daun sintetis secepatnya; dicetak citra/detik, latensi
+p50/p95/p99 dari sisi klien, serta isi /metrics server (ukuran batch rata-rata, dst.).
+"""
+import argparse
+import http.client
+import json
+import sys
+import threading
+import time
+from urllib.parse import urlparse
+
+import cv2
+import numpy as np
+
+from src.server import DiagnosisServer
+from src.utils.synthetic import BACKGROUNDS, make_leaf
+
+
+def make_payloads(width, height, n=8):
+    payloads = []
+    for seed in range(n):
+        img, _ = make_leaf(width, height, background=BACKGROUNDS[seed % len(BACKGROUNDS)],
+                           irregular=seed % 2 == 1, seed=seed)
+        ok, buf = cv2.imencode('.jpg', cv2.cvtColor(img, cv2.COLOR_RGB2BGR), [cv2.IMWRITE_JPEG_QUALITY, 90])
+        payloads.append(buf.tobytes())
+    return payloads
+
+
+def _client(host, port, payloads, counter, lock, latencies, errors):
+    conn = http.client.HTTPConnection(host, port, timeout=120)
+    i = 0
+    while True:
+        with lock:
+            if counter[0] <= 0:
+                break
+            counter[0] -= 1
+        body = payloads[i % len(payloads)]
+        i += 1
+        t0 = time.perf_counter()
+        try:
+            conn.request('POST', '/analyze', body=body, headers={'Content-Type': 'image/jpeg'})
+            response = conn.getresponse()
+            data = response.read()
+        except OSError as e:
+            errors.append(type(e).__name__)
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=120)
+            continue
+        latencies.append((time.perf_counter() - t0) * 1000.0)
+        if response.status != 200 or 'label' not in json.loads(data):
+            errors.append(response.status)
+    conn.close()
+
+
+def run(host, port, payloads, clients, n_requests):
+    counter, lock = [n_requests], threading.Lock()
+    latencies, errors = [], []
+    threads = [threading.Thread(target=_client, args=(host, port, payloads, counter, lock, latencies, errors))
+               for _ in range(clients)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+    lat = np.array(latencies)
+    return {
+        'requests': int(lat.size),
+        'errors': len(errors),
+        'images_per_second': lat.size / elapsed,
+        'p50_ms': float(np.percentile(lat, 50)),
+        'p95_ms': float(np.percentile(lat, 95)),
+        'p99_ms': float(np.percentile(lat, 99)),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.bench_server', description='Uji beban layanan HTTP')
+    parser.add_argument('--url', help='Server yang sudah berjalan (default: jalankan server lokal di proses ini)')
+    parser.add_argument('--clients', type=int, default=8, help='Jumlah klien bersamaan')
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--size', default='1280x960', help='Resolusi JPEG yang dikirim')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='Worker server lokal (default: jumlah core)')
+    parser.add_argument('--max-batch', type=int, default=8)
+    args = parser.parse_args(argv)
+
+    width, height = (int(v) for v in args.size.lower().split('x'))
+    payloads = make_payloads(width, height)
+    server = None
+    if args.url:
+        url = urlparse(args.url)
+        host, port = url.hostname, url.port or 80
+    else:
+        server = DiagnosisServer(('127.0.0.1', 0), args.workers, max_batch=args.max_batch)
+        host, port = server.server_address[:2]
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    try:
+        run(host, port, payloads, args.clients, args.clients * 2)  # pemanasan koneksi & worker
+        r = run(host, port, payloads, args.clients, args.requests)
+        conn = http.client.HTTPConnection(host, port, timeout=10)
+        conn.request('GET', '/metrics')
+        metrics = json.loads(conn.getresponse().read())
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+    print(f"{r['requests']} request, {args.clients} klien: {r['images_per_second']:.1f} img/s  "
+          f"p50 {r['p50_ms']:.1f} ms  p95 {r['p95_ms']:.1f} ms  p99 {r['p99_ms']:.1f} ms  error {r['errors']}")
+    print(f"server: {metrics['workers']} worker, batch rata-rata {metrics['avg_batch_size']}, "
+          f"{metrics['batches']} batch, overloaded {metrics['overloaded']}")
+    return 1 if r['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,83 @@
+# benchmarks/check_imports.py
+"""
+Penjaga waktu impor & dependensi jalur headless (worker batch/tuning, CLI).
+
+    python -m benchmarks.check_imports [--budget-ms 60] [--runs 5]
+
+Tiap modul diimpor di interpreter baru (cold start). Gagal (exit code 1) bila:
+  • modul memuat stack GUI/laporan (tkinter, ttkbootstrap, PIL, reportlab), atau
+  • median waktu impor melebihi impor `numpy` + `cv2` saja ditambah --budget-ms.
+Pemeriksaan dependensi juga dijalankan pytest (tests/test_imports.py); anggaran waktu hanya di sini.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Entry point headless + modul GUI yang harus bisa diimpor tanpa Tk (dipakai thread/worker & uji)
+HEADLESS_MODULES = ('src.core', 'src.batch', 'src.tuning', 'src.server', 'src.watch', 'src.video',
+                    'src.feature_store', 'src.store', 'src.gui.scheduler', 'src.gui.preview')
+FORBIDDEN = ('tkinter', 'ttkbootstrap', 'PIL', 'reportlab')
+
+_PROBE = """
+import sys, time, json
+t0 = time.perf_counter()
+import {module}
+ms = (time.perf_counter() - t0) * 1000.0
+print(json.dumps({{'ms': ms, 'modules': sorted({{m.split('.')[0] for m in sys.modules}})}}))
+"""
+
+
+def probe(module, runs):
+    """Median waktu impor (ms) di interpreter baru & daftar paket tingkat atas yang termuat."""
+    times, modules = [], []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, '-c', _PROBE.format(module=module)], cwd=ROOT,
+                             capture_output=True, text=True)
+        if out.returncode != 0:
+            raise RuntimeError(out.stderr.strip().splitlines()[-1] if out.stderr.strip() else 'gagal impor')
+        data = json.loads(out.stdout.strip().splitlines()[-1])
+        times.append(data['ms'])
+        modules = data['modules']
+    return statistics.median(times), modules
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.check_imports', description=__doc__.split('\n')[1])
+    parser.add_argument('--budget-ms', type=float, default=60.0,
+                        help='Waktu impor maksimum di atas numpy+cv2 (default 60 ms)')
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    base_ms, _ = probe('numpy, cv2', args.runs)  # RuntimeError di sini = lingkungan rusak, biarkan naik
+    print(f"{'numpy + cv2':<18} {base_ms:8.1f} ms (acuan)")
+    failures = []
+    for module in HEADLESS_MODULES:
+        try:
+            ms, modules = probe(module, args.runs)
+        except RuntimeError as e:
+            failures.append(f"{module} gagal diimpor: {e}")
+            print(f"{module:<18} {'-':>8}     ✗")
+            continue
+        loaded = [m for m in FORBIDDEN if m in modules]
+        over = ms - base_ms
+        status = '✓'
+        if loaded:
+            failures.append(f"{module} memuat {', '.join(loaded)}")
+            status = '✗'
+        if over > args.budget_ms:
+            failures.append(f"{module} +{over:.1f} ms > anggaran {args.budget_ms:.0f} ms")
+            status = '✗'
+        print(f"{module:<18} {ms:8.1f} ms  ({over:+.1f} ms)  {status}")
+
+    for failure in failures:
+        print(f"✗ {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,487 @@
+# benchmarks/regression.py
+"""
+Harness regresi "golden output": memastikan optimasi segment_leaf / detect_lesions /
+extract_features tidak diam-diam mengubah diagnosis.
+
+    python -m benchmarks.regression record  [--golden reports/golden.npz] [--engine legacy]
+                                            [--images DIR] [--resolutions 640x480,1280x960] [--count 24]
+    python -m benchmarks.regression compare [--golden reports/golden.npz] [--engine pipeline]
+                                            [--baseline legacy] [--tol median_hue=0.5 ...] [--json out.json]
+    python -m benchmarks.regression engines
+
+record: jalankan engine acuan (default: legacy — salinan beku jalur asli) pada korpus (daun sintetis deterministik dari
+src.utils.synthetic — latar, warna & bentuk lesi, jumlah lesi 0–16, bingkai tanpa daun —
+plus foto sampel opsional dari --images) dan simpan mask daun, jumlah lesi, lima fitur,
+label & confidence ke file .npz.
+compare: jalankan engine kandidat & baseline pada korpus yang sama (paralel, ProcessPoolExecutor;
+keduanya bergantian di worker yang sama agar beban CPU setara), bandingkan keluaran kandidat
+dengan acuan memakai toleransi per kolom (TOLERANCES) dan laporkan drift + speedup terhadap
+baseline. Exit code 1 bila ada kolom di luar toleransi → engine ditolak.
+
+Engine = nama di ENGINES atau 'modul:fungsi' — fungsi pabrik tanpa argumen yang mengembalikan
+callable(citra RGB) → dict hasil ala LeafPipeline.run (leaf_mask atau leaf_contour, lesions /
+num_lesions, features, label, confidence). Mask dibandingkan pada ANALYSIS_SIZE.
+"""
+import argparse
+import hashlib
+import importlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+from src.batch import find_images
+from src.core.classifier import FEATURE_ORDER, LABEL_BAKTERI, LABEL_JAMUR, LABEL_UNDETECTED, LABELS
+from src.core.multileaf import analyze_leaves
+from src.core.pipeline import ANALYSIS_SIZE, LeafPipeline, analyze_leaf, resize_for_analysis
+from src.core.cache import StageCache
+from src.core.tiled import analyze_leaf_highres
+from src.core.workspace import Workspace
+from src.utils.helpers import load_image
+from src.utils.synthetic import BACKGROUNDS, make_leaf
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_GOLDEN = os.path.join(ROOT, 'reports', 'golden.npz')
+
+# Toleransi default per kolom: leaf_iou = IoU minimum; label = harus sama; lainnya = selisih absolut maks.
+TOLERANCES = {
+    'leaf_iou': 0.99,
+    'num_lesions': 0,
+    'median_hue': 0.5,
+    'entropy': 1e-3,
+    'lesion_area_ratio': 1e-4,
+    'avg_circularity': 1e-3,
+    'confidence': 1e-6,
+    'label': 0,
+}
+_NUMERIC = ('num_lesions',) + tuple(f for f in FEATURE_ORDER if f != 'num_lesions') + ('confidence',)
+
+
+# --- engine ----------------------------------------------------------------------------------
+
+# Salinan beku jalur asli (sebelum optimasi): segment_leaf → detect_lesions → extract_features →
+# classify_condition berbasis cv2.findContours / np.median / np.histogram. Acuan default golden
+# output — jangan dioptimasi; engine lain diukur terhadap jalur ini.
+_LEGACY_LEAF_KERNEL = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (7, 7))
+_LEGACY_LESION_KERNEL = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
+
+
+def _legacy_segment(image_rgb, h_min=35, h_max=85, s_min=50, v_min=20, min_area_ratio=0.01):
+    h_img, w_img = image_rgb.shape[:2]
+    min_area = max(int(h_img * w_img * min_area_ratio), 800)
+    hsv = cv2.cvtColor(image_rgb, cv2.COLOR_RGB2HSV)
+    mask = cv2.inRange(hsv, np.array([h_min, s_min, v_min], dtype=np.uint8), np.array([h_max, 255, 255], dtype=np.uint8))
+    mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, _LEGACY_LEAF_KERNEL)
+    mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, _LEGACY_LEAF_KERNEL)
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    leaf_mask = np.zeros((h_img, w_img), dtype=np.uint8)
+    if not contours:
+        return leaf_mask, None
+
+    def is_mango_leaf(c):
+        _, _, w, h = cv2.boundingRect(c)
+        return h > 0 and 0.2 < w / h < 0.7
+
+    valid = [c for c in contours if cv2.contourArea(c) >= min_area and is_mango_leaf(c)]
+    leaf_contour = max(valid or contours, key=cv2.contourArea)
+    cv2.drawContours(leaf_mask, [leaf_contour], -1, 255, thickness=cv2.FILLED)
+    return leaf_mask, leaf_contour
+
+
+def _legacy_lesions(image_rgb, leaf_mask, hue_min=0, hue_max=40, min_area=150):
+    if leaf_mask is None or not leaf_mask.any():
+        return np.zeros(image_rgb.shape[:2], dtype=np.uint8), []
+    hue_channel = cv2.cvtColor(image_rgb, cv2.COLOR_RGB2HSV)[:, :, 0]
+    lesion_thresh = cv2.inRange(hue_channel, hue_min, hue_max)
+    lesion_thresh = cv2.bitwise_and(lesion_thresh, lesion_thresh, mask=leaf_mask)
+    lesion_mask = cv2.morphologyEx(lesion_thresh, cv2.MORPH_OPEN, _LEGACY_LESION_KERNEL)
+    contours, _ = cv2.findContours(lesion_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    return lesion_mask, [c for c in contours if cv2.contourArea(c) >= min_area]
+
+
+def _legacy_features(image_rgb, leaf_mask, lesion_mask, lesion_contours):
+    hue_channel = cv2.cvtColor(image_rgb, cv2.COLOR_RGB2HSV)[:, :, 0]
+    lesion_pixels = hue_channel[lesion_mask > 0]
+    features = {'median_hue': np.median(lesion_pixels) if len(lesion_pixels) > 0 else 0.0, 'entropy': 0.0}
+    if len(lesion_pixels) > 0:
+        hist, _ = np.histogram(lesion_pixels, bins=32, range=(0, 180))
+        hist = hist / (hist.sum() + 1e-6)
+        features['entropy'] = float(-np.sum(hist * np.log2(hist + 1e-10)))
+    leaf_area = np.sum(leaf_mask > 0)
+    features['lesion_area_ratio'] = np.sum(lesion_mask > 0) / leaf_area if leaf_area > 0 else 0.0
+    features['num_lesions'] = len(lesion_contours)
+    circularities = [4 * np.pi * cv2.contourArea(c) / cv2.arcLength(c, True) ** 2
+                     for c in lesion_contours if cv2.arcLength(c, True) > 0]
+    features['avg_circularity'] = np.mean(circularities) if circularities else 0.0
+    return features
+
+
+def _legacy_classify(features):
+    if features['num_lesions'] == 0 or features['lesion_area_ratio'] < 0.01:
+        return LABELS[LABEL_UNDETECTED], 0.5
+    if features['median_hue'] < 30 and features['entropy'] > 0.3 and features['avg_circularity'] < 0.5:
+        return LABELS[LABEL_JAMUR], 0.9
+    return LABELS[LABEL_BAKTERI], 0.85
+
+
+def _legacy():
+    def run(image):
+        image = resize_for_analysis(image)
+        leaf_mask, leaf_contour = _legacy_segment(image)
+        lesion_mask, lesions = _legacy_lesions(image, leaf_mask)
+        features = _legacy_features(image, leaf_mask, lesion_mask, lesions)
+        label, confidence = _legacy_classify(features)
+        return {'leaf_mask': leaf_mask, 'leaf_contour': leaf_contour, 'lesions': lesions, 'features': features,
+                'label': label, 'confidence': confidence}
+    return run
+
+
+def _pipeline(**kwargs):
+    pipeline = LeafPipeline(**kwargs)
+    return lambda image: pipeline.run(resize_for_analysis(image))
+
+
+def _multileaf():
+    def run(image):
+        result = analyze_leaves(resize_for_analysis(image), max_workers=1)
+        if not result['leaves']:
+            return {'leaf_contour': None, 'num_lesions': 0, 'features': dict.fromkeys(FEATURE_ORDER, 0.0),
+                    'label': result['aggregate']['label'], 'confidence': result['aggregate']['confidence']}
+        return {**result['leaves'][0], 'leaf_contour': result['leaves'][0]['contour']}
+    return run
+
+
+def _highres():
+    def run(image):
+        result = analyze_leaf_highres(image, max_workers=1)
+        contour = result['leaf_contour']
+        h, w = image.shape[:2]
+        if contour is not None and (w, h) != ANALYSIS_SIZE:
+            scale = np.array([ANALYSIS_SIZE[0] / w, ANALYSIS_SIZE[1] / h])
+            contour = np.round(contour * scale).astype(np.int32)
+        return {**result, 'leaf_contour': contour}
+    return run
+
+
+ENGINES = {
+    'legacy': _legacy,                                                 # acuan: jalur asli berbasis findContours
+    'pipeline': lambda: _pipeline(),                                   # LeafPipeline polos
+    'pipeline_ws': lambda: _pipeline(workspace=Workspace()),           # buffer arena (batch/server)
+    'pipeline_cache': lambda: _pipeline(cache=StageCache()),           # jalur cache GUI
+    'analyze_leaf': lambda: lambda image: analyze_leaf(resize_for_analysis(image)),
+    'multileaf': _multileaf,                                           # daun terbesar dari analyze_leaves
+    'highres': _highres,                                               # tile resolusi asli (beda by design)
+}
+
+
+def load_engine(name):
+    """Nama ENGINES atau 'modul:fungsi' (pabrik) → callable(citra RGB) → dict hasil."""
+    if name in ENGINES:
+        return ENGINES[name]()
+    module, _, attr = name.partition(':')
+    if not attr:
+        raise ValueError(f"Engine tidak dikenal: {name} (pilih {', '.join(ENGINES)} atau modul:fungsi)")
+    try:
+        factory = getattr(importlib.import_module(module), attr)
+    except (ImportError, AttributeError) as e:
+        raise ValueError(f"Engine {name} tidak dapat dimuat: {e} (modul harus bisa diimpor dari "
+                         f"direktori kerja atau PYTHONPATH)") from e
+    return factory()
+
+
+def check_engines(names):
+    """Muat & coba tiap engine sekali di proses utama — galat muncul jelas, bukan BrokenProcessPool."""
+    warmup = make_leaf(*ANALYSIS_SIZE)[0]
+    for name in names:
+        try:
+            normalize(load_engine(name)(warmup))
+        except ValueError:
+            raise
+        except Exception as e:
+            raise ValueError(f"Engine {name} gagal dijalankan: {type(e).__name__}: {e}") from e
+
+
+def normalize(result):
+    """Hasil engine → mask daun (ANALYSIS_SIZE, bool), num_lesions, fitur, label, confidence."""
+    width, height = ANALYSIS_SIZE
+    mask = result.get('leaf_mask')
+    if mask is None:
+        mask = np.zeros((height, width), dtype=np.uint8)
+        if result.get('leaf_contour') is not None:
+            cv2.drawContours(mask, [result['leaf_contour']], -1, 255, thickness=cv2.FILLED)
+    elif mask.shape != (height, width):
+        mask = cv2.resize(mask, (width, height), interpolation=cv2.INTER_NEAREST)
+    lesions = result.get('lesions')
+    num_lesions = result['num_lesions'] if 'num_lesions' in result else len(lesions)
+    return {'leaf_mask': mask > 0, 'num_lesions': int(num_lesions),
+            **{k: float(result['features'][k]) for k in FEATURE_ORDER if k != 'num_lesions'},
+            'label': result['label'], 'confidence': float(result['confidence'])}
+
+
+# --- korpus ----------------------------------------------------------------------------------
+
+def synthetic_corpus(resolutions, count):
+    """Spesifikasi citra sintetis deterministik (dibuat ulang di worker, tidak disimpan)."""
+    items = []
+    for width, height in resolutions:
+        for seed in range(count):
+            spec = {'width': width, 'height': height, 'n_lesions': (0, 4, 8, 16)[seed % 4],
+                    'background': BACKGROUNDS[seed % len(BACKGROUNDS)],
+                    'lesion_color': 'dark' if seed % 3 == 0 else 'brown', 'irregular': seed % 2 == 1, 'seed': seed}
+            items.append({'id': f"synthetic/{width}x{height}/{seed}", 'synthetic': spec})
+        # Bingkai tanpa daun: jalur "tidak ada kontur" juga harus stabil
+        items.append({'id': f"synthetic/{width}x{height}/empty", 'synthetic': {'width': width, 'height': height,
+                                                                              'empty': True}})
+    return items
+
+
+def _file_digest(path):
+    with open(path, 'rb') as f:
+        return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
+
+def sample_corpus(directory):
+    return [{'id': os.path.relpath(path, directory), 'path': os.path.abspath(path), 'digest': _file_digest(path)}
+            for path in find_images(directory)]
+
+
+def load_item(item):
+    spec = item.get('synthetic')
+    if spec is None:
+        return load_image(item['path'])
+    if spec.get('empty'):
+        rng = np.random.default_rng(0)
+        return cv2.GaussianBlur(rng.integers(90, 200, (spec['height'], spec['width'], 3), dtype=np.uint8), (0, 0), 4)
+    return make_leaf(spec['width'], spec['height'], spec['n_lesions'], background=spec['background'],
+                     lesion_color=spec['lesion_color'], irregular=spec['irregular'], seed=spec['seed'])[0]
+
+
+# --- worker ----------------------------------------------------------------------------------
+
+_ENGINES = {}
+
+
+def _init_worker(names):
+    warmup = make_leaf(*ANALYSIS_SIZE)[0]
+    for name in names:
+        _ENGINES[name] = load_engine(name)
+        _ENGINES[name](warmup)
+
+
+def _run_item(item, names):
+    """Jalankan semua engine pada satu citra (bergantian) → {engine: (keluaran ternormalisasi, ms)}."""
+    image = load_item(item)
+    outputs = {}
+    for name in names:
+        t0 = time.perf_counter()
+        result = _ENGINES[name](image)
+        ms = (time.perf_counter() - t0) * 1000.0
+        outputs[name] = (normalize(result), ms)
+    return item['id'], outputs
+
+
+def run_engines(items, names, workers=None):
+    """Dict id → {engine: (keluaran, ms)}, diproses paralel antar core."""
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(tuple(names),)) as executor:
+        futures = [executor.submit(_run_item, item, tuple(names)) for item in items]
+        return dict(f.result() for f in futures)
+
+
+# --- golden file -----------------------------------------------------------------------------
+
+def save_golden(path, items, outputs, engine):
+    ids = [item['id'] for item in items]
+    masks = [outputs[i][engine][0]['leaf_mask'] for i in ids]
+    meta = {'engine': engine, 'created_at': datetime.now().isoformat(timespec='seconds'),
+            'commit': _git_commit(), 'analysis_size': ANALYSIS_SIZE, 'items': items}
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    np.savez_compressed(
+        path,
+        meta=np.array(json.dumps(meta)),
+        masks=np.stack([np.packbits(m, axis=None) for m in masks]),
+        labels=np.array([outputs[i][engine][0]['label'] for i in ids]),
+        ms=np.array([outputs[i][engine][1] for i in ids]),
+        **{name: np.array([outputs[i][engine][0][name] for i in ids], dtype=np.float64) for name in _NUMERIC},
+    )
+
+
+def load_golden(path):
+    data = np.load(path)
+    meta = json.loads(str(data['meta']))
+    width, height = meta['analysis_size']
+    refs = {}
+    for i, item in enumerate(meta['items']):
+        mask = np.unpackbits(data['masks'][i], count=width * height).reshape(height, width).astype(bool)
+        refs[item['id']] = {'leaf_mask': mask, 'label': str(data['labels'][i]), 'ms': float(data['ms'][i]),
+                            **{name: float(data[name][i]) for name in _NUMERIC}}
+    return meta, refs
+
+
+def _git_commit():
+    import subprocess
+
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, timeout=10)
+        return out.stdout.strip() or 'unknown'
+    except Exception:
+        return 'unknown'
+
+
+# --- perbandingan ----------------------------------------------------------------------------
+
+def mask_iou(a, b):
+    union = np.count_nonzero(a | b)
+    return 1.0 if union == 0 else np.count_nonzero(a & b) / union
+
+
+def compare_outputs(ref, out, tolerances=TOLERANCES):
+    """Drift per kolom untuk satu citra → dict kolom → (nilai drift, lolos?)."""
+    drift = {}
+    iou = mask_iou(ref['leaf_mask'], out['leaf_mask'])
+    drift['leaf_iou'] = (iou, iou >= tolerances['leaf_iou'])
+    for name in _NUMERIC:
+        delta = abs(out[name] - ref[name])
+        drift[name] = (delta, delta <= tolerances[name])
+    drift['label'] = (int(out['label'] != ref['label']), out['label'] == ref['label'])
+    return drift
+
+
+def evaluate(refs, results, engine, baseline, tolerances=TOLERANCES):
+    """Ringkasan: per kolom (drift terburuk, jumlah gagal), daftar kegagalan, waktu & speedup."""
+    fields = {name: {'worst': None, 'failures': 0} for name in tolerances}
+    failures = []
+    for item_id, ref in refs.items():
+        if item_id not in results:
+            continue
+        out = results[item_id][engine][0]
+        for name, (value, ok) in compare_outputs(ref, out, tolerances).items():
+            stat = fields[name]
+            worse = min if name == 'leaf_iou' else max
+            stat['worst'] = value if stat['worst'] is None else worse(stat['worst'], value)
+            if not ok:
+                stat['failures'] += 1
+                failures.append({'id': item_id, 'field': name, 'drift': value,
+                                 'reference': ref['label'] if name == 'label' else ref.get(name),
+                                 'candidate': out['label'] if name == 'label' else out.get(name)})
+    ids = [i for i in refs if i in results]
+    engine_ms = np.array([results[i][engine][1] for i in ids])
+    baseline_ms = np.array([results[i][baseline][1] for i in ids])
+    return {
+        'engine': engine,
+        'baseline': baseline,
+        'items': len(ids),
+        'fields': fields,
+        'failures': failures,
+        'engine_ms': float(engine_ms.sum()),
+        'baseline_ms': float(baseline_ms.sum()),
+        'speedup': float(baseline_ms.sum() / engine_ms.sum()) if engine_ms.sum() > 0 else 0.0,
+        'speedup_p50': float(np.median(baseline_ms / np.maximum(engine_ms, 1e-9))) if ids else 0.0,
+        'passed': not failures,
+    }
+
+
+def parse_resolutions(text):
+    return [tuple(int(v) for v in part.lower().split('x')) for part in text.split(',') if part]
+
+
+def parse_tolerances(pairs):
+    tolerances = dict(TOLERANCES)
+    for pair in pairs or ():
+        name, _, value = pair.partition('=')
+        if name not in tolerances:
+            raise ValueError(f"Kolom toleransi tidak dikenal: {name} (pilih {', '.join(tolerances)})")
+        tolerances[name] = float(value)
+    return tolerances
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.regression', description='Harness regresi golden output')
+    sub = parser.add_subparsers(dest='command', required=True)
+    rec = sub.add_parser('record', help='Rekam keluaran acuan')
+    rec.add_argument('--engine', default='legacy')
+    rec.add_argument('--images', help='Direktori foto sampel tambahan (rekursif)')
+    rec.add_argument('--resolutions', default='640x480,1280x960')
+    rec.add_argument('--count', type=int, default=24, help='Citra sintetis per resolusi')
+    cmp_ = sub.add_parser('compare', help='Bandingkan engine kandidat dengan acuan')
+    cmp_.add_argument('--engine', default='pipeline')
+    cmp_.add_argument('--baseline', default='legacy', help='Engine pembanding waktu (speedup)')
+    cmp_.add_argument('--tol', action='append', metavar='KOLOM=NILAI', help=f"Ubah toleransi; default {TOLERANCES}")
+    cmp_.add_argument('--json', help='Simpan laporan lengkap sebagai JSON')
+    for p in (rec, cmp_):
+        p.add_argument('--golden', default=DEFAULT_GOLDEN, help='File acuan (default: reports/golden.npz)')
+        p.add_argument('-j', '--workers', type=int, default=None, help='Jumlah proses (default: jumlah core)')
+    sub.add_parser('engines', help='Daftar engine bawaan')
+    args = parser.parse_args(argv)
+
+    if args.command == 'engines':
+        for name in ENGINES:
+            print(name)
+        return 0
+
+    if args.command == 'record':
+        items = synthetic_corpus(parse_resolutions(args.resolutions), args.count)
+        if args.images:
+            if not os.path.isdir(args.images):
+                parser.error(f"Direktori tidak ditemukan: {args.images}")
+            items += sample_corpus(args.images)
+        try:
+            check_engines([args.engine])
+        except ValueError as e:
+            parser.error(str(e))
+        t0 = time.perf_counter()
+        results = run_engines(items, [args.engine], args.workers)
+        save_golden(args.golden, items, results, args.engine)
+        print(f"✓ {len(items)} keluaran acuan ({args.engine}) → {args.golden} "
+              f"[{time.perf_counter() - t0:.1f} s]")
+        return 0
+
+    if not os.path.exists(args.golden):
+        parser.error(f"File acuan tidak ditemukan: {args.golden} (jalankan `record` dulu)")
+    try:
+        tolerances = parse_tolerances(args.tol)
+    except ValueError as e:
+        parser.error(str(e))
+    meta, refs = load_golden(args.golden)
+    items = []
+    for item in meta['items']:
+        if 'path' in item and (not os.path.exists(item['path']) or _file_digest(item['path']) != item['digest']):
+            print(f"ℹ️ {item['id']}: foto sampel hilang/berubah, dilewati", file=sys.stderr)
+            refs.pop(item['id'])
+            continue
+        items.append(item)
+    names = [args.engine] if args.engine == args.baseline else [args.baseline, args.engine]
+    try:
+        check_engines(names)
+    except ValueError as e:
+        parser.error(str(e))
+    results = run_engines(items, names, args.workers)
+    report = evaluate(refs, results, args.engine, args.baseline, tolerances)
+
+    print(f"engine {args.engine} vs acuan {meta['engine']}@{meta['commit']} ({report['items']} citra)")
+    for name, stat in report['fields'].items():
+        kind = 'IoU min' if name == 'leaf_iou' else 'selisih maks'
+        mark = '✓' if stat['failures'] == 0 else '✗'
+        print(f"  {mark} {name:<18} {kind} {stat['worst']:.6g}  (toleransi {tolerances[name]:g}, "
+              f"gagal {stat['failures']})")
+    for failure in report['failures'][:10]:
+        print(f"    {failure['id']}: {failure['field']} acuan {failure['reference']} → {failure['candidate']}")
+    if len(report['failures']) > 10:
+        print(f"    … {len(report['failures']) - 10} kegagalan lain")
+    print(f"waktu: baseline {args.baseline} {report['baseline_ms']:.0f} ms, {args.engine} {report['engine_ms']:.0f} ms "
+          f"→ speedup {report['speedup']:.2f}× (median per citra {report['speedup_p50']:.2f}×)")
+    print("✓ DITERIMA — semua kolom dalam toleransi" if report['passed'] else "✗ DITOLAK — ada drift di luar toleransi")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({**report, 'tolerances': tolerances, 'golden': {k: meta[k] for k in ('engine', 'commit', 'created_at')}},
+                      f, indent=2, ensure_ascii=False)
+    return 0 if report['passed'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,5 +1,7 @@
 # leafhealth_app.py
-from src.gui.main_window import LeafHealthAIApp
+# GUI (tkinter, ttkbootstrap, PIL.ImageTk) diimpor hanya saat aplikasi dijalankan, bukan saat modul
+# ini diimpor ulang (mis. oleh proses worker multiprocessing 'spawn' sebagai __mp_main__).
 if __name__ == "__main__":
+    from src.gui.main_window import LeafHealthAIApp
     app = LeafHealthAIApp()
-    app.run()
\ No newline at end of file
+    app.run()
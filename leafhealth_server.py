@@ -0,0 +1,8 @@
+# leafhealth_server.py
+# Layanan diagnosa HTTP (LAN) untuk tablet lapangan — lihat src/server.py. Tanpa GUI; modul ini
+# aman diimpor ulang oleh proses worker multiprocessing 'spawn' (main() hanya saat dijalankan).
+import sys
+
+if __name__ == "__main__":
+    from src.server import main
+    sys.exit(main())
@@ -0,0 +1,400 @@
+# src/batch.py
+"""
+Analisis batch tanpa GUI untuk satu direktori (rekursif) foto daun.
+
+    python -m src.batch <dir> [--output data/processed/hasil.csv] [--workers N]
+
+Satu baris CSV/JSONL per citra; run yang terhenti dilanjutkan dan baris error dicoba ulang.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from .core.leaf_validation import check_leaf_image
+from .core.multileaf import MIN_AREA_RATIO, analyze_leaves
+from .core.pipeline import ANALYSIS_SIZE, DEFAULT_LESION_PARAMS, DEFAULT_SEG_PARAMS, LeafPipeline, resize_for_analysis
+from .core.profiling import StageProfiler, profile_stage, stage_columns
+from .core.tiled import analyze_leaf_highres
+from .core.workspace import Workspace, buffer
+from .feature_store import DEFAULT_FEATURES, FeatureStore
+from .store import DEFAULT_STORE, ResultStore, encode_thumbnail, file_hash, overlay_thumbnail, param_hash
+from .utils.helpers import load_image
+
+IMAGE_EXTS = ('.jpg', '.jpeg', '.png', '.bmp')
+FEATURE_NAMES = ('median_hue', 'entropy', 'lesion_area_ratio', 'num_lesions', 'avg_circularity')
+BATCH_STAGES = ('store', 'decode', 'resize', 'validate', 'hsv', 'segment', 'lesions', 'features', 'classify')
+FIELDNAMES = ('image', 'label', 'confidence') + FEATURE_NAMES + ('error', 'rejected', 'cached') + stage_columns(BATCH_STAGES)
+MULTI_FIELDNAMES = ('image', 'leaf', 'n_leaves') + FIELDNAMES[1:]
+PROCESSED_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'processed')
+_RESIZED_SHAPE = (ANALYSIS_SIZE[1], ANALYSIS_SIZE[0], 3)  # buffer 'resized' di Workspace worker
+
+_PIPELINE = None  # satu pipeline (+ Workspace buffer yang dipakai ulang antar citra) per proses worker
+_HIGHRES = False  # mode resolusi penuh (analyze_leaf_highres) per proses worker
+_MULTI_LEAF = False  # mode multi-daun (analyze_leaves) per proses worker
+_STORE = None     # ResultStore (hanya dibaca) per proses worker
+
+
+def find_images(root):
+    """Daftar path citra (urut) di bawah root, rekursif."""
+    paths = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if name.lower().endswith(IMAGE_EXTS):
+                paths.append(os.path.join(dirpath, name))
+    return paths
+
+
+def _init_worker(seg_params, lesion_params, highres=False, store_path=None, multi_leaf=False):
+    global _PIPELINE, _HIGHRES, _MULTI_LEAF, _STORE
+    _PIPELINE = LeafPipeline(seg_params, lesion_params, workspace=Workspace())
+    _HIGHRES = highres
+    _MULTI_LEAF = multi_leaf
+    # Skema & mode WAL sudah disiapkan proses utama (run_batch) → worker hanya membaca
+    _STORE = ResultStore(store_path, readonly=True) if store_path else None
+
+
+def store_key(pipeline, highres=False):
+    """Hash parameter arsip untuk pipeline & mode analisis ini."""
+    return param_hash(pipeline.seg_params, pipeline.lesion_params, 'highres' if highres else 'standard')
+
+
+def _gate_params(pipeline):
+    """Rentang hijau gerbang awal = parameter segmentasi pipeline."""
+    return {k: pipeline.seg_params[k] for k in ('h_min', 'h_max', 's_min')}
+
+
+def _fill_features(row, features):
+    for name in FEATURE_NAMES:
+        if name in features:
+            value = features[name]
+            row[name] = int(value) if name == 'num_lesions' else float(value)
+    return row
+
+
+def _leaf_rows(path, result):
+    """Satu baris per daun dari hasil analyze_leaves (tanpa kolom profil — ada di baris agregat)."""
+    return [_fill_features({'image': path, 'leaf': leaf['index'], 'label': leaf['label'],
+                            'confidence': float(leaf['confidence']), 'error': '', 'rejected': '', 'cached': 0},
+                           leaf['features'])
+            for leaf in result['leaves']]
+
+
+def _rejected(row, check, profiler):
+    row['rejected'] = check['reason']
+    row['error'] = ''
+    row.update(profiler.columns(BATCH_STAGES))
+    return row
+
+
+def analyze_file(path, pipeline=None):
+    """
+    Jalankan pipeline pada satu file; error dicatat di kolom 'error', tidak dilempar.
+    Baris per daun (multi-daun) dibawa di kunci '_leaves', hasil baru untuk arsip di '_store'.
+    """
+    pipeline = pipeline or _PIPELINE or LeafPipeline()
+    profiler = StageProfiler()
+    row = {'image': path, 'cached': 0, 'rejected': ''}
+    try:
+        result = None
+        if _STORE is not None:
+            with profile_stage(profiler, 'store'):
+                image_hash = file_hash(path)
+                result = _STORE.get(image_hash, store_key(pipeline, _HIGHRES))
+        if result is not None:
+            row['cached'] = 1
+        elif _HIGHRES:
+            with profile_stage(profiler, 'decode') as record:
+                image = profiler.add_output(record, load_image(path))
+            with profile_stage(profiler, 'validate'):
+                check = check_leaf_image(image, **_gate_params(pipeline))
+            if not check['ok']:
+                return _rejected(row, check, profiler)
+            # Paralelisme sudah antar proses → tile diproses berurutan di tiap worker
+            result = analyze_leaf_highres(image, pipeline.seg_params, pipeline.lesion_params,
+                                          max_workers=1, profiler=profiler)
+        else:
+            with profile_stage(profiler, 'decode') as record:
+                image = profiler.add_output(record, load_image(path, target_size=ANALYSIS_SIZE))
+            with profile_stage(profiler, 'resize') as record:
+                resized = resize_for_analysis(image, out=buffer(pipeline.workspace, 'resized', _RESIZED_SHAPE))
+                if resized is not image:
+                    profiler.add_output(record, resized)
+            with profile_stage(profiler, 'validate'):
+                # Daun di nampan masing-masing kecil → ambang luas gerbang = ambang per daun
+                check = check_leaf_image(resized, **_gate_params(pipeline),
+                                         **({'min_leaf_area': MIN_AREA_RATIO} if _MULTI_LEAF else {}))
+            if not check['ok']:
+                return _rejected(row, check, profiler)
+            if _MULTI_LEAF:
+                leaves = analyze_leaves(resized, pipeline.seg_params, pipeline.lesion_params,
+                                        max_workers=1, profiler=profiler)
+                row['_leaves'] = _leaf_rows(path, leaves)
+                row['leaf'] = ''
+                row['n_leaves'] = leaves['aggregate']['n_leaves']
+                result = {**leaves['aggregate'], 'features': leaves['aggregate']}
+            else:
+                pipeline.profiler = profiler
+                result = pipeline.run(resized)
+            image = resized
+        if _STORE is not None and not row['cached']:
+            row['_store'] = {
+                'image_hash': image_hash,
+                'result': {k: result[k] for k in ('features', 'label', 'confidence', 'lesions')},
+                'thumbnail': encode_thumbnail(overlay_thumbnail(image, result['leaf_contour'], result['lesions'])),
+            }
+        row['label'] = result['label']
+        row['confidence'] = float(result['confidence'])
+        _fill_features(row, result['features'])
+        row['error'] = ''
+    except Exception as e:
+        row['error'] = str(e)
+    row.update(profiler.columns(BATCH_STAGES))
+    return row
+
+
+def iter_results(paths, workers=None, seg_params=None, lesion_params=None, highres=False, store_path=None,
+                 multi_leaf=False):
+    """
+    Hasilkan baris hasil sesuai urutan selesai. Jumlah task yang sedang berjalan
+    dibatasi (4× worker) agar memori tetap datar untuk direktori besar.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_pending = workers * 4
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(seg_params, lesion_params, highres, store_path, multi_leaf)) as executor:
+        pending = set()
+        for path in paths:
+            pending.add(executor.submit(analyze_file, path))
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+def _repair_tail(path):
+    """Buang baris terakhir yang terpotong (mis. proses mati saat menulis)."""
+    with open(path, 'rb+') as f:
+        data = f.read()
+        if data and not data.endswith(b'\n'):
+            f.truncate(data.rfind(b'\n') + 1)
+
+
+def load_done(path, fmt):
+    """
+    Himpunan citra yang sudah selesai di file output (untuk resume): hasil sukses atau ditolak
+    gerbang. Baris dengan kolom 'error' tidak dihitung → citra tersebut diproses ulang.
+    """
+    if not os.path.exists(path):
+        return set()
+    _repair_tail(path)
+    done = set()
+    with open(path, newline='', encoding='utf-8') as f:
+        if fmt == 'jsonl':
+            for line in f:
+                try:
+                    row = json.loads(line)
+                    if not row.get('error'):
+                        done.add(row['image'])
+                except (ValueError, KeyError):
+                    continue
+        else:
+            for row in csv.DictReader(f):
+                if row.get('image') and not row.get('error'):
+                    done.add(row['image'])
+    return done
+
+
+def _drop_error_rows(path, fmt):
+    """
+    Buang baris error dari file output sebelum resume (citranya dicoba ulang), agar tiap citra
+    hanya punya satu baris hasil. File ditulis ulang (atomik) hanya bila ada baris error.
+    """
+    if not os.path.exists(path):
+        return 0
+    with open(path, newline='', encoding='utf-8') as f:
+        if fmt == 'jsonl':
+            lines = f.readlines()
+            keep = []
+            for line in lines:
+                try:
+                    failed = bool(json.loads(line).get('error'))
+                except (ValueError, AttributeError):
+                    failed = False
+                if not failed:
+                    keep.append(line)
+        else:
+            lines = list(csv.reader(f))
+            header = lines[0] if lines else []
+            column = header.index('error') if 'error' in header else None
+            keep = lines[:1] + [row for row in lines[1:] if column is None or column >= len(row) or not row[column]]
+    dropped = len(lines) - len(keep)
+    if dropped:
+        tmp = path + '.tmp'
+        with open(tmp, 'w', newline='', encoding='utf-8') as f:
+            if fmt == 'jsonl':
+                f.writelines(keep)
+            else:
+                csv.writer(f).writerows(keep)
+        os.replace(tmp, path)
+    return dropped
+
+
+class ResultWriter:
+    """Penulis baris hasil CSV/JSONL yang mode append & flush per baris."""
+
+    def __init__(self, path, fmt, fieldnames=FIELDNAMES):
+        self.fmt = fmt
+        is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+        if fmt == 'csv' and not is_new:
+            # Lanjutkan dengan header file lama (mis. dari versi tanpa kolom profil)
+            with open(path, newline='', encoding='utf-8') as f:
+                fieldnames = next(csv.reader(f), None) or fieldnames
+        self.file = open(path, 'a', newline='', encoding='utf-8')
+        if fmt == 'csv':
+            self.writer = csv.DictWriter(self.file, fieldnames=fieldnames, extrasaction='ignore')
+            if is_new:
+                self.writer.writeheader()
+
+    def write(self, row):
+        if self.fmt == 'jsonl':
+            self.file.write(json.dumps(row, ensure_ascii=False) + '\n')
+        else:
+            self.writer.writerow(row)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _checkpoint(store, features):
+    """
+    Simpan arsip & dataset fitur bersamaan agar keduanya sepakat bila proses mati di tengah run.
+    Fitur di-flush lebih dulu: baris fitur tanpa arsip hanya jadi duplikat (select latest=True),
+    sedangkan arsip tanpa fitur tidak akan pernah ditambahkan ulang (hasil diambil dari arsip).
+    """
+    if features is not None:
+        features.flush()
+    if store is not None:
+        store.commit()
+
+
+def run_batch(root, output, fmt=None, workers=None, resume=True, seg_params=None, lesion_params=None,
+              highres=False, store_path=DEFAULT_STORE, multi_leaf=False, features_dir=DEFAULT_FEATURES):
+    """
+    Proses seluruh citra di root dan tulis hasil ke output. Mengembalikan jumlah citra baru.
+    store_path / features_dir = None menonaktifkan arsip hasil / dataset fitur.
+    """
+    if multi_leaf:
+        if highres:
+            raise ValueError("mode multi-daun tidak dapat digabung dengan highres")
+        store_path = None
+    fmt = fmt or ('jsonl' if output.endswith('.jsonl') else 'csv')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    if not resume and os.path.exists(output):
+        os.remove(output)
+
+    done = load_done(output, fmt)
+    _drop_error_rows(output, fmt)
+    todo = []
+    for path in find_images(root):
+        rel = os.path.relpath(path, root)
+        if rel not in done:
+            todo.append(path)
+
+    store = ResultStore(store_path) if store_path else None  # skema dibuat sebelum worker membaca
+    features = FeatureStore(features_dir) if store is not None and features_dir else None
+    pipeline = LeafPipeline(seg_params, lesion_params)
+    key = store_key(pipeline, highres)
+    params = {**pipeline.seg_params, **pipeline.lesion_params}
+    count = rejected = 0
+    try:
+        with ResultWriter(output, fmt, MULTI_FIELDNAMES if multi_leaf else FIELDNAMES) as writer:
+            for row in iter_results(todo, workers, seg_params, lesion_params, highres, store_path, multi_leaf):
+                row['image'] = os.path.relpath(row['image'], root)
+                payload = row.pop('_store', None)
+                if payload is not None and store is not None:
+                    store.put(payload['image_hash'], key, payload['result'], source=row['image'],
+                              params=params, thumbnail=payload['thumbnail'], commit=False)
+                    if features is not None:
+                        result = payload['result']
+                        features.append(result['features'], result['label'], result['confidence'],
+                                        payload['image_hash'], key)
+                leaf_rows = row.pop('_leaves', ())
+                writer.write(row)
+                for leaf_row in leaf_rows:
+                    leaf_row['image'] = row['image']
+                    writer.write(leaf_row)
+                count += 1
+                rejected += bool(row.get('rejected'))
+                if count % 100 == 0:
+                    _checkpoint(store, features)
+                    print(f"… {count}/{len(todo)} citra diproses", file=sys.stderr)
+    finally:
+        _checkpoint(store, features)
+        if features is not None:
+            features.close()
+        if store is not None:
+            store.close()
+    if rejected:
+        print(f"ℹ️ {rejected} citra ditolak gerbang awal (lihat kolom 'rejected')", file=sys.stderr)
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m src.batch', description='LeafHealthAI — analisis batch')
+    parser.add_argument('directory', help='Direktori citra daun (dipindai rekursif)')
+    parser.add_argument('-o', '--output', help='File hasil .csv / .jsonl (default: data/processed/batch_<nama_dir>.csv)')
+    parser.add_argument('--format', choices=('csv', 'jsonl'), help='Format output (default: dari ekstensi)')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='Jumlah proses (default: jumlah core)')
+    parser.add_argument('--no-resume', action='store_true', help='Mulai ulang dari awal, abaikan hasil sebelumnya')
+    parser.add_argument('--store', default=DEFAULT_STORE, help='Arsip hasil SQLite (default: data/processed/results.sqlite)')
+    parser.add_argument('--no-store', action='store_true', help='Jangan baca/tulis arsip hasil')
+    parser.add_argument('--features', default=DEFAULT_FEATURES,
+                        help='Dataset fitur kolumnar untuk hasil baru (default: data/processed/features)')
+    parser.add_argument('--no-features', action='store_true', help='Jangan tambahkan hasil ke dataset fitur')
+    parser.add_argument('--highres', action='store_true',
+                        help='Deteksi lesi per tile pada resolusi asli (bercak kecil); min-area dalam piksel asli')
+    parser.add_argument('--multi-leaf', action='store_true',
+                        help='Analisis semua daun di tiap foto (cabang/nampan): baris agregat + satu baris per daun; tanpa arsip')
+    parser.add_argument('--params', help='File JSON hasil `python -m src.tuning` sebagai parameter dasar')
+    for name, value in {**DEFAULT_SEG_PARAMS, **DEFAULT_LESION_PARAMS}.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, default=None, help=f"default: {value}")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.directory):
+        parser.error(f"Direktori tidak ditemukan: {args.directory}")
+    if args.multi_leaf and args.highres:
+        parser.error("--multi-leaf tidak dapat digabung dengan --highres")
+    output = args.output or os.path.join(
+        PROCESSED_DIR, f"batch_{os.path.basename(os.path.normpath(args.directory))}.{args.format or 'csv'}")
+    params = {**DEFAULT_SEG_PARAMS, **DEFAULT_LESION_PARAMS}
+    if args.params:
+        with open(args.params, encoding='utf-8') as f:
+            params.update(json.load(f)['params'])
+    params.update({k: getattr(args, k) for k in params if getattr(args, k) is not None})
+    seg_params = {k: params[k] for k in DEFAULT_SEG_PARAMS}
+    lesion_params = {k: params[k] for k in DEFAULT_LESION_PARAMS}
+
+    count = run_batch(args.directory, output, args.format, args.workers, not args.no_resume,
+                      seg_params, lesion_params, args.highres, None if args.no_store else args.store,
+                      args.multi_leaf, None if args.no_features else args.features)
+    print(f"✓ {count} citra baru diproses → {output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,5 +1,13 @@
 # src/core/__init__.py
-from .segmentation import segment_leaf
-from .lesion_detection import detect_lesions
+from .segmentation import find_leaves, segment_leaf
+from .leaf_validation import check_leaf_image, validate_leaf_image
+from .lesion_detection import detect_lesions, lesion_crops, measure_lesions
 from .feature_extraction import extract_features
-from .classifier import classify_condition
\ No newline at end of file
+from .classifier import classify_batch, classify_condition, feature_matrix
+from .pipeline import LeafPipeline, analyze_leaf, resize_for_analysis
+from .cache import StageCache, image_hash
+from .workspace import Workspace
+from .profiling import StageProfiler
+from .hue_index import HueIndex
+from .tiled import analyze_leaf_highres
+from .multileaf import aggregate_leaves, analyze_leaves, analyze_roi, draw_leaves
@@ -0,0 +1,77 @@
+# src/core/cache.py
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+
+
+def image_hash(image):
+    """Hash isi citra (blake2b atas shape, dtype & piksel) sebagai kunci cache."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(str((image.shape, image.dtype.str)).encode())
+    h.update(np.ascontiguousarray(image).data)
+    return h.hexdigest()
+
+
+def freeze_params(params):
+    """Dict parameter → tuple terurut yang hashable."""
+    return tuple(sorted((params or {}).items()))
+
+
+def _sizeof(value):
+    if hasattr(value, 'nbytes'):  # ndarray & objek indeks (mis. HueIndex)
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sum(_sizeof(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(_sizeof(v) for v in value)
+    return 0
+
+
+class StageCache:
+    """
+    Cache LRU hasil tahap pipeline, dikunci (hash citra, tahap, parameter).
+    Entri terlama dibuang bila total ukuran array melebihi max_bytes.
+    Nilai yang disimpan dipakai bersama — jangan dimodifikasi in-place.
+    """
+
+    def __init__(self, max_bytes=256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, value):
+        size = _sizeof(value)
+        if key in self._entries:
+            self.nbytes -= self._entries.pop(key)[1]
+        if size > self.max_bytes:
+            return value
+        self._entries[key] = (value, size)
+        self.nbytes += size
+        while self.nbytes > self.max_bytes:
+            _, (_, old_size) = self._entries.popitem(last=False)
+            self.nbytes -= old_size
+        return value
+
+    def get_or_compute(self, key, compute):
+        value = self.get(key)
+        if value is None:
+            value = self.put(key, compute())
+        return value
+
+    def clear(self):
+        self._entries.clear()
+        self.nbytes = 0
@@ -1,22 +1,51 @@
 # src/core/classifier.py
-def classify_condition(features):
+import numpy as np
+
+# Urutan kolom matriks fitur untuk classify_batch
+FEATURE_ORDER = ('median_hue', 'entropy', 'lesion_area_ratio', 'num_lesions', 'avg_circularity')
+
+# Kode label
+LABEL_UNDETECTED, LABEL_JAMUR, LABEL_BAKTERI = 0, 1, 2
+LABELS = ("❓ Tidak Terdeteksi", "🍄 Jamur", "🦠 Bakteri")
+CONFIDENCES = (0.5, 0.9, 0.85)
+RECOMMENDATIONS = (
+    "Tidak ditemukan lesi signifikan. Pastikan foto menangkap bercak penyakit.",
+    "Kemungkinan besar penyakit jamur (anthracnose). Semprot dengan fungisida berbasis tembaga. Hindari kelembapan tinggi.",
+    "Kemungkinan infeksi bakteri (bacterial black spot). Hindari menyiram daun di sore hari. Gunakan tembaga + streptomycin jika tersedia.",
+)
+_CONFIDENCE_TABLE = np.array(CONFIDENCES, dtype=np.float32)
+
+# Rasio luas lesi/daun minimum; di bawahnya selalu Tidak Terdeteksi
+MIN_LESION_RATIO = 0.01
+
+
+def feature_matrix(features_list, dtype=np.float64):
+    """List dict fitur (dari extract_features) → matriks N×5 sesuai FEATURE_ORDER."""
+    return np.array([[f[k] for k in FEATURE_ORDER] for f in features_list], dtype=dtype).reshape(-1, len(FEATURE_ORDER))
+
+
+def classify_batch(features):
     """
-    Klasifikasi khusus daun mangga: hanya Jamur vs Bakteri.
-    Sesuai dokumen PDF.
+    Aturan Jamur/Bakteri/Tidak Terdeteksi yang sama dengan classify_condition,
+    divektorisasi atas matriks N×5 (kolom FEATURE_ORDER). Ambang selalu dibandingkan
+    dalam float64 seperti classify_condition, juga untuk matriks float32.
+    Mengembalikan (kode label int8, confidence float32), masing-masing panjang N.
     """
-    hue = features['median_hue']
-    entropy = features['entropy']
-    circularity = features['avg_circularity']
-    area_ratio = features['lesion_area_ratio']
-    num_lesions = features['num_lesions']
-
-    if num_lesions == 0 or area_ratio < 0.01:
-        return "❓ Tidak Terdeteksi", 0.5, "Tidak ditemukan lesi signifikan. Pastikan foto menangkap bercak penyakit."
+    f = np.asarray(features, dtype=np.float64).reshape(-1, len(FEATURE_ORDER))
+    hue, entropy, area_ratio, num_lesions, circularity = f.T
 
     # Jamur: lesi gelap (Hue < 30), tekstur kasar (entropi > 0.3), bentuk tidak beraturan (circularity < 0.5)
-    if hue < 30 and entropy > 0.3 and circularity < 0.5:
-        return "🍄 Jamur", 0.9, "Kemungkinan besar penyakit jamur (anthracnose). Semprot dengan fungisida berbasis tembaga. Hindari kelembapan tinggi."
+    # Bakteri: selain itu (lesi cokelat kemerahan, tepi buram)
+    codes = np.where((hue < 30) & (entropy > 0.3) & (circularity < 0.5), LABEL_JAMUR, LABEL_BAKTERI).astype(np.int8)
+    codes[(num_lesions == 0) | (area_ratio < MIN_LESION_RATIO)] = LABEL_UNDETECTED
+    return codes, _CONFIDENCE_TABLE[codes]
 
-    # Bakteri: lesi cokelat kemerahan (Hue 30–50), tepi buram → circularity sangat rendah
-    else:
-        return "🦠 Bakteri", 0.85, "Kemungkinan infeksi bakteri (bacterial black spot). Hindari menyiram daun di sore hari. Gunakan tembaga + streptomycin jika tersedia."
\ No newline at end of file
+
+def classify_condition(features):
+    """
+    Klasifikasi khusus daun mangga: hanya Jamur vs Bakteri.
+    Sesuai dokumen PDF. Pembungkus satu baris di atas classify_batch.
+    """
+    codes, _ = classify_batch(np.array([[features[k] for k in FEATURE_ORDER]], dtype=np.float64))
+    code = int(codes[0])
+    return LABELS[code], CONFIDENCES[code], RECOMMENDATIONS[code]
@@ -2,7 +2,9 @@
 import numpy as np
 import cv2
 
-def extract_features(image_rgb, leaf_mask, lesion_mask, lesion_contours):
+from .hue_index import HUE_BINS, hue_histogram_features
+
+def extract_features(image_rgb, leaf_mask, lesion_mask, lesion_contours, hsv=None):
     """
     Ekstrak fitur berbasis threshold (sesuai PDF):
         1. median_hue (lesion)
@@ -10,33 +12,33 @@ def extract_features(image_rgb, leaf_mask, lesion_mask, lesion_contours):
         3. lesion_area_ratio
         4. num_lesions
         5. avg_circularity
+    lesion_contours: tabel lesi (LESION_DTYPE dari detect_lesions) atau list kontur OpenCV.
+    hsv: plane HSV yang sudah dihitung (opsional) agar tidak dikonversi ulang.
+    leaf_mask / lesion_mask: mask uint8 (0/255) seukuran citra.
     """
     features = {}
 
-    # 1. Median Hue lesi
-    hsv = cv2.cvtColor(image_rgb, cv2.COLOR_RGB2HSV)
-    hue_channel = hsv[:, :, 0]  # Hue: 0-179 (OpenCV)
-    lesion_pixels = hue_channel[lesion_mask > 0]
-    features['median_hue'] = np.median(lesion_pixels) if len(lesion_pixels) > 0 else 0.0
-
-    # 2. Entropy dari histogram Hue lesi (lebih ringan & robust daripada GLCM)
-    if len(lesion_pixels) > 0:
-        hist, _ = np.histogram(lesion_pixels, bins=32, range=(0, 180))
-        hist = hist / (hist.sum() + 1e-6)
-        entropy = -np.sum(hist * np.log2(hist + 1e-10))
-        features['entropy'] = float(entropy)
-    else:
-        features['entropy'] = 0.0
+    # 1-2. Median Hue & entropi lesi dari histogram Hue ber-mask (calcHist) — tanpa
+    # menyalin piksel lesi; hasil setara np.median / np.histogram 32 bin atas piksel tsb.
+    if hsv is None:
+        hsv = cv2.cvtColor(image_rgb, cv2.COLOR_RGB2HSV)
+    hist = cv2.calcHist([hsv], [0], lesion_mask, [HUE_BINS], [0, HUE_BINS]).ravel().astype(np.int64)
+    features.update(hue_histogram_features(hist))
 
     # 3. Rasio luas lesi / daun
-    leaf_area = np.sum(leaf_mask > 0)
-    lesion_area = np.sum(lesion_mask > 0)
+    leaf_area = cv2.countNonZero(leaf_mask)
+    lesion_area = int(hist.sum())
     features['lesion_area_ratio'] = lesion_area / leaf_area if leaf_area > 0 else 0.0
 
     # 4. Jumlah lesi
     features['num_lesions'] = len(lesion_contours)
 
     # 5. Rata-rata circularity
+    if isinstance(lesion_contours, np.ndarray) and lesion_contours.dtype.names:
+        circ = lesion_contours['circularity'][lesion_contours['perimeter'] > 0]
+        features['avg_circularity'] = float(np.mean(circ, dtype=np.float64)) if circ.size else 0.0
+        return features
+
     circularities = []
     for c in lesion_contours:
         area = cv2.contourArea(c)
@@ -0,0 +1,116 @@
+# src/core/hue_index.py
+import numpy as np
+
+HUE_BINS = 180          # Hue OpenCV: 0-179
+ENTROPY_BINS = 32       # sama seperti histogram entropi di extract_features
+
+
+def hue_histogram_features(hist):
+    """
+    median_hue & entropy (seperti extract_features) dari histogram Hue 180 bin
+    piksel lesi — tanpa perlu menyimpan pikselnya (mis. diakumulasi per tile).
+    """
+    hist = np.asarray(hist)
+    n = int(hist.sum())
+    if n == 0:
+        return {'median_hue': 0.0, 'entropy': 0.0}
+    cumsum = np.concatenate(([0], np.cumsum(hist)))
+    v1 = np.searchsorted(cumsum, (n - 1) // 2, side='right') - 1
+    v2 = np.searchsorted(cumsum, n // 2, side='right') - 1
+    bin_start = np.searchsorted((np.arange(HUE_BINS) * ENTROPY_BINS) // HUE_BINS, np.arange(ENTROPY_BINS))
+    coarse = np.add.reduceat(hist[:HUE_BINS], bin_start)
+    p = coarse / (coarse.sum() + 1e-6)
+    return {'median_hue': (v1 + v2) / 2.0, 'entropy': float(-np.sum(p * np.log2(p + 1e-10)))}
+
+
+class HueIndex:
+    """
+    Indeks Hue per citra, dibangun sekali dari plane Hue di dalam mask daun:
+        - hist      : histogram 180 bin piksel daun
+        - cumsum    : jumlah kumulatif hist (panjang 181, cumsum[0] = 0)
+        - pixel_idx : indeks flat piksel daun, diurutkan menurut Hue — piksel
+                      untuk jendela [hue_min, hue_max] adalah satu irisan kontigu.
+    Statistik jendela (rasio luas, median Hue, entropi) dihitung dari cumsum
+    tanpa memindai piksel. Catatan: nilainya setara threshold mentah
+    (inRange ∩ mask daun) sebelum opening morfologi di detect_lesions.
+    """
+
+    def __init__(self, hue_channel, leaf_mask):
+        self.shape = hue_channel.shape[:2]
+        leaf_idx = np.flatnonzero(leaf_mask)
+        hues = hue_channel.ravel()[leaf_idx]
+        order = np.argsort(hues, kind='stable')
+        self.pixel_idx = leaf_idx[order]
+        self.hist = np.bincount(hues, minlength=HUE_BINS)[:HUE_BINS]
+        self.cumsum = np.concatenate(([0], np.cumsum(self.hist)))
+        self.leaf_area = int(leaf_idx.size)
+
+        # Batas hue tiap bin entropi: bin j = [lo_j, hi_j]
+        bin_of_hue = (np.arange(HUE_BINS) * ENTROPY_BINS) // HUE_BINS
+        self._bin_lo = np.searchsorted(bin_of_hue, np.arange(ENTROPY_BINS), side='left')
+        self._bin_hi = np.searchsorted(bin_of_hue, np.arange(ENTROPY_BINS), side='right') - 1
+
+    @property
+    def nbytes(self):
+        return self.pixel_idx.nbytes + self.hist.nbytes + self.cumsum.nbytes
+
+    @classmethod
+    def from_hsv(cls, hsv, leaf_mask):
+        return cls(hsv[:, :, 0], leaf_mask)
+
+    def _windows(self, hue_min, hue_max):
+        lo = np.clip(np.asarray(hue_min, dtype=np.int64), 0, HUE_BINS - 1)
+        hi = np.clip(np.asarray(hue_max, dtype=np.int64), -1, HUE_BINS - 1)
+        hi = np.maximum(hi, lo - 1)   # jendela terbalik → kosong
+        return lo, hi
+
+    def count(self, hue_min, hue_max):
+        lo, hi = self._windows(hue_min, hue_max)
+        return self.cumsum[hi + 1] - self.cumsum[lo]
+
+    def sweep(self, hue_min, hue_max):
+        """
+        Statistik untuk banyak jendela sekaligus (array hue_min/hue_max sebentuk).
+        Mengembalikan dict array: lesion_area_ratio, median_hue, entropy, count.
+        """
+        lo, hi = self._windows(hue_min, hue_max)
+        lo, hi = np.atleast_1d(lo), np.atleast_1d(hi)
+        base = self.cumsum[lo]
+        n = self.cumsum[hi + 1] - base
+
+        # Median: nilai pada posisi (n-1)//2 dan n//2 di dalam jendela (seperti np.median)
+        nz = n > 0
+        k1 = base + np.where(nz, (n - 1) // 2, 0)
+        k2 = base + np.where(nz, n // 2, 0)
+        v1 = np.searchsorted(self.cumsum, k1, side='right') - 1
+        v2 = np.searchsorted(self.cumsum, k2, side='right') - 1
+        median = np.where(nz, (v1 + v2) / 2.0, 0.0)
+
+        # Entropi: histogram 32 bin dari irisan jendela tiap bin
+        b_lo = np.maximum(lo[:, None], self._bin_lo[None, :])
+        b_hi = np.minimum(hi[:, None], self._bin_hi[None, :])
+        counts = np.where(b_hi >= b_lo, self.cumsum[np.maximum(b_hi, b_lo - 1) + 1] - self.cumsum[b_lo], 0)
+        p = counts / (counts.sum(axis=1, keepdims=True) + 1e-6)
+        entropy = np.where(nz, -np.sum(p * np.log2(p + 1e-10), axis=1), 0.0)
+
+        ratio = n / self.leaf_area if self.leaf_area > 0 else np.zeros(n.shape)
+        return {'lesion_area_ratio': ratio, 'median_hue': median, 'entropy': entropy, 'count': n}
+
+    def stats(self, hue_min, hue_max):
+        """Statistik satu jendela, kunci sama dengan dict fitur extract_features."""
+        out = self.sweep([hue_min], [hue_max])
+        return {
+            'median_hue': float(out['median_hue'][0]),
+            'entropy': float(out['entropy'][0]),
+            'lesion_area_ratio': float(out['lesion_area_ratio'][0]),
+        }
+
+    def mask(self, hue_min, hue_max, out=None):
+        """Mask uint8 piksel daun dengan Hue di [hue_min, hue_max] (= inRange ∩ mask daun)."""
+        lo, hi = self._windows(hue_min, hue_max)
+        if out is None:
+            out = np.zeros(self.shape, dtype=np.uint8)
+        else:
+            out.fill(0)
+        out.ravel()[self.pixel_idx[self.cumsum[lo]:self.cumsum[hi + 1]]] = 255
+        return out
@@ -1,17 +1,79 @@
 import cv2
 import numpy as np
 
-def validate_leaf_image(image_path):
+# Gerbang awal berjalan pada thumbnail kecil (sisi terpanjang GATE_SIDE) — ambang blur
+# bergantung skala, jadi selalu diukur pada ukuran yang sama.
+GATE_SIDE = 160
+MIN_GREEN_RATIO = 0.10     # minimal 10% piksel hijau
+MIN_LEAF_AREA = 0.05       # kontur hijau terbesar minimal 5% bingkai
+MIN_SHARPNESS = 12.0       # varians Laplacian (grayscale, thumbnail) — di bawah ini dianggap buram
+MIN_BRIGHTNESS = 40        # rata-rata V (HSV) — di bawah ini terlalu gelap
+MAX_CLIPPED_RATIO = 0.40   # porsi piksel V >= 250 — di atas ini overexposed
+
+
+def _thumbnail(image_rgb, side=GATE_SIDE):
+    h, w = image_rgb.shape[:2]
+    scale = side / max(h, w)
+    if scale >= 1:
+        return image_rgb
+    return cv2.resize(image_rgb, (max(1, round(w * scale)), max(1, round(h * scale))), interpolation=cv2.INTER_AREA)
+
+
+def check_leaf_image(image_rgb, h_min=35, h_max=85, s_min=50, min_leaf_area=MIN_LEAF_AREA):
+    """
+    Gerbang penolakan murah sebelum pipeline penuh, pada thumbnail dari buffer yang sudah
+    di-decode: eksposur, rasio hijau, luas daun minimum dan ketajaman.
+    min_leaf_area: porsi bingkai minimum kontur hijau terbesar (mode multi-daun memakai
+    ambang lebih kecil — tiap daun di nampan hanya sebagian kecil bingkai).
+    Mengembalikan dict: ok, reason (None bila lolos), green_ratio, leaf_area, sharpness, brightness.
+    """
+    thumb = _thumbnail(image_rgb)
+    hsv = cv2.cvtColor(thumb, cv2.COLOR_RGB2HSV)
+    value = hsv[..., 2]
+    total = value.size
+    check = {'ok': False, 'reason': None, 'green_ratio': 0.0, 'leaf_area': 0.0, 'sharpness': 0.0,
+             'brightness': float(value.mean())}
+
+    # Eksposur dulu: foto gelap / silau juga gagal uji hijau, tetapi alasannya berbeda
+    if check['brightness'] < MIN_BRIGHTNESS:
+        check['reason'] = 'terlalu gelap'
+        return check
+    if np.count_nonzero(value >= 250) / total > MAX_CLIPPED_RATIO:
+        check['reason'] = 'terlalu terang (overexposed)'
+        return check
+
+    # Rentang hijau: Hue h_min-h_max, Saturation > s_min
+    green_mask = cv2.inRange(hsv, (h_min, s_min, 30), (h_max, 255, 255))
+    check['green_ratio'] = cv2.countNonZero(green_mask) / total
+    if check['green_ratio'] <= MIN_GREEN_RATIO:
+        check['reason'] = f"bukan citra daun (area hijau < {MIN_GREEN_RATIO:.0%})"
+        return check
+
+    contours, _ = cv2.findContours(green_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    check['leaf_area'] = max((cv2.contourArea(c) for c in contours), default=0.0) / total
+    if check['leaf_area'] < min_leaf_area:
+        check['reason'] = f"daun terlalu kecil (< {min_leaf_area:.0%} bingkai)"
+        return check
+
+    gray = cv2.cvtColor(thumb, cv2.COLOR_RGB2GRAY)
+    check['sharpness'] = float(cv2.Laplacian(gray, cv2.CV_32F).var())
+    if check['sharpness'] < MIN_SHARPNESS:
+        check['reason'] = 'citra buram'
+        return check
+
+    check['ok'] = True
+    return check
+
+
+def validate_leaf_image(image):
     """
-    Validasi sederhana: cek apakah gambar mengandung area hijau dominan.
+    Validasi sederhana: cek apakah gambar layak dianalisis (lihat check_leaf_image).
     Tidak pakai model AI.
+    image: path file, atau array RGB yang sudah di-decode (dipakai ulang, tanpa baca ulang disk).
     """
-    img = cv2.imread(image_path)
-    if img is None:
-        return False
-    
-    hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
-    # Rentang hijau: Hue 35-85, Saturation > 50
-    green_mask = cv2.inRange(hsv, (35, 50, 30), (85, 255, 255))
-    green_ratio = cv2.countNonZero(green_mask) / green_mask.size
-    return green_ratio > 0.1  # Minimal 10% hijau
\ No newline at end of file
+    if not isinstance(image, np.ndarray):
+        img = cv2.imread(image)
+        if img is None:
+            return False
+        image = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+    return check_leaf_image(image)['ok']
@@ -2,29 +2,149 @@
 import cv2
 import numpy as np
 
-def detect_lesions(image_rgb, leaf_mask, hue_min=0, hue_max=40, min_area=150):
+from .workspace import buffer, copy_image, region
+
+# Tabel statistik per lesi (satu baris per komponen terhubung)
+LESION_DTYPE = np.dtype([
+    ('id', np.int32),                   # label komponen terhubung
+    ('x', np.int32), ('y', np.int32),   # bounding box
+    ('w', np.int32), ('h', np.int32),
+    ('area', np.float32),               # cv2.contourArea kontur luar
+    ('perimeter', np.float32),          # cv2.arcLength(kontur luar, True)
+    ('circularity', np.float32),        # 4π·area / perimeter²
+    ('cx', np.float32), ('cy', np.float32),
+    ('mean_hue', np.float32),           # rata-rata Hue piksel lesi (0 jika hue tidak diberikan)
+])
+
+_KERNEL = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
+
+
+def measure_lesions(lesion_mask, min_area=150, hue_channel=None, workspace=None):
+    """
+    Statistik semua lesi via connectedComponentsWithStats (bbox, centroid, jumlah piksel) + NumPy.
+    area & perimeter diambil dari cv2.contourArea / cv2.arcLength atas kontur luar tiap
+    komponen (findContours pada ROI bbox-nya), sehingga filter min_area & circularity identik
+    dengan versi berbasis cv2.findContours pada seluruh mask. Kontur hanya dicari untuk
+    komponen dengan jumlah piksel >= min_area (luas poligon kontur selalu < jumlah piksel).
+    Hanya bounding box area lesi yang diproses. Mengembalikan tabel LESION_DTYPE;
+    mean_hue diisi bila hue_channel (plane Hue sebesar mask) diberikan.
+    workspace: Workspace opsional untuk buffer ROI (mask, label) yang dipakai ulang.
+    """
+    x0, y0, w, h = cv2.boundingRect(lesion_mask)
+    if w == 0 or h == 0:
+        return np.zeros(0, dtype=LESION_DTYPE)
+
+    # Kontur luar mengabaikan lubang → isi lubang dulu (flood fill latar dari tepi); fg = 0/1
+    shape = (h + 2, w + 2)
+    fg = cv2.copyMakeBorder(lesion_mask[y0:y0 + h, x0:x0 + w], 1, 1, 1, 1, cv2.BORDER_CONSTANT,
+                            dst=region(workspace, 'lesion_fg', shape), value=0)
+    cv2.min(fg, 1, dst=fg)
+    px = np.flatnonzero(fg) if hue_channel is not None else None  # piksel lesi sebenarnya (sebelum isi lubang)
+    cv2.floodFill(fg, None, (0, 0), 2)
+    cv2.compare(fg, 2, cv2.CMP_NE, dst=fg)
+    cv2.bitwise_and(fg, 1, dst=fg)
+
+    labels = region(workspace, 'lesion_labels', shape, np.int32)
+    n, labels, stats, centroids = cv2.connectedComponentsWithStats(fg, labels=labels, connectivity=8,
+                                                                   ltype=cv2.CV_32S)
+    if n <= 1:
+        return np.zeros(0, dtype=LESION_DTYPE)
+
+    candidates = np.flatnonzero(stats[1:, cv2.CC_STAT_AREA] >= min_area) + 1  # label 0 = latar
+    area = np.zeros(n, dtype=np.float64)
+    perimeter = np.zeros(n, dtype=np.float64)
+    for i, (cx, cy, cw, ch) in zip(candidates.tolist(), stats[candidates, :4].tolist()):
+        component = (labels[cy:cy + ch, cx:cx + cw] == i).view(np.uint8)
+        contours, _ = cv2.findContours(component, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        contour = max(contours, key=cv2.contourArea)
+        area[i] = cv2.contourArea(contour)
+        perimeter[i] = cv2.arcLength(contour, True)
+    keep = candidates[area[candidates] >= min_area]
+
+    table = np.zeros(keep.size, dtype=LESION_DTYPE)
+    table['id'] = keep
+    table['x'] = stats[keep, cv2.CC_STAT_LEFT] + x0 - 1
+    table['y'] = stats[keep, cv2.CC_STAT_TOP] + y0 - 1
+    table['w'] = stats[keep, cv2.CC_STAT_WIDTH]
+    table['h'] = stats[keep, cv2.CC_STAT_HEIGHT]
+    table['area'] = area[keep]
+    table['perimeter'] = perimeter[keep]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        table['circularity'] = np.where(perimeter[keep] > 0, 4 * np.pi * area[keep] / perimeter[keep] ** 2, 0.0)
+    table['cx'] = centroids[keep, 0] + x0 - 1
+    table['cy'] = centroids[keep, 1] + y0 - 1
+
+    if hue_channel is not None and keep.size:
+        # Rata-rata Hue hanya dari piksel lesi sebenarnya (lubang yang diisi tidak ikut)
+        hue = region(workspace, 'lesion_hue', shape)
+        np.copyto(hue[1:-1, 1:-1], hue_channel[y0:y0 + h, x0:x0 + w])
+        lab = labels.ravel()[px]
+        hue_sum = np.bincount(lab, weights=hue.ravel()[px], minlength=n)
+        hue_cnt = np.bincount(lab, minlength=n)
+        table['mean_hue'] = hue_sum[keep] / np.maximum(hue_cnt[keep], 1)
+    return table
+
+
+def lesion_crops(image_rgb, lesions, top_n=6, pad_ratio=0.15):
+    """
+    Crop top-N lesi terbesar sebagai view (tanpa salinan piksel) dari image_rgb,
+    dengan margin pad_ratio × sisi terpanjang bounding box.
+    Mengembalikan (sub-tabel top-N terurut area menurun, list view crop).
+    """
+    if len(lesions) == 0:
+        return lesions[:0], []
+    top = lesions[np.argsort(lesions['area'], kind='stable')[::-1][:top_n]]
+    img_h, img_w = image_rgb.shape[:2]
+    pad = (pad_ratio * np.maximum(top['w'], top['h'])).astype(int)
+    x1 = np.maximum(top['x'] - pad, 0)
+    y1 = np.maximum(top['y'] - pad, 0)
+    x2 = np.minimum(top['x'] + top['w'] + pad, img_w)
+    y2 = np.minimum(top['y'] + top['h'] + pad, img_h)
+    crops = [image_rgb[a:b, c:d] for a, b, c, d in zip(y1.tolist(), y2.tolist(), x1.tolist(), x2.tolist())]
+    return top, crops
+
+
+def detect_lesions(image_rgb, leaf_mask, hue_min=0, hue_max=40, min_area=150,
+                   hsv=None, draw_overlay=True, workspace=None, lesion_thresh=None):
+    """
+    Deteksi lesi berbasis rentang Hue di dalam mask daun.
+    Mengembalikan (lesion_mask, lesions, overlay); lesions = tabel LESION_DTYPE
+    (hanya lesi dengan area >= min_area).
+    hsv: plane HSV yang sudah dihitung (opsional) agar tidak dikonversi ulang.
+    draw_overlay=False → overlay dikembalikan sebagai None (jalur headless).
+    workspace: Workspace opsional — threshold, mask lesi & overlay ditulis ke buffer yang
+    dipakai ulang (ditimpa oleh citra berikutnya); tabel lesi selalu array baru.
+    lesion_thresh: threshold mentah (inRange ∩ mask daun) yang sudah ada, mis. dari
+    HueIndex.mask(hue_min, hue_max) — inRange tidak dihitung ulang.
+    """
+    h, w = image_rgb.shape[:2]
     if leaf_mask is None or not leaf_mask.any():
-        h, w = image_rgb.shape[:2]
-        lesion_mask = np.zeros((h, w), dtype=np.uint8)
-        return lesion_mask, [], image_rgb.copy()
+        lesion_mask = np.zeros((h, w), dtype=np.uint8) if workspace is None else workspace.zeros('lesion_mask', (h, w))
+        overlay = copy_image(workspace, 'lesion_overlay', image_rgb) if draw_overlay else None
+        return lesion_mask, np.zeros(0, dtype=LESION_DTYPE), overlay
 
-    hsv = cv2.cvtColor(image_rgb, cv2.COLOR_RGB2HSV)
+    if hsv is None:
+        hsv = cv2.cvtColor(image_rgb, cv2.COLOR_RGB2HSV, dst=buffer(workspace, 'hsv', image_rgb.shape))
     hue_channel = hsv[:, :, 0]
-    lesion_thresh = cv2.inRange(hue_channel, hue_min, hue_max)
-    lesion_thresh = cv2.bitwise_and(lesion_thresh, lesion_thresh, mask=leaf_mask)
+    if lesion_thresh is None:
+        lesion_thresh = cv2.inRange(hue_channel, hue_min, hue_max, dst=buffer(workspace, 'lesion_thresh', (h, w)))
+        # Mask daun bernilai 0/255 → AND biasa setara bitwise_and(..., mask=leaf_mask), bisa in-place
+        cv2.bitwise_and(lesion_thresh, leaf_mask, dst=lesion_thresh)
+
+    lesion_mask = cv2.morphologyEx(lesion_thresh, cv2.MORPH_OPEN, _KERNEL,
+                                   dst=buffer(workspace, 'lesion_mask', (h, w)))
 
-    kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
-    lesion_mask = cv2.morphologyEx(lesion_thresh, cv2.MORPH_OPEN, kernel)
+    lesions = measure_lesions(lesion_mask, min_area, hue_channel, workspace)
 
-    contours, _ = cv2.findContours(lesion_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-    lesion_contours = [c for c in contours if cv2.contourArea(c) >= min_area]
+    if not draw_overlay:
+        return lesion_mask, lesions, None
 
-    # Gambar LINGKARAN MERAH di sekitar setiap lesi
-    overlay = image_rgb.copy()
-    for cnt in lesion_contours:
-        (x, y), radius = cv2.minEnclosingCircle(cnt)
-        center = (int(x), int(y))
-        radius = max(int(radius), 5)
-        cv2.circle(overlay, center, radius, (255, 0, 0), 2)  # Lingkaran merah, ketebalan 2
+    # Gambar LINGKARAN MERAH di sekitar setiap lesi (pusat & radius dari bounding box)
+    overlay = copy_image(workspace, 'lesion_overlay', image_rgb)
+    centers_x = (lesions['x'] + lesions['w'] / 2.0).astype(int)
+    centers_y = (lesions['y'] + lesions['h'] / 2.0).astype(int)
+    radii = np.maximum((np.hypot(lesions['w'], lesions['h']) / 2.0).astype(int), 5)
+    for x, y, r in zip(centers_x.tolist(), centers_y.tolist(), radii.tolist()):
+        cv2.circle(overlay, (x, y), r, (255, 0, 0), 2)  # Lingkaran merah, ketebalan 2
 
-    return lesion_mask, lesion_contours, overlay
\ No newline at end of file
+    return lesion_mask, lesions, overlay
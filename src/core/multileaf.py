@@ -0,0 +1,121 @@
+# src/core/multileaf.py
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from .classifier import (CONFIDENCES, LABEL_UNDETECTED, LABELS, RECOMMENDATIONS,
+                         classify_batch, feature_matrix)
+from .feature_extraction import extract_features
+from .lesion_detection import detect_lesions
+from .pipeline import DEFAULT_LESION_PARAMS, DEFAULT_SEG_PARAMS
+from .profiling import StageProfiler, profile_stage
+from .segmentation import find_leaves
+
+MIN_AREA_RATIO = 0.002   # ambang luas per daun (porsi bingkai) — nampan berisi puluhan daun kecil
+ROI_PAD = 4             # ≥ radius erosi + dilasi opening lesi 5x5 → hasil ROI = hasil full-frame
+LEAF_COLORS = ((0, 255, 0), (255, 160, 0), (255, 0, 0))   # warna kontur per kode label (RGB)
+
+
+def analyze_roi(image_rgb, contour, lesion_params=None, hsv=None):
+    """
+    Lesi + fitur satu daun pada ROI bounding box-nya (view, tanpa salin citra).
+    hsv: plane HSV seluruh bingkai (opsional); tanpa itu hanya ROI yang dikonversi.
+    Mengembalikan dict: bbox, contour, leaf_area, lesion_area, lesions (koordinat bingkai), features.
+    """
+    lesion_params = {**DEFAULT_LESION_PARAMS, **(lesion_params or {})}
+    img_h, img_w = image_rgb.shape[:2]
+    x, y, w, h = cv2.boundingRect(contour)
+    x0, y0 = max(0, x - ROI_PAD), max(0, y - ROI_PAD)
+    x1, y1 = min(img_w, x + w + ROI_PAD), min(img_h, y + h + ROI_PAD)
+    roi = (slice(y0, y1), slice(x0, x1))
+    roi_hsv = cv2.cvtColor(image_rgb[roi], cv2.COLOR_RGB2HSV) if hsv is None else hsv[roi]
+
+    leaf_mask = np.zeros((y1 - y0, x1 - x0), dtype=np.uint8)
+    cv2.drawContours(leaf_mask, [contour], -1, 255, thickness=cv2.FILLED, offset=(-x0, -y0))
+    lesion_mask, lesions, _ = detect_lesions(image_rgb[roi], leaf_mask, hsv=roi_hsv, draw_overlay=False,
+                                             **lesion_params)
+    features = extract_features(image_rgb[roi], leaf_mask, lesion_mask, lesions, hsv=roi_hsv)
+    lesions['x'] += x0
+    lesions['y'] += y0
+    lesions['cx'] += x0
+    lesions['cy'] += y0
+    return {'bbox': (x, y, w, h), 'contour': contour, 'leaf_area': cv2.countNonZero(leaf_mask),
+            'lesion_area': cv2.countNonZero(lesion_mask), 'lesions': lesions, 'features': features}
+
+
+def aggregate_leaves(leaves):
+    """
+    Ringkasan satu bingkai dari hasil per daun: jumlah daun per label, porsi daun sakit,
+    rasio lesi gabungan (total piksel lesi / total piksel daun) dan label keseluruhan —
+    label penyakit terbanyak (seri → luas lesi terbesar), atau Tidak Terdeteksi.
+    """
+    codes = np.array([leaf['code'] for leaf in leaves], dtype=np.int64)
+    lesion_area = np.array([leaf['lesion_area'] for leaf in leaves], dtype=np.int64)
+    leaf_area = sum(leaf['leaf_area'] for leaf in leaves)
+    counts = np.bincount(codes, minlength=len(LABELS))
+    diseased = int(len(codes) - counts[LABEL_UNDETECTED])
+
+    code = LABEL_UNDETECTED
+    if diseased:
+        disease_codes = [c for c in range(len(LABELS)) if c != LABEL_UNDETECTED]
+        code = max(disease_codes, key=lambda c: (counts[c], lesion_area[codes == c].sum()))
+    return {
+        'n_leaves': len(leaves),
+        'label_counts': {LABELS[c]: int(n) for c, n in enumerate(counts)},
+        'diseased_leaves': diseased,
+        'diseased_ratio': diseased / len(leaves) if leaves else 0.0,
+        'lesion_area_ratio': int(lesion_area.sum()) / leaf_area if leaf_area > 0 else 0.0,
+        'num_lesions': sum(len(leaf['lesions']) for leaf in leaves),
+        'label': LABELS[code],
+        'confidence': float(np.mean([leaf['confidence'] for leaf in leaves if leaf['code'] == code]))
+                      if counts[code] else CONFIDENCES[code],
+        'recommendation': RECOMMENDATIONS[code],
+    }
+
+
+def analyze_leaves(image_rgb, seg_params=None, lesion_params=None, max_leaves=None,
+                   max_workers=None, profiler=None):
+    """
+    Mode multi-daun: semua daun dicari sekali, tiap daun dianalisis pada ROI-nya (paralel),
+    lalu diklasifikasi sekaligus. Mengembalikan dict leaves (terurut luas menurun) dan aggregate.
+    """
+    seg_params = {'min_area_ratio': MIN_AREA_RATIO, **DEFAULT_SEG_PARAMS, **(seg_params or {})}
+    lesion_params = {**DEFAULT_LESION_PARAMS, **(lesion_params or {})}
+
+    with profile_stage(profiler, 'hsv') as record:
+        hsv = StageProfiler.add_output(record, cv2.cvtColor(image_rgb, cv2.COLOR_RGB2HSV))
+    with profile_stage(profiler, 'segment'):
+        contours = find_leaves(image_rgb, hsv=hsv, max_leaves=max_leaves, **seg_params)
+
+    with profile_stage(profiler, 'lesions'):
+        workers = min(len(contours), max_workers or min(4, os.cpu_count() or 1))
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                leaves = list(executor.map(lambda c: analyze_roi(image_rgb, c, lesion_params, hsv), contours))
+        else:
+            leaves = [analyze_roi(image_rgb, c, lesion_params, hsv) for c in contours]
+
+    with profile_stage(profiler, 'classify'):
+        codes, _ = classify_batch(feature_matrix([leaf['features'] for leaf in leaves]))
+        for i, (leaf, code) in enumerate(zip(leaves, codes.tolist()), start=1):
+            leaf.update(index=i, code=code, label=LABELS[code], confidence=CONFIDENCES[code],
+                        recommendation=RECOMMENDATIONS[code])
+        aggregate = aggregate_leaves(leaves)
+    return {'leaves': leaves, 'aggregate': aggregate}
+
+
+def draw_leaves(image_rgb, result):
+    """Overlay: kontur tiap daun berwarna sesuai label, nomor daun & lingkaran lesi."""
+    overlay = image_rgb.copy()
+    for leaf in result['leaves']:
+        color = LEAF_COLORS[leaf['code']]
+        cv2.drawContours(overlay, [leaf['contour']], -1, color, 2)
+        lesions = leaf['lesions']
+        radii = np.maximum((np.hypot(lesions['w'], lesions['h']) / 2.0).astype(int), 5)
+        for cx, cy, r in zip(lesions['cx'].astype(int).tolist(), lesions['cy'].astype(int).tolist(), radii.tolist()):
+            cv2.circle(overlay, (cx, cy), r, (255, 0, 0), 1)
+        x, y = leaf['bbox'][:2]
+        cv2.putText(overlay, str(leaf['index']), (x, max(12, y - 4)), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
+    return overlay
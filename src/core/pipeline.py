@@ -0,0 +1,128 @@
+# src/core/pipeline.py
+import cv2
+
+from .cache import freeze_params, image_hash
+from .segmentation import segment_leaf
+from .lesion_detection import detect_lesions, lesion_crops
+from .feature_extraction import extract_features
+from .classifier import classify_condition
+from .hue_index import HueIndex
+from .profiling import profile_stage
+from .workspace import buffer
+
+# Ukuran analisis standar (lebar, tinggi) — sama seperti tahap Resize di GUI
+ANALYSIS_SIZE = (640, 480)
+
+DEFAULT_SEG_PARAMS = {'h_min': 35, 'h_max': 85, 's_min': 50}
+DEFAULT_LESION_PARAMS = {'hue_min': 0, 'hue_max': 40, 'min_area': 150}
+
+
+def resize_for_analysis(image_rgb, size=ANALYSIS_SIZE, out=None):
+    """
+    Resize ke ukuran analysis (INTER_AREA). Tidak menyalin jika ukuran sudah sama.
+    out: buffer (tinggi, lebar, 3) yang dipakai ulang, mis. Workspace.get('resized', ...).
+    """
+    h, w = image_rgb.shape[:2]
+    if (w, h) == tuple(size):
+        return image_rgb
+    return cv2.resize(image_rgb, tuple(size), dst=out, interpolation=cv2.INTER_AREA)
+
+
+class LeafPipeline:
+    """
+    Pipeline analisis satu lintasan: HSV sekali → segmentasi → lesi → fitur → klasifikasi.
+    cache (StageCache) / workspace (Workspace) opsional, tidak dapat digabung; profiler mencatat tiap tahap.
+    """
+
+    def __init__(self, seg_params=None, lesion_params=None, draw_overlays=False, cache=None, profiler=None,
+                 workspace=None):
+        if cache is not None and workspace is not None:
+            raise ValueError("cache dan workspace tidak dapat dipakai bersamaan (buffer workspace ditimpa)")
+        self.seg_params = {**DEFAULT_SEG_PARAMS, **(seg_params or {})}
+        self.lesion_params = {**DEFAULT_LESION_PARAMS, **(lesion_params or {})}
+        self.draw_overlays = draw_overlays
+        self.cache = cache
+        self.profiler = profiler
+        self.workspace = workspace
+
+    def _cached(self, key, compute, record=None):
+        if record is not None:
+            inner = compute
+            compute = lambda: self.profiler.add_output(record, inner())
+        if self.cache is None:
+            return compute()
+        return self.cache.get_or_compute(key, compute)
+
+    def _stage(self, name, key, compute):
+        with profile_stage(self.profiler, name) as record:
+            return self._cached(key, compute, record if self.profiler is not None else None)
+
+    def prepare(self, image_rgb, image_key=None):
+        """Tahap awal: simpan citra dan konversi HSV satu kali."""
+        if self.cache is not None and image_key is None:
+            image_key = image_hash(image_rgb)
+        hsv = self._stage('hsv', (image_key, 'hsv'), lambda: {'hsv': cv2.cvtColor(
+            image_rgb, cv2.COLOR_RGB2HSV, dst=buffer(self.workspace, 'hsv', image_rgb.shape))})
+        return {'image': image_rgb, 'image_key': image_key, **hsv}
+
+    def segment(self, result):
+        def compute():
+            leaf_mask, leaf_contour, leaf_overlay = segment_leaf(
+                result['image'], hsv=result['hsv'], draw_overlay=self.draw_overlays,
+                workspace=self.workspace, **self.seg_params
+            )
+            return {'leaf_mask': leaf_mask, 'leaf_contour': leaf_contour, 'leaf_overlay': leaf_overlay}
+
+        key = (result['image_key'], 'segment', freeze_params(self.seg_params), self.draw_overlays)
+        result.update(self._stage('segment', key, compute))
+        return result
+
+    def detect(self, result):
+        def compute():
+            lesion_mask, lesions, lesion_overlay = detect_lesions(
+                result['image'], result['leaf_mask'], hsv=result['hsv'],
+                draw_overlay=self.draw_overlays, workspace=self.workspace, **self.lesion_params
+            )
+            return {'lesion_mask': lesion_mask, 'lesions': lesions, 'lesion_overlay': lesion_overlay}
+
+        key = (result['image_key'], 'detect', freeze_params(self.seg_params),
+               freeze_params(self.lesion_params), self.draw_overlays)
+        result.update(self._stage('lesions', key, compute))
+        return result
+
+    def crop(self, result, top_n=6):
+        """Crop top-N lesi terbesar sebagai view dari citra (di-resize hanya saat ditampilkan)."""
+        with profile_stage(self.profiler, 'crop'):
+            result['lesion_top'], result['lesion_crops'] = lesion_crops(result['image'], result['lesions'], top_n)
+        return result
+
+    def index(self, result):
+        """Bangun HueIndex dari plane Hue di dalam mask daun (untuk sweep threshold lesi)."""
+        key = (result['image_key'], 'hue_index', freeze_params(self.seg_params))
+        result['hue_index'] = self._stage('index', key, lambda: HueIndex.from_hsv(result['hsv'], result['leaf_mask']))
+        return result
+
+    def extract(self, result):
+        with profile_stage(self.profiler, 'features'):
+            result['features'] = extract_features(
+                result['image'], result['leaf_mask'], result['lesion_mask'], result['lesions'],
+                hsv=result['hsv']
+            )
+        return result
+
+    def classify(self, result):
+        with profile_stage(self.profiler, 'classify'):
+            label, conf, rec = classify_condition(result['features'])
+        result.update(label=label, confidence=conf, recommendation=rec)
+        return result
+
+    def run(self, image_rgb, image_key=None):
+        result = self.prepare(image_rgb, image_key)
+        for stage in (self.segment, self.detect, self.extract, self.classify):
+            stage(result)
+        return result
+
+
+def analyze_leaf(image_rgb, seg_params=None, lesion_params=None, draw_overlays=False, profiler=None):
+    """Jalan pintas: jalankan LeafPipeline sekali pada citra (sudah di-resize)."""
+    return LeafPipeline(seg_params, lesion_params, draw_overlays, profiler=profiler).run(image_rgb)
@@ -0,0 +1,102 @@
+# src/core/profiling.py
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+from .cache import _sizeof
+
+# Urutan tahap standar (GUI & batch); tahap lain tetap dicatat, ditaruh di belakang
+STAGES = ('decode', 'resize', 'validate', 'hsv', 'segment', 'lesions', 'crop', 'features', 'classify', 'display')
+
+
+class StageProfiler:
+    """
+    Pencatat waktu (ms, perf_counter) & byte per tahap, cukup ringan untuk selalu aktif.
+    Byte default = ukuran array keluaran tahap (diisi pemanggil lewat record['bytes'] /
+    add_output); trace_memory=True memakai puncak tracemalloc per tahap (lebih akurat,
+    NumPy ikut terlacak, tetapi memperlambat alokasi — untuk diagnosis saja).
+    Tahap yang dipanggil berulang dengan nama sama dijumlahkan. Penjumlahan & pembacaan
+    dikunci, sehingga satu profiler bisa diisi dari beberapa thread (mis. worker GUI & pratinjau).
+    """
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.records = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        record = {'ms': 0.0, 'bytes': 0}
+        started = False
+        if self.trace_memory:
+            started = not tracemalloc.is_tracing()
+            if started:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        t0 = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['ms'] = (time.perf_counter() - t0) * 1000.0
+            if self.trace_memory:
+                record['bytes'] = max(record['bytes'], tracemalloc.get_traced_memory()[1] - base)
+                if started:
+                    tracemalloc.stop()
+            with self._lock:
+                total = self.records.setdefault(name, {'ms': 0.0, 'bytes': 0})
+                total['ms'] += record['ms']
+                total['bytes'] += record['bytes']
+
+    @staticmethod
+    def add_output(record, value):
+        """Tambahkan ukuran array keluaran (ndarray / dict / list) ke record tahap."""
+        record['bytes'] += _sizeof(value)
+        return value
+
+    def snapshot(self):
+        """Salinan record per tahap (konsisten walau thread lain sedang mencatat)."""
+        with self._lock:
+            return {name: dict(r) for name, r in self.records.items()}
+
+    def total_ms(self):
+        return sum(r['ms'] for r in self.snapshot().values())
+
+    def ordered(self):
+        """List (nama, record) sesuai urutan STAGES, tahap tambahan di belakang."""
+        records = self.snapshot()
+        names = [s for s in STAGES if s in records] + [s for s in records if s not in STAGES]
+        return [(name, records[name]) for name in names]
+
+    def columns(self, stages=STAGES):
+        """Kolom datar untuk output batch: t_<tahap>_ms, mem_<tahap>_kb, t_total_ms."""
+        records = self.snapshot()
+        row = {}
+        for name in stages:
+            r = records.get(name, {'ms': 0.0, 'bytes': 0})
+            row[f't_{name}_ms'] = round(r['ms'], 3)
+            row[f'mem_{name}_kb'] = round(r['bytes'] / 1024.0, 1)
+        row['t_total_ms'] = round(sum(r['ms'] for r in records.values()), 3)
+        return row
+
+    def summary(self):
+        """Ringkasan satu baris, mis. untuk status bar."""
+        ordered = self.ordered()
+        parts = [f"{name} {r['ms']:.1f}" for name, r in ordered]
+        return f"{sum(r['ms'] for _, r in ordered):.0f} ms (" + ", ".join(parts) + ")"
+
+
+def profile_stage(profiler, name):
+    """Konteks tahap dari profiler, atau konteks kosong (record dibuang) bila profiler None."""
+    if profiler is None:
+        return nullcontext({'ms': 0.0, 'bytes': 0})
+    return profiler.stage(name)
+
+
+def stage_columns(stages=STAGES):
+    """Nama kolom yang dihasilkan StageProfiler.columns (urutan tetap untuk header CSV)."""
+    cols = []
+    for name in stages:
+        cols += [f't_{name}_ms', f'mem_{name}_kb']
+    return tuple(cols) + ('t_total_ms',)
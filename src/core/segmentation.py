@@ -1,7 +1,11 @@
 # src/core/segmentation.py
 import cv2
 import numpy as np
-from ..utils.helpers import overlay_contours
+
+from .workspace import buffer, copy_image
+
+_KERNEL = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (7, 7))
+
 
 def is_mango_leaf(contour):
     x, y, w, h = cv2.boundingRect(contour)
@@ -10,32 +14,63 @@ def is_mango_leaf(contour):
     aspect_ratio = w / h
     return 0.2 < aspect_ratio < 0.7
 
-def segment_leaf(image_rgb, h_min=35, h_max=85, s_min=50, v_min=20, min_area_ratio=0.01):
+
+def _leaf_candidates(image_rgb, h_min, h_max, s_min, v_min, min_area_ratio, hsv, workspace):
+    """Threshold HSV + close/open → (kontur luar, ambang luas minimum dalam piksel)."""
     h_img, w_img = image_rgb.shape[:2]
     min_area = max(int(h_img * w_img * min_area_ratio), 800)
-    hsv = cv2.cvtColor(image_rgb, cv2.COLOR_RGB2HSV)
+    if hsv is None:
+        hsv = cv2.cvtColor(image_rgb, cv2.COLOR_RGB2HSV, dst=buffer(workspace, 'hsv', image_rgb.shape))
     lower = np.array([h_min, s_min, v_min], dtype=np.uint8)
     upper = np.array([h_max, 255, 255], dtype=np.uint8)
-    mask = cv2.inRange(hsv, lower, upper)
-    
-    kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (7, 7))
-    mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
-    mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
-    
+    mask = cv2.inRange(hsv, lower, upper, dst=buffer(workspace, 'seg_thresh', (h_img, w_img)))
+
+    mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, _KERNEL, dst=buffer(workspace, 'seg_morph', (h_img, w_img)))
+    mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, _KERNEL, dst=buffer(workspace, 'seg_thresh', (h_img, w_img)))
+
     contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    return contours, min_area
+
+
+def segment_leaf(image_rgb, h_min=35, h_max=85, s_min=50, v_min=20, min_area_ratio=0.01,
+                 hsv=None, draw_overlay=True, workspace=None):
+    """
+    Segmentasi daun berbasis threshold HSV.
+    hsv: plane HSV yang sudah dihitung (opsional) agar tidak dikonversi ulang.
+    draw_overlay=False → overlay dikembalikan sebagai None (jalur headless).
+    workspace: Workspace opsional — mask threshold, morfologi, mask daun & overlay ditulis
+    ke buffer yang dipakai ulang (mask daun ditimpa oleh citra berikutnya).
+    """
+    h_img, w_img = image_rgb.shape[:2]
+    contours, min_area = _leaf_candidates(image_rgb, h_min, h_max, s_min, v_min, min_area_ratio, hsv, workspace)
+    leaf_mask = (np.zeros((h_img, w_img), dtype=np.uint8) if workspace is None
+                 else workspace.zeros('leaf_mask', (h_img, w_img)))
     if not contours:
-        leaf_mask = np.zeros((h_img, w_img), dtype=np.uint8)
-        overlay = image_rgb.copy()
-        return leaf_mask, None, overlay
+        return leaf_mask, None, copy_image(workspace, 'leaf_overlay', image_rgb) if draw_overlay else None
 
     valid_contours = [c for c in contours if cv2.contourArea(c) >= min_area and is_mango_leaf(c)]
     leaf_contour = max(valid_contours or contours, key=cv2.contourArea)
 
-    leaf_mask = np.zeros((h_img, w_img), dtype=np.uint8)
     cv2.drawContours(leaf_mask, [leaf_contour], -1, 255, thickness=cv2.FILLED)
-    
-    # Garis hijau tebal (ketebalan 3)
-    overlay = image_rgb.copy()
-    overlay = overlay_contours(overlay, [leaf_contour], color=(0, 255, 0), thickness=3)
-    
-    return leaf_mask, leaf_contour, overlay
\ No newline at end of file
+
+    # Garis hijau tebal (ketebalan 3) — cukup satu salinan citra
+    overlay = None
+    if draw_overlay:
+        overlay = copy_image(workspace, 'leaf_overlay', image_rgb)
+        cv2.drawContours(overlay, [leaf_contour], -1, (0, 255, 0), 3)
+
+    return leaf_mask, leaf_contour, overlay
+
+
+def find_leaves(image_rgb, h_min=35, h_max=85, s_min=50, v_min=20, min_area_ratio=0.01,
+                hsv=None, workspace=None, max_leaves=None):
+    """
+    Mode multi-daun: SEMUA kontur yang lolos is_mango_leaf & ambang luas (threshold HSV
+    sama dengan segment_leaf), terurut luas menurun, maks. max_leaves. Tanpa fallback ke
+    kontur terbesar — bisa kosong.
+    """
+    contours, min_area = _leaf_candidates(image_rgb, h_min, h_max, s_min, v_min, min_area_ratio, hsv, workspace)
+    areas = [cv2.contourArea(c) for c in contours]
+    leaves = [c for c, area in sorted(zip(contours, areas), key=lambda item: -item[1])
+              if area >= min_area and is_mango_leaf(c)]
+    return leaves[:max_leaves] if max_leaves else leaves
@@ -0,0 +1,244 @@
+# src/core/tiled.py
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from .classifier import classify_condition
+from .hue_index import HUE_BINS, hue_histogram_features
+from .lesion_detection import LESION_DTYPE, measure_lesions
+from .pipeline import DEFAULT_LESION_PARAMS, DEFAULT_SEG_PARAMS
+from .profiling import StageProfiler, profile_stage
+from .segmentation import segment_leaf
+
+SEG_MAX_SIDE = 640      # sisi terpanjang citra segmentasi (aspek dipertahankan)
+TILE_SIZE = 1024
+TILE_HALO = 8           # > radius erosi + dilasi opening 5x5, agar hasil tile = hasil full-frame
+_LESION_KERNEL = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
+
+
+def _lesion_region(image, leaf_contour, box, hue_min, hue_max):
+    """Threshold + opening region box (dengan halo) → (hue, daun, mask lesi) seukuran box."""
+    x0, y0, x1, y1 = box
+    # Halo dibatasi tepi citra (bukan bbox) agar erosi di tepi bbox sama dengan versi full-frame
+    img_h, img_w = image.shape[:2]
+    hx0, hy0 = max(0, x0 - TILE_HALO), max(0, y0 - TILE_HALO)
+    hx1, hy1 = min(img_w, x1 + TILE_HALO), min(img_h, y1 + TILE_HALO)
+
+    hue = cv2.cvtColor(image[hy0:hy1, hx0:hx1], cv2.COLOR_RGB2HSV)[:, :, 0]
+    leaf = np.zeros(hue.shape, dtype=np.uint8)
+    cv2.drawContours(leaf, [leaf_contour], -1, 255, thickness=cv2.FILLED, offset=(-hx0, -hy0))
+    thresh = cv2.inRange(hue, hue_min, hue_max)
+    thresh = cv2.bitwise_and(thresh, thresh, mask=leaf)
+    opened = cv2.morphologyEx(thresh, cv2.MORPH_OPEN, _LESION_KERNEL)
+
+    core = (slice(y0 - hy0, y1 - hy0), slice(x0 - hx0, x1 - hx0))
+    return hue[core], leaf[core], opened[core]
+
+
+def _offset(table, x0, y0):
+    table['x'] += x0
+    table['y'] += y0
+    table['cx'] += x0
+    table['cy'] += y0
+    return table
+
+
+def _process_tile(image, leaf_contour, bbox, box, hue_min, hue_max, min_area):
+    """
+    Satu tile: histogram Hue lesi, luas daun, tabel lesi yang selesai di dalam tile, dan
+    komponen yang menyentuh tepi antar-tile (belum lengkap) untuk digabung di _merge_seams.
+    """
+    x0, y0, x1, y1 = box
+    hue, leaf, lesion = _lesion_region(image, leaf_contour, box, hue_min, hue_max)
+    hist = np.bincount(hue[lesion > 0], minlength=HUE_BINS)
+
+    # Tepi tile yang berbatasan dengan tile lain (tepi bbox daun tidak perlu digabung)
+    inner = {'left': x0 > bbox[0], 'right': x1 < bbox[2], 'top': y0 > bbox[1], 'bottom': y1 < bbox[3]}
+    strips = {'left': np.s_[:, 0], 'right': np.s_[:, -1], 'top': np.s_[0, :], 'bottom': np.s_[-1, :]}
+    seams, boxes = {}, {}
+    # Komponen yang terpotong tepi antar-tile: flood fill (tetangga-8) dari piksel tepinya
+    # menghapusnya dari mask tile (diukur utuh di _measure_group); strip tepi menyimpan
+    # nomor komponen per piksel untuk penggabungan, bbox dari rect flood fill
+    edge_px = {side: lesion[strip] > 0 for side, strip in strips.items() if inner[side]}
+    if any(px.any() for px in edge_px.values()):
+        seams = {side: np.zeros(px.size, dtype=np.int32) for side, px in edge_px.items()}
+        for side, px in edge_px.items():
+            for i in np.flatnonzero(px).tolist():
+                if seams[side][i]:
+                    continue
+                seed = {'left': (0, i), 'right': (x1 - x0 - 1, i), 'top': (i, 0), 'bottom': (i, y1 - y0 - 1)}[side]
+                _, _, _, (rx, ry, rw, rh) = cv2.floodFill(lesion, None, seed, 0, flags=8)
+                label = len(boxes) + 1
+                boxes[label] = (x0 + rx, y0 + ry, x0 + rx + rw, y0 + ry + rh)
+                for other, other_px in edge_px.items():
+                    seams[other][other_px & (lesion[strips[other]] == 0) & (seams[other] == 0)] = label
+    # Komponen yang selesai di dalam tile diukur langsung
+    lesions = _offset(measure_lesions(lesion, min_area, hue), x0, y0)
+    return hist, cv2.countNonZero(leaf), lesions, seams, boxes
+
+
+def _seam_pairs(a, b):
+    """Pasangan label (a, b) yang bersentuhan (tetangga-8) di dua strip piksel yang berhadapan."""
+    pairs = [np.stack([a, b], axis=1), np.stack([a[:-1], b[1:]], axis=1), np.stack([a[1:], b[:-1]], axis=1)]
+    pairs = np.concatenate(pairs)
+    pairs = pairs[(pairs[:, 0] > 0) & (pairs[:, 1] > 0)]
+    return np.unique(pairs, axis=0).tolist()
+
+
+def _merge_seams(grid, tiles):
+    """
+    Gabungkan komponen terbuka antar tile (union-find atas (tile, label), termasuk sudut diagonal).
+    Mengembalikan list grup: (bbox gabungan x0, y0, x1, y1, satu piksel anggota (x, y)).
+    """
+    parent = {}
+
+    def find(key):
+        while parent[key] != key:
+            parent[key] = parent[parent[key]]
+            key = parent[key]
+        return key
+
+    for key, tile in tiles.items():
+        for label in tile['boxes']:
+            parent[(key, label)] = (key, label)
+
+    def union(ka, la, kb, lb):
+        ra, rb = find((ka, la)), find((kb, lb))
+        if ra != rb:
+            parent[rb] = ra
+
+    for (iy, ix), tile in tiles.items():
+        right, below = tiles.get((iy, ix + 1)), tiles.get((iy + 1, ix))
+        if right is not None:
+            for la, lb in _seam_pairs(tile['seams']['right'], right['seams']['left']):
+                union((iy, ix), la, (iy, ix + 1), lb)
+        if below is not None:
+            for la, lb in _seam_pairs(tile['seams']['bottom'], below['seams']['top']):
+                union((iy, ix), la, (iy + 1, ix), lb)
+        # Sudut diagonal: piksel pojok bawah-kanan / bawah-kiri dengan pojok tile diagonal
+        diag = tiles.get((iy + 1, ix + 1))
+        if diag is not None and tile['seams']['bottom'][-1] and diag['seams']['top'][0]:
+            union((iy, ix), int(tile['seams']['bottom'][-1]), (iy + 1, ix + 1), int(diag['seams']['top'][0]))
+        diag = tiles.get((iy + 1, ix - 1))
+        if diag is not None and tile['seams']['bottom'][0] and diag['seams']['top'][-1]:
+            union((iy, ix), int(tile['seams']['bottom'][0]), (iy + 1, ix - 1), int(diag['seams']['top'][-1]))
+
+    groups = {}
+    for key, label in parent:
+        x0, y0, x1, y1 = tiles[key]['boxes'][label]
+        root = find((key, label))
+        if root in groups:
+            gx0, gy0, gx1, gy1, seed = groups[root]
+            groups[root] = (min(gx0, x0), min(gy0, y0), max(gx1, x1), max(gy1, y1), seed)
+        else:
+            groups[root] = (x0, y0, x1, y1, _seed(grid, tiles[key], key, label))
+    return list(groups.values())
+
+
+def _seed(grid, tile, key, label):
+    """Koordinat global satu piksel komponen terbuka (diambil dari strip tepinya)."""
+    tx0, ty0, tx1, ty1 = grid[key]
+    for side, strip in tile['seams'].items():
+        hit = np.flatnonzero(strip == label)
+        if hit.size:
+            i = int(hit[0])
+            return {'left': (tx0, ty0 + i), 'right': (tx1 - 1, ty0 + i),
+                    'top': (tx0 + i, ty0), 'bottom': (tx0 + i, ty1 - 1)}[side]
+    raise ValueError(f"komponen {label} tidak menyentuh tepi tile {key}")
+
+
+def _measure_group(image, leaf_contour, group, hue_min, hue_max, min_area):
+    """
+    Ukur satu lesi yang melintasi batas tile: mask lesi dihitung ulang hanya pada bbox-nya
+    (memori ~ ukuran lesi). Mengembalikan (tabel lesi, bbox komponen lain yang terkurung di
+    lubang lesi ini — pada versi full-frame komponen itu tidak dihitung sebagai lesi terpisah).
+    """
+    x0, y0, x1, y1, (sx, sy) = group
+    hue, _, lesion = _lesion_region(image, leaf_contour, (x0, y0, x1, y1), hue_min, hue_max)
+    n, labels, stats, _ = cv2.connectedComponentsWithStats(lesion, connectivity=8, ltype=cv2.CV_32S)
+    component = (labels == labels[sy - y0, sx - x0]).view(np.uint8)
+    table = _offset(measure_lesions(component, min_area, hue), x0, y0)
+    if not len(table) or n <= 2:
+        return table, set()
+
+    filled = cv2.copyMakeBorder(component, 1, 1, 1, 1, cv2.BORDER_CONSTANT, value=0)
+    cv2.floodFill(filled, None, (0, 0), 2)
+    enclosed = np.unique(labels[filled[1:-1, 1:-1] == 0])
+    enclosed = enclosed[enclosed > 0]
+    return table, {(x0 + int(stats[i, 0]), y0 + int(stats[i, 1]), int(stats[i, 2]), int(stats[i, 3]))
+                   for i in enclosed.tolist()}
+
+
+def analyze_leaf_highres(image_rgb, seg_params=None, lesion_params=None,
+                         tile_size=TILE_SIZE, max_workers=None, profiler=None):
+    """
+    Mode resolusi penuh untuk bercak kecil: segmentasi pada versi kecil, deteksi lesi per tile
+    di bbox daun (lesi yang melintasi batas tile digabung). min_area dalam piksel asli.
+    Mengembalikan dict leaf_contour, leaf_bbox, lesions, features, label, confidence, recommendation.
+    """
+    seg_params = {**DEFAULT_SEG_PARAMS, **(seg_params or {})}
+    lesion_params = {**DEFAULT_LESION_PARAMS, **(lesion_params or {})}
+    h, w = image_rgb.shape[:2]
+
+    scale = min(1.0, SEG_MAX_SIDE / max(h, w))
+    with profile_stage(profiler, 'resize') as record:
+        small = image_rgb if scale == 1.0 else StageProfiler.add_output(record, cv2.resize(
+            image_rgb, (max(1, round(w * scale)), max(1, round(h * scale))), interpolation=cv2.INTER_AREA))
+    with profile_stage(profiler, 'segment'):
+        _, small_contour, _ = segment_leaf(small, draw_overlay=False, **seg_params)
+
+    result = {'scale': scale, 'leaf_contour': None, 'leaf_bbox': None, 'lesions': np.zeros(0, dtype=LESION_DTYPE)}
+    hist = np.zeros(HUE_BINS, dtype=np.int64)
+    leaf_area = 0
+    if small_contour is not None:
+        with profile_stage(profiler, 'lesions'):
+            leaf_contour = np.round(small_contour.astype(np.float64) / scale).astype(np.int32)
+            x, y, bw, bh = cv2.boundingRect(leaf_contour)
+            bbox = (max(0, x), max(0, y), min(w, x + bw), min(h, y + bh))
+            grid = {(iy, ix): (tx, ty, min(tx + tile_size, bbox[2]), min(ty + tile_size, bbox[3]))
+                    for iy, ty in enumerate(range(bbox[1], bbox[3], tile_size))
+                    for ix, tx in enumerate(range(bbox[0], bbox[2], tile_size))}
+            hue_min, hue_max, min_area = lesion_params['hue_min'], lesion_params['hue_max'], lesion_params['min_area']
+
+            workers = max_workers or min(4, os.cpu_count() or 1)
+            tiles, tables = {}, []
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                parts = executor.map(
+                    lambda box: _process_tile(image_rgb, leaf_contour, bbox, box, hue_min, hue_max, min_area),
+                    grid.values())
+                for key, (tile_hist, tile_leaf, tile_lesions, seams, boxes) in zip(grid, parts):
+                    hist += tile_hist
+                    leaf_area += tile_leaf
+                    tables.append(tile_lesions)
+                    if boxes:
+                        tiles[key] = {'seams': seams, 'boxes': boxes}
+
+            # Lesi yang melintasi batas tile diukur ulang pada bbox-nya sendiri
+            enclosed = set()
+            for group in _merge_seams(grid, tiles):
+                table, inside = _measure_group(image_rgb, leaf_contour, group, hue_min, hue_max, min_area)
+                tables.append(table)
+                enclosed |= inside
+            lesions = np.concatenate(tables)
+            if enclosed:
+                keys = zip(lesions['x'].tolist(), lesions['y'].tolist(), lesions['w'].tolist(), lesions['h'].tolist())
+                lesions = lesions[[key not in enclosed for key in keys]]
+            lesions = lesions[np.lexsort((lesions['x'], lesions['y']))]
+            lesions['id'] = np.arange(1, len(lesions) + 1)
+            result.update(leaf_contour=leaf_contour, leaf_bbox=bbox, lesions=lesions)
+
+    lesions = result['lesions']
+    circ = lesions['circularity'][lesions['perimeter'] > 0]
+    with profile_stage(profiler, 'features'):
+        features = hue_histogram_features(hist)
+        features['lesion_area_ratio'] = hist.sum() / leaf_area if leaf_area > 0 else 0.0
+        features['num_lesions'] = len(lesions)
+        features['avg_circularity'] = float(np.mean(circ, dtype=np.float64)) if circ.size else 0.0
+        features = {k: features[k] for k in ('median_hue', 'entropy', 'lesion_area_ratio', 'num_lesions', 'avg_circularity')}
+
+    with profile_stage(profiler, 'classify'):
+        label, conf, rec = classify_condition(features)
+    result.update(features=features, label=label, confidence=conf, recommendation=rec)
+    return result
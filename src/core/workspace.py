@@ -0,0 +1,64 @@
+# src/core/workspace.py
+import numpy as np
+
+
+class Workspace:
+    """
+    Arena buffer yang dipakai ulang antar citra (satu per proses worker / thread).
+    Array hasil menunjuk ke buffer ini dan ditimpa oleh citra berikutnya.
+    """
+
+    def __init__(self):
+        self._buffers = {}
+
+    def get(self, name, shape, dtype=np.uint8):
+        """Buffer `name` (isi tidak ditentukan); dialokasikan ulang hanya bila shape/dtype berubah."""
+        shape = tuple(shape)
+        buf = self._buffers.get(name)
+        if buf is None or buf.shape != shape or buf.dtype != dtype:
+            buf = np.empty(shape, dtype=dtype)
+            self._buffers[name] = buf
+        return buf
+
+    def region(self, name, shape, dtype=np.uint8):
+        """
+        Array kontigu `shape` di awal buffer datar `name` yang hanya tumbuh — untuk ROI yang
+        ukurannya berubah tiap citra (mis. bounding box lesi) tanpa alokasi ulang.
+        """
+        size = int(np.prod(shape))
+        buf = self._buffers.get(name)
+        if buf is None or buf.dtype != dtype or buf.ndim != 1 or buf.size < size:
+            buf = np.empty(max(size, buf.size if buf is not None and buf.dtype == dtype else 0), dtype=dtype)
+            self._buffers[name] = buf
+        return buf[:size].reshape(shape)
+
+    def zeros(self, name, shape, dtype=np.uint8):
+        buf = self.get(name, shape, dtype)
+        buf.fill(0)
+        return buf
+
+    @property
+    def nbytes(self):
+        return sum(buf.nbytes for buf in self._buffers.values())
+
+    def __len__(self):
+        return len(self._buffers)
+
+
+def buffer(workspace, name, shape, dtype=np.uint8):
+    """Buffer dari workspace, atau None (OpenCV mengalokasikan sendiri) bila workspace None."""
+    return None if workspace is None else workspace.get(name, shape, dtype)
+
+
+def region(workspace, name, shape, dtype=np.uint8):
+    """Workspace.region, atau array baru bila workspace None."""
+    return np.empty(shape, dtype=dtype) if workspace is None else workspace.region(name, shape, dtype)
+
+
+def copy_image(workspace, name, image):
+    """image.copy(), atau salinan ke buffer workspace `name` (mis. dasar overlay)."""
+    if workspace is None:
+        return image.copy()
+    out = workspace.get(name, image.shape, image.dtype)
+    np.copyto(out, image)
+    return out
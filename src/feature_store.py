@@ -0,0 +1,327 @@
+# src/feature_store.py
+"""
+Dataset fitur kolumnar append-only (satu file .bin per kolom, dibaca via np.memmap).
+
+    python -m src.feature_store [--since 2026-01-01] [--until ...] [--label Jamur] [--by month]
+                                [--import-sqlite data/processed/results.sqlite]
+                                [--reclassify] [--export subset.npz]
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+from datetime import datetime
+
+import numpy as np
+
+from .core.classifier import FEATURE_ORDER, LABELS, classify_batch
+
+try:  # kunci antar proses penulis (POSIX); di platform lain hanya kunci antar thread
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+PROCESSED_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'processed')
+DEFAULT_FEATURES = os.path.join(PROCESSED_DIR, 'features')
+SCHEMA_VERSION = 1
+CHUNK_ROWS = 65536
+
+COLUMNS = {
+    'median_hue': np.dtype(np.float32),
+    'entropy': np.dtype(np.float32),
+    'lesion_area_ratio': np.dtype(np.float32),
+    'num_lesions': np.dtype(np.int32),
+    'avg_circularity': np.dtype(np.float32),
+    'label_code': np.dtype(np.int8),
+    'confidence': np.dtype(np.float32),
+    'timestamp': np.dtype('datetime64[s]'),
+    'image_hash': np.dtype('S32'),   # file_hash (blake2b-128, hex)
+    'param_hash': np.dtype('S16'),   # param_hash (blake2b-64, hex)
+}
+PERIODS = {'day': 'datetime64[D]', 'month': 'datetime64[M]', 'year': 'datetime64[Y]'}
+
+
+def _label_code(label):
+    return label if isinstance(label, (int, np.integer)) else LABELS.index(label)
+
+
+class FeatureStore:
+    """
+    Penulis & pembaca dataset fitur. Aman dipakai dari beberapa thread; antar proses penulis
+    dikunci dengan flock (POSIX). Baris di buffer baru terlihat pembaca setelah flush().
+    """
+
+    def __init__(self, directory=DEFAULT_FEATURES, chunk_rows=CHUNK_ROWS, readonly=False):
+        self.directory = directory
+        self.chunk_rows = chunk_rows
+        self.readonly = readonly
+        self._lock = threading.Lock()
+        schema_path = os.path.join(directory, 'schema.json')
+        schema = {'version': SCHEMA_VERSION, 'columns': {name: dtype.str for name, dtype in COLUMNS.items()}}
+        if os.path.exists(schema_path):
+            with open(schema_path, encoding='utf-8') as f:
+                existing = json.load(f)
+            if existing != schema:
+                raise ValueError(f"Skema dataset fitur di {directory} berbeda (versi {existing.get('version')})")
+        elif readonly:
+            raise FileNotFoundError(f"Dataset fitur tidak ditemukan: {directory}")
+        else:
+            os.makedirs(directory, exist_ok=True)
+            tmp = schema_path + '.tmp'
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(schema, f, indent=2)
+            os.replace(tmp, schema_path)
+        self._buffer = None if readonly else {name: np.zeros(chunk_rows, dtype) for name, dtype in COLUMNS.items()}
+        self._pending = 0
+
+    def _path(self, name):
+        return os.path.join(self.directory, f"{name}.bin")
+
+    def _committed(self):
+        """Jumlah baris lengkap di disk = kolom terpendek."""
+        sizes = []
+        for name, dtype in COLUMNS.items():
+            path = self._path(name)
+            sizes.append(os.path.getsize(path) // dtype.itemsize if os.path.exists(path) else 0)
+        return min(sizes)
+
+    # --- tulis ---------------------------------------------------------------------------
+
+    def append(self, features, label, confidence, image_hash, param_hash='', timestamp=None):
+        """Tambah satu baris (features: dict extract_features; label: teks LABELS atau kode)."""
+        if self.readonly:
+            raise ValueError("FeatureStore dibuka readonly")
+        with self._lock:
+            i = self._pending
+            buf = self._buffer
+            for name in FEATURE_ORDER:
+                buf[name][i] = features[name]
+            buf['label_code'][i] = _label_code(label)
+            buf['confidence'][i] = confidence
+            buf['timestamp'][i] = np.datetime64(timestamp or datetime.now(), 's')
+            buf['image_hash'][i] = image_hash
+            buf['param_hash'][i] = param_hash or ''
+            self._pending += 1
+            if self._pending == self.chunk_rows:
+                self._flush_locked()
+
+    def flush(self):
+        """Tulis baris di buffer ke file kolom (satu tulis per kolom)."""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._pending:
+            return
+        with open(os.path.join(self.directory, '.lock'), 'a') as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            # Pangkas ekor kolom yang lebih panjang dari baris lengkap (tulis sebelumnya terpotong)
+            rows = self._committed()
+            for name, dtype in COLUMNS.items():
+                path = self._path(name)
+                with open(path, 'ab') as f:
+                    if f.tell() != rows * dtype.itemsize:
+                        f.truncate(rows * dtype.itemsize)
+                    f.write(self._buffer[name][:self._pending].tobytes())
+        self._pending = 0
+
+    def close(self):
+        if not self.readonly:
+            self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- baca ----------------------------------------------------------------------------
+
+    def __len__(self):
+        """Baris yang sudah di disk (buffer yang belum di-flush tidak dihitung)."""
+        return self._committed()
+
+    def column(self, name, rows=None):
+        """Kolom sebagai np.memmap read-only (tanpa memuat ke RAM)."""
+        dtype = COLUMNS[name]
+        rows = self._committed() if rows is None else rows
+        if rows == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(self._path(name), dtype=dtype, mode='r', shape=(rows,))
+
+    def columns(self, names=None):
+        """dict nama → memmap, semua dengan jumlah baris sama."""
+        rows = self._committed()
+        return {name: self.column(name, rows) for name in (names or COLUMNS)}
+
+    def iter_chunks(self, names=None, chunk_rows=CHUNK_ROWS):
+        """Hasilkan (offset, dict nama → irisan memmap) per chunk_rows baris."""
+        cols = self.columns(names)
+        rows = len(next(iter(cols.values()))) if cols else 0
+        for start in range(0, rows, chunk_rows):
+            yield start, {name: col[start:start + chunk_rows] for name, col in cols.items()}
+
+    def select(self, label=None, since=None, until=None, min_ratio=None, max_ratio=None, param_hash=None,
+               latest=False, chunk_rows=CHUNK_ROWS):
+        """
+        Indeks baris (int64, urut) yang lolos filter — dihitung per chunk, hanya kolom filter dibaca.
+        label: teks (cocok sebagian, mis. 'Jamur') atau kode; since/until: 'YYYY-MM-DD[THH:MM:SS]'.
+        latest=True: hanya baris terakhir per (image_hash, param_hash).
+        """
+        code = None
+        if label is not None:
+            code = label if isinstance(label, int) else next(
+                (i for i, name in enumerate(LABELS) if str(label).lower() in name.lower()), -1)
+        names = ['timestamp', 'label_code', 'lesion_area_ratio', 'param_hash']
+        parts = []
+        for start, chunk in self.iter_chunks(names, chunk_rows):
+            keep = np.ones(len(chunk['timestamp']), dtype=bool)
+            if code is not None:
+                keep &= chunk['label_code'] == code
+            if since:
+                keep &= chunk['timestamp'] >= np.datetime64(since, 's')
+            if until:
+                keep &= chunk['timestamp'] < np.datetime64(until, 's')
+            if min_ratio is not None:
+                keep &= chunk['lesion_area_ratio'] >= min_ratio
+            if max_ratio is not None:
+                keep &= chunk['lesion_area_ratio'] <= max_ratio
+            if param_hash is not None:
+                keep &= chunk['param_hash'] == param_hash.encode()
+            parts.append(np.flatnonzero(keep) + start)
+        index = np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+        if latest and index.size:
+            # Kunci gabungan (hash citra + hash parameter); np.unique pada urutan terbalik → kemunculan terakhir
+            keys = np.char.add(self.column('image_hash')[index], self.column('param_hash')[index])
+            _, last = np.unique(keys[::-1], return_index=True)
+            index = np.sort(index[index.size - 1 - last])
+        return index.astype(np.int64)
+
+    def take(self, index, names=None):
+        """Salinan baris terpilih (dict nama → array) — hanya baris ini yang dibaca dari disk."""
+        cols = self.columns(names)
+        return {name: np.asarray(col[index]) for name, col in cols.items()}
+
+    def feature_matrix(self, index=None):
+        """Matriks N×5 float32 (FEATURE_ORDER) untuk classify_batch; index: array / slice, None = semua baris."""
+        cols = self.columns(FEATURE_ORDER)
+        index = slice(None) if index is None else index
+        return np.stack([np.asarray(cols[name][index], dtype=np.float32) for name in FEATURE_ORDER], axis=1)
+
+    def summary(self, by='month', index=None, chunk_rows=CHUNK_ROWS):
+        """
+        Tren per periode (day / month / year): jumlah baris per label & rata-rata rasio lesi.
+        index: baris terpilih (select); None = semua, diproses per chunk.
+        Mengembalikan list dict terurut periode: period, count, per label, mean_lesion_ratio.
+        """
+        unit = PERIODS[by]
+        counts, ratio_sum = {}, {}
+
+        def add(timestamps, codes, ratios):
+            periods = timestamps.astype(unit)
+            keys, inverse = np.unique(periods, return_inverse=True)
+            by_label = np.zeros((len(keys), len(LABELS)), dtype=np.int64)
+            np.add.at(by_label, (inverse, codes.astype(np.int64)), 1)
+            sums = np.bincount(inverse, weights=ratios.astype(np.float64), minlength=len(keys))
+            for key, row, total in zip(keys, by_label, sums):
+                counts[key] = counts.get(key, 0) + row
+                ratio_sum[key] = ratio_sum.get(key, 0.0) + total
+
+        names = ['timestamp', 'label_code', 'lesion_area_ratio']
+        if index is None:
+            for _, chunk in self.iter_chunks(names, chunk_rows):
+                add(chunk['timestamp'], chunk['label_code'], chunk['lesion_area_ratio'])
+        else:
+            cols = self.columns(names)
+            for start in range(0, len(index), chunk_rows):
+                part = index[start:start + chunk_rows]
+                add(cols['timestamp'][part], cols['label_code'][part], cols['lesion_area_ratio'][part])
+
+        result = []
+        for key in sorted(counts):
+            n = int(counts[key].sum())
+            result.append({'period': str(key), 'count': n,
+                           **{LABELS[c]: int(v) for c, v in enumerate(counts[key])},
+                           'mean_lesion_ratio': ratio_sum[key] / n if n else 0.0})
+        return result
+
+    def reclassify(self, index=None, rules=classify_batch, chunk_rows=CHUNK_ROWS):
+        """
+        Jalankan aturan (fungsi matriks N×5 → (kode, confidence), default classify_batch) pada
+        fitur tersimpan per chunk. Mengembalikan (kode baru int8, jumlah baris yang labelnya berubah).
+        """
+        rows = self._committed() if index is None else len(index)
+        codes = np.empty(rows, dtype=np.int8)
+        stored = self.column('label_code')
+        changed = 0
+        for start in range(0, rows, chunk_rows):
+            part = slice(start, start + chunk_rows) if index is None else index[start:start + chunk_rows]
+            new, _ = rules(self.feature_matrix(part))
+            codes[start:start + len(new)] = new
+            changed += int(np.count_nonzero(new != stored[part]))
+        return codes, changed
+
+    def export_npz(self, path, index=None):
+        """Simpan baris terpilih (atau semua) sebagai .npz terkompresi — untuk dibagikan / notebook."""
+        data = self.take(slice(None) if index is None else index)
+        np.savez_compressed(path, **data)
+
+    def import_results(self, store, chunk=4096):
+        """Isi dataset dari arsip ResultStore (mis. hasil lama sebelum dataset ini ada). Mengembalikan jumlah baris."""
+        count = 0
+        for rows in store.iter_summaries(chunk):
+            for row in rows:
+                self.append(row, row['label_code'], row['confidence'], row['image_hash'], row['param_hash'],
+                            datetime.fromisoformat(row['created_at']))
+            count += len(rows)
+        self.flush()
+        return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m src.feature_store', description='LeafHealthAI — dataset fitur')
+    parser.add_argument('--features', default=DEFAULT_FEATURES, help='Direktori dataset (default: data/processed/features)')
+    parser.add_argument('--import-sqlite', metavar='PATH', help='Tambahkan semua hasil dari arsip ResultStore ini dulu')
+    parser.add_argument('--label', help="Teks label, mis. 'Jamur' / 'Bakteri' / 'Tidak'")
+    parser.add_argument('--since', help='Tanggal awal (YYYY-MM-DD)')
+    parser.add_argument('--until', help='Tanggal akhir, eksklusif (YYYY-MM-DD)')
+    parser.add_argument('--min-ratio', type=float)
+    parser.add_argument('--max-ratio', type=float)
+    parser.add_argument('--latest', action='store_true', help='Hanya baris terakhir per citra & parameter')
+    parser.add_argument('--by', choices=tuple(PERIODS), default='month', help='Periode ringkasan tren')
+    parser.add_argument('--reclassify', action='store_true',
+                        help='Jalankan aturan klasifikasi saat ini pada fitur tersimpan & hitung label yang berubah')
+    parser.add_argument('--export', metavar='NPZ', help='Simpan baris terpilih ke file .npz')
+    args = parser.parse_args(argv)
+
+    if args.import_sqlite:
+        from .store import ResultStore
+
+        if not os.path.exists(args.import_sqlite):
+            parser.error(f"Arsip tidak ditemukan: {args.import_sqlite}")
+        with ResultStore(args.import_sqlite, readonly=True) as store, FeatureStore(args.features) as features:
+            print(f"✓ {features.import_results(store)} baris diimpor dari {args.import_sqlite}")
+    if not os.path.exists(os.path.join(args.features, 'schema.json')):
+        parser.error(f"Dataset fitur tidak ditemukan: {args.features}")
+
+    features = FeatureStore(args.features, readonly=True)
+    index = features.select(args.label, args.since, args.until, args.min_ratio, args.max_ratio, latest=args.latest)
+    filtered = any(v is not None for v in (args.label, args.since, args.until, args.min_ratio, args.max_ratio)) \
+        or args.latest
+    for row in features.summary(args.by, index if filtered else None):
+        counts = '  '.join(f"{label} {row[label]:6d}" for label in LABELS)
+        print(f"{row['period']:<10} {row['count']:8d} baris  {counts}  rasio lesi {row['mean_lesion_ratio']:.3f}")
+    if args.reclassify:
+        _, changed = features.reclassify(index if filtered else None)
+        print(f"ℹ️ aturan saat ini mengubah label {changed} dari {len(index)} baris")
+    if args.export:
+        features.export_npz(args.export, index)
+        print(f"✓ {len(index)} baris → {args.export}")
+    print(f"✓ {len(index)} dari {len(features)} baris")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
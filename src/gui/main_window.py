@@ -1,21 +1,23 @@
 # src/gui/main_window.py
 import tkinter as tk
 import os
-import tempfile
 import threading
 from tkinter import filedialog, messagebox
-from datetime import datetime
 from PIL import Image, ImageDraw, ImageTk
-import cv2
-import numpy as np
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 
-from ..core.segmentation import segment_leaf
-from ..core.lesion_detection import detect_lesions
-from ..core.feature_extraction import extract_features
-from ..core.classifier import classify_condition
-from ..utils.helpers import load_image, save_image
+from ..core.cache import StageCache, image_hash
+from ..core.leaf_validation import check_leaf_image
+from ..core.lesion_detection import lesion_crops
+from ..core.pipeline import ANALYSIS_SIZE, LeafPipeline, resize_for_analysis
+from ..core.profiling import StageProfiler
+from .preview import PreviewRenderer
+from .scheduler import AnalysisCancelled, LatestWinsScheduler
+from ..report import build_report
+from ..feature_store import FeatureStore
+from ..store import ResultStore, encode_thumbnail, file_hash, overlay_thumbnail, param_hash
+from ..utils.helpers import load_image, make_gallery
 
 
 class LeafHealthAIApp:
@@ -36,9 +38,37 @@ class LeafHealthAIApp:
         self.resized_rgb = None
         self.overlay_img = None
         self.crop_lesion = None
+        self.lesion_top = None
+        self.lesion_crops = []
         self.features = None
         self.prediction = None
         self.is_processing = False
+        # Satu worker analisis: permintaan terbaru menang, run usang dibatalkan di batas tahap
+        self.scheduler = LatestWinsScheduler(self._run_analysis,
+                                             on_idle=lambda: self.root.after(0, self._finish_processing))
+        # Cache tahap (resize, HSV, mask daun, mask lesi) per citra & parameter
+        self.stage_cache = StageCache()
+        self.image_key = None
+        self.hue_index = None
+        # Profil waktu & memori per tahap (decode dicatat saat upload, sisanya per analisis)
+        self.decode_record = None
+        self.profiler = None
+        self._timing_node = None   # node "Waktu per Tahap" di treeview fitur
+        self._timing_ms = None     # total yang terakhir ditampilkan
+        # Arsip hasil persisten (hash isi file + hash parameter); None jika tidak bisa dibuka
+        self.file_key = None
+        self.filename = None
+        try:
+            self.result_store = ResultStore()
+        except Exception as e:
+            print("ℹ️ Arsip hasil tidak aktif:", e)
+            self.result_store = None
+        # Dataset fitur kolumnar (tren musiman) — diisi bersama arsip
+        try:
+            self.feature_store = FeatureStore() if self.result_store is not None else None
+        except Exception as e:
+            print("ℹ️ Dataset fitur tidak aktif:", e)
+            self.feature_store = None
 
         self.setup_ui()
 
@@ -73,16 +103,19 @@ class LeafHealthAIApp:
         self.h_min_var = tk.IntVar(value=35)
         self.h_max_var = tk.IntVar(value=85)
         self.s_min_var = tk.IntVar(value=50)
-        self._add_slider(seg_frame, "Hue Min", self.h_min_var, 0, 179)
-        self._add_slider(seg_frame, "Hue Max", self.h_max_var, 0, 179)
-        self._add_slider(seg_frame, "Sat Min", self.s_min_var, 0, 255)
+        self._add_slider(seg_frame, "Hue Min", self.h_min_var, 0, 179, self._on_param_release)
+        self._add_slider(seg_frame, "Hue Max", self.h_max_var, 0, 179, self._on_param_release)
+        self._add_slider(seg_frame, "Sat Min", self.s_min_var, 0, 255, self._on_param_release)
 
         lesion_frame = ttk.Labelframe(control_frame, text="Deteksi Lesi (Hue)", padding=8)
         lesion_frame.pack(fill="x", pady=(0, 15))
         self.hue_min_var = tk.IntVar(value=0)
         self.hue_max_var = tk.IntVar(value=40)
-        self._add_slider(lesion_frame, "Hue Min", self.hue_min_var, 0, 179)
-        self._add_slider(lesion_frame, "Hue Max", self.hue_max_var, 0, 179)
+        self._add_slider(lesion_frame, "Hue Min", self.hue_min_var, 0, 179, self._on_param_release)
+        self._add_slider(lesion_frame, "Hue Max", self.hue_max_var, 0, 179, self._on_param_release)
+        # Pratinjau instan rasio/median/entropi lesi saat slider digeser (dari HueIndex)
+        self.hue_min_var.trace_add("write", self._preview_lesion_window)
+        self.hue_max_var.trace_add("write", self._preview_lesion_window)
 
         self.analyze_btn = ttk.Button(control_frame, text="Analisis Sekarang", bootstyle="primary", command=self.start_analysis, width=25)
         self.analyze_btn.pack(pady=10, ipady=5)
@@ -124,6 +157,7 @@ class LeafHealthAIApp:
             lbl = ttk.Label(col, text="Belum diproses", font=("Segoe UI", 8, "italic"), foreground="#777")
             lbl.pack(pady=1)
             self.stage_labels.append(lbl)
+        self.preview = PreviewRenderer(self.root, self.stage_canvases, on_rendered=self._on_preview_rendered)
 
         # Hasil diagnosa (panel kanan)
         result_frame = ttk.Labelframe(main_frame, text="Hasil Diagnosa", padding=10)
@@ -152,55 +186,91 @@ class LeafHealthAIApp:
         self.status_var = tk.StringVar(value="Siap. Upload citra daun untuk mulai.")
         ttk.Label(self.root, textvariable=self.status_var, font=("Segoe UI", 9), bootstyle="secondary", relief="sunken", anchor="w").pack(side="bottom", fill="x")
 
-    def _add_slider(self, parent, label, var, min_val, max_val):
+    def _add_slider(self, parent, label, var, min_val, max_val, on_release=None):
         frame = ttk.Frame(parent)
         frame.pack(fill="x", pady=4)
         ttk.Label(frame, text=label, font=("Segoe UI", 9)).pack(anchor="w")
         slider = ttk.Scale(frame, from_=min_val, to=max_val, variable=var, orient="horizontal")
         slider.pack(fill="x", pady=(2, 0))
-        slider.bind("<ButtonRelease-1>", lambda e: var.set(int(var.get())))
+        def release(e):
+            var.set(int(var.get()))
+            if on_release:
+                on_release()
+        slider.bind("<ButtonRelease-1>", release)
         ttk.Label(frame, textvariable=var, font=("Courier", 8), foreground="#666").pack(anchor="e")
 
-    def display_stage_image(self, stage_idx, img_rgb):
+    def _on_param_release(self):
+        # Analisis ulang otomatis setelah slider dilepas (hanya jika sudah pernah dianalisis);
+        # run lama dengan parameter usang dibatalkan, cache tahap membuat hanya tahap yang
+        # terdampak yang dihitung ulang.
+        if self.original_rgb is not None and (self.prediction is not None or self.is_processing):
+            self.start_analysis()
+
+    def _preview_lesion_window(self, *_):
+        if self.hue_index is None:
+            return
+        try:
+            hue_min, hue_max = int(self.hue_min_var.get()), int(self.hue_max_var.get())
+        except (tk.TclError, ValueError):
+            return
+        st = self.hue_index.stats(hue_min, hue_max)
+        self.status_var.set(
+            f"Pratinjau lesi Hue {hue_min}–{hue_max}: luas {st['lesion_area_ratio']:.1%}, "
+            f"median Hue {st['median_hue']:.1f}, entropi {st['entropy']:.3f} (sebelum morfologi)"
+        )
+
+    def display_stage_image(self, stage_idx, img_rgb, profiler=None):
         """
         Menampilkan gambar pada canvas stage_idx.
         img_rgb diasumsikan dalam format RGB uint8.
+        profiler: resize & PhotoImage di PreviewRenderer dijumlahkan ke tahap 'display'.
+        Resize ke ukuran canvas berjalan di thread latar (PreviewRenderer); thread UI hanya
+        membuat PhotoImage kecil. Di-render ulang otomatis saat ukuran canvas berubah.
         """
-        canvas = self.stage_canvases[stage_idx]
-        h, w = img_rgb.shape[:2]
-        cw, ch = int(canvas.winfo_width() or 320), int(canvas.winfo_height() or 240)
-        # jika ukuran canvas belum ter-render, gunakan default 320x240
-        cw = cw if cw > 10 else 320
-        ch = ch if ch > 10 else 240
-        scale = min(cw / w, ch / h)
-        nw, nh = max(1, int(w * scale)), max(1, int(h * scale))
-        img_resized = cv2.resize(img_rgb, (nw, nh), interpolation=cv2.INTER_LANCZOS4)
-        tk_img = ImageTk.PhotoImage(Image.fromarray(img_resized))
-        canvas.delete("all")
-        x, y = (cw - nw) // 2, (ch - nh) // 2
-        canvas.create_image(x, y, anchor="nw", image=tk_img)
-        canvas.image = tk_img
+        self.preview.show(stage_idx, img_rgb, profiler)
         # update label kecil di bawah canvas
         self.stage_labels[stage_idx].config(text="✓ Siap")
 
+    def _show_gallery(self, gallery, n_crops, profiler=None):
+        """Panel galeri lesi (tahap 4); tanpa lesi (gallery None) panel dikosongkan."""
+        if gallery is None:
+            self.preview.clear(4)
+            self.stage_labels[4].config(text="Tidak ada lesi")
+            return
+        self.display_stage_image(4, gallery, profiler)
+        self.stage_labels[4].config(text=f"✓ {n_crops} lesi terbesar")
+
     def upload_image(self):
         filepath = filedialog.askopenfilename(filetypes=[("Image files", "*.jpg *.jpeg *.png *.bmp")])
         if not filepath:
             return
+        # Analisis citra sebelumnya (berjalan/tertunda) tidak relevan lagi
+        self.scheduler.cancel()
         try:
-            self.original_rgb = load_image(filepath)
+            # Decode tereduksi (>= ukuran analisis): panel Original & tahap Resize tidak butuh piksel penuh
+            decode = StageProfiler()
+            with decode.stage('decode') as record:
+                self.original_rgb = decode.add_output(record, load_image(filepath, target_size=ANALYSIS_SIZE))
+            self.decode_record = decode.records['decode']
+            self.file_key = file_hash(filepath) if self.result_store is not None else None
+            self.filename = os.path.basename(filepath)
+            self.image_key = image_hash(self.original_rgb)
+            self.hue_index = None
             # reset beberapa state
             self.resized_rgb = None
             self.overlay_img = None
             self.crop_lesion = None
+            self.lesion_top = None
+            self.lesion_crops = []
             self.features = None
             self.prediction = None
+            self.profiler = None
 
             self.display_stage_image(0, self.original_rgb)
             # set remaining panels to "Belum diproses"
             for i in range(1, 6):
                 self.stage_labels[i].config(text="Belum diproses")
-                self.stage_canvases[i].delete("all")
+                self.preview.clear(i)
             self.pred_label.config(text="Citra dimuat", bootstyle="info")
             self.recom_text.config(state="normal")
             self.recom_text.delete(1.0, tk.END)
@@ -215,82 +285,176 @@ class LeafHealthAIApp:
         if self.original_rgb is None:
             messagebox.showwarning("Peringatan", "Harap upload citra terlebih dahulu!")
             return
-        if self.is_processing:
-            return
-        self.analyze_btn.config(state="disabled", text="Memproses...")
-        self.upload_btn.config(state="disabled")
+        # Snapshot parameter & citra di thread UI; worker tidak pernah membaca variabel Tk.
+        # Permintaan beruntun digabung: hanya snapshot terbaru yang diselesaikan.
+        job = {
+            'image': self.original_rgb,
+            'image_key': self.image_key,
+            'file_key': self.file_key,
+            'filename': self.filename,
+            'decode_record': self.decode_record,
+            'seg_params': {
+                'h_min': int(self.h_min_var.get()),
+                'h_max': int(self.h_max_var.get()),
+                's_min': int(self.s_min_var.get()),
+            },
+            'lesion_params': {
+                'hue_min': int(self.hue_min_var.get()),
+                'hue_max': int(self.hue_max_var.get()),
+            },
+        }
+        self.analyze_btn.config(text="Memproses...")
         self.is_processing = True
         self.status_var.set("Sedang menganalisis citra...")
-        threading.Thread(target=self._run_analysis, daemon=True).start()
+        self.scheduler.submit(job)
+
+    def _submit_without_gate(self, job):
+        """Analisis ulang citra yang ditolak gerbang awal atas permintaan pengguna."""
+        self.analyze_btn.config(text="Memproses...")
+        self.is_processing = True
+        self.status_var.set("Sedang menganalisis citra (gerbang awal dilewati)...")
+        self.scheduler.submit({**job, 'skip_gate': True})
+
+    def _post(self, token, func):
+        """Jalankan func di thread UI hanya jika run (token) belum digantikan."""
+        self.root.after(0, lambda: None if token.cancelled else func())
 
-    def _run_analysis(self):
+    def _run_analysis(self, job, token):
+        profiler = StageProfiler()
+        if job['decode_record'] is not None:
+            profiler.records['decode'] = dict(job['decode_record'])
         try:
+            original = job['image']
             # Tahap 0: Original (sudah ditampilkan di upload)
-            self.root.after(0, lambda: self.display_stage_image(0, self.original_rgb))
+            self._post(token, lambda: self.display_stage_image(0, original, profiler))
 
             # Tahap 1: Resize (640x480)
-            resized = cv2.resize(self.original_rgb, (640, 480), interpolation=cv2.INTER_AREA)
-            self.resized_rgb = resized.copy()
-            self.root.after(0, lambda img=resized: self.display_stage_image(1, img))
+            with profiler.stage('resize') as record:
+                resized = self.stage_cache.get_or_compute(
+                    (job['image_key'], 'resize', ANALYSIS_SIZE),
+                    lambda: profiler.add_output(record, {'image': resize_for_analysis(original)})
+                )['image']
+            self._post(token, lambda: self.display_stage_image(1, resized, profiler))
+            token.check()
+
+            # HSV dihitung sekali lalu dipakai bersama oleh semua tahap
+            pipeline = LeafPipeline(
+                seg_params=job['seg_params'],
+                lesion_params=job['lesion_params'],
+                draw_overlays=True,
+                cache=self.stage_cache,
+                profiler=profiler,
+            )
+            # Gerbang awal (thumbnail kecil): foto gelap/silau, bukan daun atau buram tidak dianalisis
+            if not job.get('skip_gate'):
+                with profiler.stage('validate'):
+                    check = check_leaf_image(resized, **{k: pipeline.seg_params[k] for k in ('h_min', 'h_max', 's_min')})
+                if not check['ok']:
+                    self._post(token, lambda: self._handle_rejected(job, check, profiler))
+                    return
+            # Foto yang sama (isi file) dengan parameter sama → ambil dari arsip tanpa pipeline
+            store_key = param_hash(pipeline.seg_params, pipeline.lesion_params)
+            if job['file_key'] is not None:
+                with profiler.stage('store'):
+                    stored = self.result_store.get(job['file_key'], store_key)
+                if stored is not None:
+                    self._show_stored_result(stored, resized, profiler, token)
+                    return
+            result = pipeline.prepare(resized, image_key=(job['image_key'], ANALYSIS_SIZE))
 
             # Tahap 2: Segmentasi (gunakan gambar resize)
-            leaf_mask, leaf_contour, leaf_overlay = segment_leaf(
-                self.resized_rgb,
-                h_min=self.h_min_var.get(),
-                h_max=self.h_max_var.get(),
-                s_min=self.s_min_var.get()
-            )
+            pipeline.segment(result)
+            pipeline.index(result)
+            leaf_overlay, hue_index = result['leaf_overlay'], result['hue_index']
             # overlay leaf_overlay sudah RGB
-            self.root.after(0, lambda img=leaf_overlay: self.display_stage_image(2, img))
+            self._post(token, lambda: self.display_stage_image(2, leaf_overlay, profiler))
+            self._post(token, lambda: setattr(self, 'hue_index', hue_index))
+            token.check()
 
             # Tahap 3: Deteksi Lesi (gunakan gambar resize)
-            lesion_mask, lesion_contours, lesion_overlay = detect_lesions(
-                self.resized_rgb,
-                leaf_mask,
-                hue_min=self.hue_min_var.get(),
-                hue_max=self.hue_max_var.get()
-            )
-            self.root.after(0, lambda img=lesion_overlay: self.display_stage_image(3, img))
-
-            # Tahap 4: Crop fokus lesi (otomatis ambil lesi terbesar)
-            if lesion_contours and len(lesion_contours) > 0:
-                main_cnt = max(lesion_contours, key=cv2.contourArea)
-                x, y, w, h = cv2.boundingRect(main_cnt)
-                # tambahkan margin sedikit agar tidak terpotong
-                pad = int(0.15 * max(w, h))
-                x1 = max(0, x - pad)
-                y1 = max(0, y - pad)
-                x2 = min(self.resized_rgb.shape[1], x + w + pad)
-                y2 = min(self.resized_rgb.shape[0], y + h + pad)
-                crop = self.resized_rgb[y1:y2, x1:x2]
-                # jika crop kosong karena ukuran kecil -> buat placeholder hitam
-                if crop.size == 0:
-                    crop = np.zeros((300, 300, 3), dtype=np.uint8)
-                else:
-                    # resize crop ke ukuran visual yang konsisten (300x300)
-                    crop = cv2.resize(crop, (300, 300), interpolation=cv2.INTER_AREA)
-            else:
-                crop = np.zeros((300, 300, 3), dtype=np.uint8)
-
-            self.crop_lesion = crop.copy()
-            self.root.after(0, lambda img=crop: self.display_stage_image(4, img))
+            pipeline.detect(result)
+            lesion_overlay = result['lesion_overlay']
+            self._post(token, lambda: self.display_stage_image(3, lesion_overlay, profiler))
+            token.check()
+
+            # Tahap 4: Crop fokus lesi (top-N lesi terbesar, view tanpa salinan; resize hanya untuk tampilan)
+            pipeline.crop(result)
+            crops = result['lesion_crops']
+            with profiler.stage('crop'):
+                crop = make_gallery(crops, tile=300 if len(crops) <= 1 else 150)
+            self._post(token, lambda: self._show_gallery(crop, len(crops), profiler))
+            token.check()
 
             # Tahap 5: Ekstraksi fitur dan klasifikasi (gunakan mask & kontur dari resize)
-            features = extract_features(self.resized_rgb, leaf_mask, lesion_mask, lesion_contours)
-            label, conf, rec = classify_condition(features)
-
-            # overlay final: gunakan lesion_overlay (dari detect_lesions)
-            self.overlay_img = lesion_overlay
-            self.features = features
-            self.prediction = (label, conf, rec)
-
-            # update UI akhir (panel hasil)
-            self.root.after(0, self._update_ui_after_analysis)
-
+            pipeline.extract(result)
+            pipeline.classify(result)
+            token.check()
+            if job['file_key'] is not None:
+                self._store_result(job, store_key, pipeline, result, profiler)
+
+            # overlay final: gunakan lesion_overlay (dari detect_lesions); state dipasang di thread UI
+            state = {
+                'resized_rgb': resized,
+                'overlay_img': lesion_overlay,
+                'crop_lesion': crop,
+                'lesion_top': result['lesion_top'],
+                'lesion_crops': crops,
+                'features': result['features'],
+                'prediction': (result['label'], result['confidence'], result['recommendation']),
+                'profiler': profiler,
+            }
+            self._post(token, lambda: self._apply_analysis(state))
+
+        except AnalysisCancelled:
+            raise
         except Exception as e:
-            self.root.after(0, lambda err=e: self._handle_analysis_error(err))
-        finally:
-            self.root.after(0, self._finish_processing)
+            self._post(token, lambda err=e: self._handle_analysis_error(err))
+
+    def _apply_analysis(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+        self._update_ui_after_analysis()
+
+    def _show_stored_result(self, stored, resized, profiler, token):
+        """Tampilkan hasil dari arsip: overlay & galeri lesi digambar ulang dari tabel lesi tersimpan."""
+        lesions = stored['lesions']
+        with profiler.stage('lesions'):
+            overlay = overlay_thumbnail(resized, lesions=lesions, max_side=max(resized.shape[:2]))
+        self._post(token, lambda: self.preview.clear(2))
+        self._post(token, lambda: self.stage_labels[2].config(text="📦 Dari arsip (tidak dihitung ulang)"))
+        self._post(token, lambda: self.display_stage_image(3, overlay, profiler))
+        with profiler.stage('crop'):
+            top, crops = lesion_crops(resized, lesions)
+            crop = make_gallery(crops, tile=300 if len(crops) <= 1 else 150)
+        self._post(token, lambda: self._show_gallery(crop, len(crops), profiler))
+        state = {
+            'resized_rgb': resized,
+            'overlay_img': overlay,
+            'crop_lesion': crop,
+            'lesion_top': top,
+            'lesion_crops': crops,
+            'features': stored['features'],
+            'prediction': (stored['label'], stored['confidence'], stored['recommendation']),
+            'profiler': profiler,
+        }
+        self._post(token, lambda: self._apply_analysis(state))
+        self._post(token, lambda: self.status_var.set(
+            f"✓ Hasil dari arsip ({stored['created_at']}): {profiler.summary()}"))
+
+    def _store_result(self, job, store_key, pipeline, result, profiler):
+        try:
+            with profiler.stage('store'):
+                self.result_store.put(
+                    job['file_key'], store_key, result, source=job['filename'],
+                    params={**pipeline.seg_params, **pipeline.lesion_params},
+                    thumbnail=encode_thumbnail(result['lesion_overlay']),
+                )
+                if self.feature_store is not None:
+                    self.feature_store.append(result['features'], result['label'], result['confidence'],
+                                              job['file_key'], store_key)
+                    self.feature_store.flush()
+        except Exception as e:
+            print("ℹ️ Gagal menyimpan ke arsip:", e)
 
     def _update_ui_after_analysis(self):
         label, conf, rec = self.prediction
@@ -324,10 +488,51 @@ class LeafHealthAIApp:
                 else:
                     val_str = str(v)
                 self.feat_tree.insert("", "end", text=k.replace("_", " ").title(), values=(val_str,))
+        self._timing_node = None
+        self._show_timings()
 
         # enable save report
         self.save_btn.config(state="normal")
-        self.status_var.set("✓ Analisis selesai.")
+        if self.profiler is None:
+            self.status_var.set("✓ Analisis selesai.")
+
+    def _show_timings(self):
+        """Waktu & byte per tahap di treeview fitur dan status bar (diperbarui saat pratinjau selesai)."""
+        if self.profiler is None:
+            return
+        if self._timing_node is not None:
+            self.feat_tree.delete(self._timing_node)
+        ordered = self.profiler.ordered()
+        self._timing_ms = sum(r['ms'] for _, r in ordered)
+        self._timing_node = self.feat_tree.insert("", "end", text="⏱ Waktu per Tahap",
+                                                  values=(f"{self._timing_ms:.1f} ms",), open=True)
+        for name, r in ordered:
+            self.feat_tree.insert(self._timing_node, "end", text=name.title(),
+                                  values=(f"{r['ms']:.1f} ms · {r['bytes'] / 1024:.0f} KB",))
+        self.status_var.set(f"✓ Analisis selesai: {self.profiler.summary()}")
+
+    def _on_preview_rendered(self, idx):
+        # Render pratinjau bisa selesai setelah hasil diterapkan → perbarui rincian bila 'display' bertambah
+        if (self.profiler is not None and self._timing_node is not None
+                and self.profiler.total_ms() != self._timing_ms):
+            self._show_timings()
+
+    def _handle_rejected(self, job, check, profiler):
+        for i in range(2, 6):
+            self.preview.clear(i)
+            self.stage_labels[i].config(text="Dilewati")
+        self.stage_labels[2].config(text=f"⛔ Ditolak: {check['reason']}")
+        self.prediction = self.features = self.overlay_img = None
+        self.save_btn.config(state="disabled")
+        self.pred_label.config(text="Citra Ditolak", bootstyle="secondary")
+        self.conf_label.config(text="")
+        self.status_var.set(f"⛔ Citra ditolak sebelum analisis: {check['reason']} ({profiler.summary()})")
+        detail = (f"Alasan: {check['reason']}\n\n"
+                  f"Area hijau: {check['green_ratio']:.0%} · luas daun: {check['leaf_area']:.0%}\n"
+                  f"Ketajaman: {check['sharpness']:.1f} · kecerahan: {check['brightness']:.0f}\n\n"
+                  "Tetap jalankan analisis?")
+        if messagebox.askyesno("Citra Ditolak", detail):
+            self._submit_without_gate(job)
 
     def _handle_analysis_error(self, e):
         messagebox.showerror("Error Analisis", f"Terjadi kesalahan:\n{str(e)}")
@@ -335,8 +540,9 @@ class LeafHealthAIApp:
         self.status_var.set("✗ Analisis gagal.")
 
     def _finish_processing(self):
-        self.analyze_btn.config(state="normal", text="Analisis Sekarang")
-        self.upload_btn.config(state="normal")
+        if self.scheduler.busy:  # permintaan baru masuk setelah on_idle dijadwalkan
+            return
+        self.analyze_btn.config(text="Analisis Sekarang")
         self.is_processing = False
 
     def show_help(self):
@@ -360,68 +566,32 @@ class LeafHealthAIApp:
         filepath = filedialog.asksaveasfilename(defaultextension=".pdf", filetypes=[("PDF files", "*.pdf")])
         if not filepath:
             return
+        # Citra utama: overlay lesi, atau fallback ke citra resize / original
+        image = next((img for img in (self.overlay_img, self.resized_rgb, self.original_rgb) if img is not None), None)
+        label, conf, rec = self.prediction if self.prediction is not None else ("-", 0.0, "-")
+        diagnosis = {
+            'label': label,
+            'confidence': conf,
+            'recommendation': rec,
+            'features': self.features if isinstance(self.features, dict) else {},
+            'timings': self.profiler.ordered() if self.profiler is not None else None,
+            'lesion_top': self.lesion_top,
+            'lesion_crops': self.lesion_crops,
+        }
+        # Render PDF di thread latar (citra di-encode JPEG di memori, tanpa file sementara)
+        self.save_btn.config(state="disabled")
+        self.status_var.set("Menyimpan laporan PDF...")
+        threading.Thread(target=self._write_report, args=(filepath, diagnosis, image), daemon=True).start()
+
+    def _write_report(self, filepath, diagnosis, image):
         try:
-            with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmp:
-                temp_path = tmp.name
-            if self.overlay_img is None:
-                # fallback: simpan resized atau crop
-                if self.resized_rgb is not None:
-                    save_image(temp_path, self.resized_rgb)
-                elif self.original_rgb is not None:
-                    save_image(temp_path, self.original_rgb)
-                else:
-                    # buat placeholder
-                    placeholder = np.zeros((300, 300, 3), dtype=np.uint8)
-                    save_image(temp_path, placeholder)
-            else:
-                save_image(temp_path, self.overlay_img)
-
-            from reportlab.pdfgen import canvas
-            from reportlab.lib.pagesizes import A4
-            from reportlab.lib.utils import ImageReader
-
-            c = canvas.Canvas(filepath, pagesize=A4)
-            w, h = A4
-            c.setFont("Helvetica-Bold", 18)
-            c.drawString(50, h - 50, "🌿 LeafHealthAI — Laporan Diagnosa")
-            c.setFont("Helvetica", 10)
-            c.drawString(50, h - 70, f"Dibuat: {datetime.now().strftime('%d %B %Y, %H:%M')}")
-
-            if os.path.exists(temp_path):
-                c.drawImage(ImageReader(temp_path), 50, h - 360, width=500, height=280)
-
-            y = h - 380
-            label, conf, rec = self.prediction if self.prediction is not None else ("-", 0.0, "-")
-            c.setFont("Helvetica-Bold", 12)
-            c.drawString(50, y, f"Diagnosa: {label}")
-            y -= 20
-            c.setFont("Helvetica", 11)
-            c.drawString(50, y, f"Akurasi Estimasi: {conf:.0%}")
-            y -= 25
-            c.drawString(50, y, "Rekomendasi:")
-            y -= 16
-            for line in rec.split(". "):
-                if line.strip():
-                    c.drawString(70, y, f"• {line.strip()}.")
-                    y -= 14
-            y -= 10
-            c.setFont("Helvetica-Bold", 11)
-            c.drawString(50, y, "Fitur yang Digunakan:")
-            y -= 18
-            c.setFont("Helvetica", 9)
-            if isinstance(self.features, dict):
-                for k, v in self.features.items():
-                    val = f"{v:.4f}" if isinstance(v, float) else str(v)
-                    c.drawString(70, y, f"{k.replace('_', ' ').title():<22} : {val}")
-                    y -= 14
-                    if y < 100:
-                        c.showPage()
-                        y = h - 50
-            c.save()
-            os.unlink(temp_path)
-            messagebox.showinfo("Berhasil", "Laporan PDF berhasil disimpan!")
+            build_report(filepath, diagnosis, image)
+            self.root.after(0, lambda: messagebox.showinfo("Berhasil", "Laporan PDF berhasil disimpan!"))
+            self.root.after(0, lambda: self.status_var.set(f"✓ Laporan disimpan: {os.path.basename(filepath)}"))
         except Exception as e:
-            messagebox.showerror("Error", f"Gagal menyimpan PDF:\n{str(e)}")
+            self.root.after(0, lambda err=e: messagebox.showerror("Error", f"Gagal menyimpan PDF:\n{str(err)}"))
+        finally:
+            self.root.after(0, lambda: self.save_btn.config(state="normal"))
 
     def run(self):
         self.root.mainloop()
@@ -0,0 +1,121 @@
+# src/gui/preview.py
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+
+from ..core.profiling import profile_stage
+
+DEFAULT_CANVAS = (320, 240)   # ukuran canvas sebelum ter-render
+CONFIGURE_DELAY_MS = 80       # debounce <Configure> saat jendela di-resize
+SIZES_PER_STAGE = 4           # jumlah ukuran canvas yang di-cache per panel
+
+
+def fit_image(img_rgb, canvas_size):
+    """Perkecil (INTER_AREA) / perbesar (INTER_LINEAR) citra agar muat di canvas, aspek dipertahankan."""
+    cw, ch = canvas_size
+    h, w = img_rgb.shape[:2]
+    scale = min(cw / w, ch / h)
+    nw, nh = max(1, int(w * scale)), max(1, int(h * scale))
+    if (nw, nh) == (w, h):
+        return img_rgb
+    return cv2.resize(img_rgb, (nw, nh), interpolation=cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR)
+
+
+class PreviewRenderer:
+    """
+    Render pratinjau panel tahap: resize di thread latar, PhotoImage di-cache per ukuran canvas.
+    Dengan profiler di show(), render pertama dicatat sebagai tahap 'display'.
+    """
+
+    def __init__(self, root, canvases, on_rendered=None):
+        self.root = root
+        self.canvases = canvases
+        self.on_rendered = on_rendered
+        n = len(canvases)
+        self.sources = [None] * n
+        self.versions = [0] * n
+        self.profilers = [None] * n
+        self.cache = [OrderedDict() for _ in range(n)]
+        self._configure_jobs = [None] * n
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="preview")
+        for idx, canvas in enumerate(canvases):
+            canvas.bind("<Configure>", lambda e, i=idx: self._on_configure(i))
+
+    def canvas_size(self, idx):
+        canvas = self.canvases[idx]
+        cw, ch = int(canvas.winfo_width() or 0), int(canvas.winfo_height() or 0)
+        # jika ukuran canvas belum ter-render, gunakan default 320x240
+        return (cw, ch) if cw > 10 and ch > 10 else DEFAULT_CANVAS
+
+    def show(self, idx, img_rgb, profiler=None):
+        """Ganti citra panel idx (dipanggil dari thread UI) dan jadwalkan render."""
+        self.sources[idx] = img_rgb
+        self.profilers[idx] = profiler
+        self.versions[idx] += 1
+        self.cache[idx].clear()
+        self._request(idx)
+
+    def clear(self, idx):
+        self.sources[idx] = None
+        self.profilers[idx] = None
+        self.versions[idx] += 1
+        self.cache[idx].clear()
+        self.canvases[idx].delete("all")
+
+    def _on_configure(self, idx):
+        if self.sources[idx] is None:
+            return
+        if self._configure_jobs[idx] is not None:
+            self.root.after_cancel(self._configure_jobs[idx])
+        self._configure_jobs[idx] = self.root.after(CONFIGURE_DELAY_MS, lambda: self._configure_done(idx))
+
+    def _configure_done(self, idx):
+        self._configure_jobs[idx] = None
+        self._request(idx)
+
+    def _request(self, idx):
+        size = self.canvas_size(idx)
+        version = self.versions[idx]
+        photo = self.cache[idx].get(size)
+        if photo is not None:
+            self.cache[idx].move_to_end(size)
+            self._draw(idx, size, photo)
+            return
+        img = self.sources[idx]
+        future = self._executor.submit(self._fit, self.profilers[idx], img, size)
+        future.add_done_callback(
+            lambda f: self.root.after(0, lambda: self._resized(idx, version, size, f)))
+
+    @staticmethod
+    def _fit(profiler, img, size):
+        with profile_stage(profiler, 'display'):
+            return fit_image(img, size)
+
+    def _resized(self, idx, version, size, future):
+        if version != self.versions[idx] or size != self.canvas_size(idx):
+            return  # citra sudah diganti / canvas sudah berubah ukuran lagi
+        try:
+            thumb = future.result()
+        except Exception as e:
+            print("ℹ️ Gagal merender pratinjau:", e)
+            return
+        from PIL import Image, ImageTk  # impor lambat: modul ini tetap bisa diimpor tanpa Tk/PIL
+
+        with profile_stage(self.profilers[idx], 'display'):
+            photo = ImageTk.PhotoImage(Image.fromarray(thumb))
+        self.profilers[idx] = None  # render ulang (<Configure>) tidak dihitung ke analisis ini
+        cache = self.cache[idx]
+        cache[size] = photo
+        while len(cache) > SIZES_PER_STAGE:
+            cache.popitem(last=False)
+        self._draw(idx, size, photo)
+
+    def _draw(self, idx, size, photo):
+        canvas = self.canvases[idx]
+        cw, ch = size
+        canvas.delete("all")
+        canvas.create_image((cw - photo.width()) // 2, (ch - photo.height()) // 2, anchor="nw", image=photo)
+        canvas.image = photo
+        if self.on_rendered is not None:
+            self.on_rendered(idx)
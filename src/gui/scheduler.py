@@ -0,0 +1,78 @@
+# src/gui/scheduler.py
+import threading
+
+
+class AnalysisCancelled(Exception):
+    """Dilempar di batas tahap bila run sudah digantikan permintaan yang lebih baru."""
+
+
+class CancelToken:
+    """Penanda generasi satu run; usang begitu ada submit()/cancel() baru di scheduler."""
+
+    def __init__(self, scheduler, generation):
+        self._scheduler = scheduler
+        self.generation = generation
+
+    @property
+    def cancelled(self):
+        return self.generation != self._scheduler.generation
+
+    def check(self):
+        if self.cancelled:
+            raise AnalysisCancelled()
+
+
+class LatestWinsScheduler:
+    """
+    Satu thread worker analisis GUI: submit() mengganti permintaan yang menunggu dan membatalkan
+    run berjalan, yang berhenti di token.check() berikutnya.
+    """
+
+    def __init__(self, run, on_idle=None, name="analysis-worker"):
+        self._run = run
+        self._on_idle = on_idle
+        self._cond = threading.Condition()
+        self._pending = None
+        self._running = None
+        self.generation = 0
+        self._thread = threading.Thread(target=self._loop, name=name, daemon=True)
+        self._thread.start()
+
+    @property
+    def busy(self):
+        with self._cond:
+            return self._pending is not None or self._running is not None
+
+    def submit(self, job):
+        """Jadwalkan job (snapshot parameter); mengembalikan CancelToken-nya."""
+        with self._cond:
+            self.generation += 1
+            token = CancelToken(self, self.generation)
+            self._pending = (job, token)
+            self._cond.notify()
+        return token
+
+    def cancel(self):
+        """Batalkan run berjalan & permintaan tertunda (mis. saat citra baru diunggah)."""
+        with self._cond:
+            self.generation += 1
+            self._pending = None
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while self._pending is None:
+                    self._cond.wait()
+                job, token = self._pending
+                self._pending = None
+                self._running = token
+            try:
+                self._run(job, token)
+            except AnalysisCancelled:
+                pass
+            finally:
+                with self._cond:
+                    self._running = None
+                    idle = self._pending is None
+                if idle and self._on_idle is not None:
+                    self._on_idle()
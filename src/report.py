@@ -0,0 +1,361 @@
+# src/report.py
+"""
+Laporan PDF diagnosa — satu citra (GUI) atau massal dari hasil `python -m src.batch`.
+
+    python -m src.report data/processed/batch_<dir>.csv --root <dir> [-o reports/laporan.pdf]
+                         [--shard-size 500] [-j N]
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+from .core.classifier import LABELS, RECOMMENDATIONS
+from .utils.helpers import load_image, read_image_size
+
+PAGE_IMAGE_MAX_SIDE = 800    # sisi terpanjang citra halaman (piksel) setelah di-encode ulang
+EMBED_MAX_SIDE = 1600        # JPEG sampai ukuran ini disematkan langsung dari byte file
+JPEG_QUALITY = 85
+PREFETCH = 8                 # jumlah citra yang dimuat di depan halaman yang sedang digambar
+
+_STAGE_PREFIX, _STAGE_SUFFIX = 't_', '_ms'
+
+
+def _text(value):
+    """Font standar PDF (Helvetica, WinAnsi) tidak punya glyph emoji → buang karakter di luar cp1252."""
+    return str(value).encode('cp1252', 'ignore').decode('cp1252').strip()
+
+
+def _reader(data):
+    """ImageReader dari byte file citra di memori (JPEG disematkan apa adanya oleh reportlab)."""
+    from reportlab.lib.utils import ImageReader
+
+    return ImageReader(io.BytesIO(data))
+
+
+@contextmanager
+def _canvas(target):
+    """
+    Canvas A4 yang disimpan di akhir blok. Stream ditulis biner (tanpa ASCII85 — encodernya
+    murni Python dan mendominasi waktu render); rl_config.useA85 dibaca reportlab saat
+    menggambar & menyimpan, jadi hanya diubah selama blok lalu dikembalikan.
+    """
+    from reportlab import rl_config
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+
+    previous = rl_config.useA85
+    rl_config.useA85 = 0
+    try:
+        c = canvas.Canvas(target, pagesize=A4)
+        yield c
+        c.save()
+    finally:
+        rl_config.useA85 = previous
+
+
+def jpeg_reader(img_rgb, quality=JPEG_QUALITY):
+    """ImageReader dari citra RGB yang di-encode JPEG di memori (disematkan tanpa encode ulang)."""
+    ok, buf = cv2.imencode('.jpg', cv2.cvtColor(np.ascontiguousarray(img_rgb), cv2.COLOR_RGB2BGR),
+                           [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not ok:
+        raise ValueError("Gagal meng-encode citra laporan")
+    return _reader(buf.tobytes())
+
+
+def file_reader(path, max_side=PAGE_IMAGE_MAX_SIDE):
+    """
+    Sumber citra canvas.drawImage untuk file citra: JPEG kecil (<= EMBED_MAX_SIDE) diberikan
+    sebagai path — reportlab menyematkan byte file apa adanya dan memakai nama file sebagai kunci
+    dedup (tanpa decode piksel); lainnya di-decode tereduksi, diperkecil ke max_side lalu
+    di-encode JPEG di memori (ImageReader).
+    """
+    size = read_image_size(path)
+    if size is not None and max(size) <= EMBED_MAX_SIDE and path.lower().endswith(('.jpg', '.jpeg')):
+        return path
+    img = load_image(path, target_size=(max_side, max_side))
+    h, w = img.shape[:2]
+    scale = max_side / max(h, w)
+    if scale < 1:
+        img = cv2.resize(img, (max(1, round(w * scale)), max(1, round(h * scale))), interpolation=cv2.INTER_AREA)
+    return jpeg_reader(img)
+
+
+def timings_from_row(row):
+    """Kolom t_<tahap>_ms / mem_<tahap>_kb baris batch → list (tahap, {'ms', 'bytes'})."""
+    timings = []
+    for key, value in row.items():
+        if key.startswith(_STAGE_PREFIX) and key.endswith(_STAGE_SUFFIX) and key != 't_total_ms':
+            name = key[len(_STAGE_PREFIX):-len(_STAGE_SUFFIX)]
+            try:
+                kb = float(row.get(f'mem_{name}_kb') or 0)
+                timings.append((name, {'ms': float(value or 0), 'bytes': kb * 1024}))
+            except ValueError:
+                continue
+    return timings
+
+
+def _new_page_if(c, y, needed):
+    from reportlab.lib.pagesizes import A4
+
+    if y < needed:
+        c.showPage()
+        return A4[1] - 50
+    return y
+
+
+def draw_diagnosis_page(c, diagnosis, image=None):
+    """
+    Gambar satu diagnosa mulai dari halaman aktif canvas c.
+    diagnosis: dict label, confidence, recommendation, features, serta opsional
+    title, source, error, timings (list (tahap, record) seperti StageProfiler.ordered()),
+    lesion_top & lesion_crops (galeri lesi). image: ImageReader / path JPEG citra utama (atau None).
+    """
+    from reportlab.lib.pagesizes import A4
+
+    w, h = A4
+    c.setFont("Helvetica-Bold", 18)
+    c.drawString(50, h - 50, _text(diagnosis.get('title', "LeafHealthAI — Laporan Diagnosa")))
+    c.setFont("Helvetica", 10)
+    c.drawString(50, h - 70, f"Dibuat: {datetime.now().strftime('%d %B %Y, %H:%M')}")
+    if diagnosis.get('source'):
+        c.drawString(300, h - 70, _text(f"Citra: {diagnosis['source']}")[:60])
+
+    if image is not None:
+        c.drawImage(image, 50, h - 360, width=500, height=280, preserveAspectRatio=True)
+
+    y = h - 380
+    if diagnosis.get('error'):
+        c.setFont("Helvetica-Bold", 12)
+        c.drawString(50, y, _text(f"Gagal dianalisis: {diagnosis['error']}")[:95])
+        return
+    c.setFont("Helvetica-Bold", 12)
+    c.drawString(50, y, _text(f"Diagnosa: {diagnosis.get('label', '-')}"))
+    y -= 20
+    c.setFont("Helvetica", 11)
+    c.drawString(50, y, f"Akurasi Estimasi: {float(diagnosis.get('confidence') or 0):.0%}")
+    y -= 25
+    c.drawString(50, y, "Rekomendasi:")
+    y -= 16
+    for line in (diagnosis.get('recommendation') or '-').split(". "):
+        if line.strip():
+            c.drawString(70, y, _text(f"• {line.strip().rstrip('.')}."))
+            y -= 14
+    y -= 10
+    c.setFont("Helvetica-Bold", 11)
+    c.drawString(50, y, "Fitur yang Digunakan:")
+    y -= 18
+    c.setFont("Helvetica", 9)
+    for k, v in (diagnosis.get('features') or {}).items():
+        val = f"{v:.4f}" if isinstance(v, float) else str(v)
+        c.drawString(70, y, f"{k.replace('_', ' ').title():<22} : {val}")
+        y -= 14
+        y = _new_page_if(c, y, 100)
+
+    timings = diagnosis.get('timings')
+    if timings:
+        y = _new_page_if(c, y - 10, 100 + 14 * len(timings))
+        c.setFont("Helvetica-Bold", 11)
+        c.drawString(50, y, f"Waktu per Tahap (total {sum(r['ms'] for _, r in timings):.1f} ms):")
+        y -= 18
+        c.setFont("Helvetica", 9)
+        for name, r in timings:
+            c.drawString(70, y, f"{name.title():<22} : {r['ms']:8.1f} ms   {r['bytes'] / 1024:8.0f} KB")
+            y -= 14
+
+    crops = diagnosis.get('lesion_crops')
+    if crops:
+        # Galeri lesi terbesar (crop view dari citra resize) + statistik per lesi
+        y = _new_page_if(c, y - 10, 160)
+        c.setFont("Helvetica-Bold", 11)
+        c.drawString(50, y, f"Galeri Lesi ({len(crops)} terbesar):")
+        y -= 90
+        for i, (row, crop) in enumerate(zip(diagnosis['lesion_top'], crops)):
+            x = 50 + i * 85
+            c.drawImage(jpeg_reader(crop), x, y, width=80, height=80, preserveAspectRatio=True)
+            c.setFont("Helvetica", 7)
+            c.drawString(x, y - 10, f"#{i + 1} luas {row['area']:.0f} px")
+            c.drawString(x, y - 19, f"circ {row['circularity']:.2f}, hue {row['mean_hue']:.0f}")
+
+
+def build_report(target, diagnosis, image_rgb=None):
+    """PDF satu diagnosa ke target (path atau objek file, mis. BytesIO) — tanpa file sementara."""
+    with _canvas(target) as c:
+        draw_diagnosis_page(c, diagnosis, jpeg_reader(image_rgb) if image_rgb is not None else None)
+    return target
+
+
+def _float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _status(row):
+    """Label baris untuk ringkasan; baris ditolak gerbang awal / gagal dikelompokkan tersendiri."""
+    return row.get('label') or ('Ditolak' if row.get('rejected') else 'Error')
+
+
+def draw_summary(c, rows, totals=None, title="LeafHealthAI — Ringkasan Batch"):
+    """Halaman ringkasan: jumlah per label (totals = Counter seluruh run) + tabel baris shard ini."""
+    from reportlab.lib.pagesizes import A4
+
+    w, h = A4
+    counts = totals or Counter(_status(r) for r in rows)
+    n_total = sum(counts.values())
+    c.setFont("Helvetica-Bold", 18)
+    c.drawString(50, h - 50, _text(title))
+    c.setFont("Helvetica", 10)
+    c.drawString(50, h - 70, f"Dibuat: {datetime.now().strftime('%d %B %Y, %H:%M')} — {n_total} citra")
+    y = h - 100
+    c.setFont("Helvetica-Bold", 11)
+    c.drawString(50, y, "Jumlah per Diagnosa:")
+    y -= 16
+    c.setFont("Helvetica", 10)
+    for label, n in counts.most_common():
+        c.drawString(70, y, f"{_text(label) or 'Error':<22} : {n:6d}  ({n / max(n_total, 1):.1%})")
+        y -= 14
+
+    columns = (("No", 50), ("Citra", 80), ("Diagnosa", 300), ("Akurasi", 390), ("Rasio Lesi", 440),
+               ("Lesi", 500), ("ms", 530))
+
+    def header(y):
+        c.setFont("Helvetica-Bold", 9)
+        for name, x in columns:
+            c.drawString(x, y, name)
+        c.setFont("Helvetica", 8)
+        return y - 14
+
+    y = header(y - 16)
+    for i, row in enumerate(rows, 1):
+        if y < 50:
+            c.showPage()
+            y = header(h - 50)
+        values = (str(row.get('_index', i)), _text(row.get('image', ''))[-40:],
+                  _text(_status(row)), f"{_float(row.get('confidence')):.0%}",
+                  f"{_float(row.get('lesion_area_ratio')):.3f}", str(row.get('num_lesions', '')),
+                  f"{_float(row.get('t_total_ms')):.0f}")
+        for (_, x), value in zip(columns, values):
+            c.drawString(x, y, value)
+        y -= 13
+    c.showPage()
+
+
+def row_diagnosis(row):
+    """Baris hasil batch (CSV/JSONL) → dict diagnosa untuk draw_diagnosis_page."""
+    label = row.get('label') or ''
+    features = {}
+    for name in ('median_hue', 'entropy', 'lesion_area_ratio', 'num_lesions', 'avg_circularity'):
+        if row.get(name) not in (None, ''):
+            features[name] = int(float(row[name])) if name == 'num_lesions' else float(row[name])
+    return {
+        'title': "LeafHealthAI — Laporan Diagnosa",
+        'source': row.get('image'),
+        'label': label,
+        'confidence': _float(row.get('confidence')),
+        'recommendation': RECOMMENDATIONS[LABELS.index(label)] if label in LABELS else '-',
+        'features': features,
+        'timings': timings_from_row(row),
+        'error': row.get('error') or (f"ditolak — {row['rejected']}" if row.get('rejected') else None),
+    }
+
+
+def _load_page_image(root, row):
+    try:
+        return file_reader(os.path.join(root, row['image'])) if root is not None else None
+    except Exception:
+        return None
+
+
+def render_bulk(target, rows, root=None, totals=None):
+    """
+    Satu PDF: ringkasan + satu halaman per baris. Citra dimuat di thread latar dengan
+    lookahead PREFETCH sehingga baca disk/encode tumpang-tindih dengan penggambaran halaman.
+    """
+    with _canvas(target) as c:
+        draw_summary(c, rows, totals)
+        with ThreadPoolExecutor(max_workers=2) as loader:
+            pending = deque()
+            rows_iter = iter(rows)
+            for row in rows_iter:
+                pending.append((row, loader.submit(_load_page_image, root, row)))
+                if len(pending) >= PREFETCH:
+                    break
+            while pending:
+                row, future = pending.popleft()
+                draw_diagnosis_page(c, row_diagnosis(row), future.result())
+                c.showPage()
+                nxt = next(rows_iter, None)
+                if nxt is not None:
+                    pending.append((nxt, loader.submit(_load_page_image, root, nxt)))
+    return target
+
+
+def _render_shard(args):
+    target, rows, root, totals = args
+    render_bulk(target, rows, root, totals)
+    return target, len(rows)
+
+
+def shard_paths(output, n_shards):
+    if n_shards <= 1:
+        return [output]
+    stem, ext = os.path.splitext(output)
+    return [f"{stem}_{i + 1:03d}{ext or '.pdf'}" for i in range(n_shards)]
+
+
+def build_bulk_report(rows, output, root=None, shard_size=None, workers=None):
+    """
+    PDF massal dari baris hasil batch. shard_size → beberapa file <output>_001.pdf, ... yang
+    dirender paralel di ProcessPoolExecutor; ringkasan tiap shard memuat jumlah per label
+    seluruh run. Mengembalikan list path PDF.
+    """
+    rows = [{**row, '_index': i} for i, row in enumerate(rows, 1)]
+    totals = Counter(_status(r) for r in rows)
+    shard_size = shard_size or max(len(rows), 1)
+    chunks = [rows[i:i + shard_size] for i in range(0, len(rows), shard_size)] or [[]]
+    paths = shard_paths(output, len(chunks))
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    tasks = [(path, chunk, root, totals) for path, chunk in zip(paths, chunks)]
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for path, n in executor.map(_render_shard, tasks):
+            print(f"… {path}: {n} halaman diagnosa", file=sys.stderr)
+    return paths
+
+
+def read_rows(path):
+    """Baca file hasil `python -m src.batch` (CSV atau JSONL)."""
+    with open(path, newline='', encoding='utf-8') as f:
+        if path.endswith('.jsonl'):
+            return [json.loads(line) for line in f if line.strip()]
+        return list(csv.DictReader(f))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m src.report', description='LeafHealthAI — laporan PDF massal')
+    parser.add_argument('results', help='File hasil batch (.csv / .jsonl)')
+    parser.add_argument('--root', help='Direktori citra yang dipakai saat batch (untuk citra per halaman)')
+    parser.add_argument('-o', '--output', help='File PDF (default: <results>.pdf)')
+    parser.add_argument('--shard-size', type=int, default=None, help='Jumlah diagnosa per file PDF')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='Jumlah proses render shard')
+    args = parser.parse_args(argv)
+
+    output = args.output or os.path.splitext(args.results)[0] + '.pdf'
+    paths = build_bulk_report(read_rows(args.results), output, args.root, args.shard_size, args.workers)
+    print(f"✓ {len(paths)} file PDF → {', '.join(paths)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,413 @@
+# src/server.py
+"""
+Layanan diagnosa HTTP lokal untuk tablet lapangan. Tanpa autentikasi: default hanya 127.0.0.1.
+
+    python leafhealth_server.py [--host 0.0.0.0] [--port 8765] [-j N] [--max-batch 8]
+
+POST /analyze[?thumbnail=1][&multi_leaf=1] (byte citra / multipart field 'image'), GET /metrics, GET /health.
+"""
+import argparse
+import base64
+import json
+import math
+import os
+import queue
+import signal
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from .core.leaf_validation import check_leaf_image
+from .core.multileaf import MIN_AREA_RATIO, analyze_leaves, draw_leaves
+from .core.classifier import FEATURE_ORDER
+from .core.pipeline import ANALYSIS_SIZE, DEFAULT_LESION_PARAMS, DEFAULT_SEG_PARAMS, LeafPipeline, resize_for_analysis
+from .core.profiling import StageProfiler
+from .core.workspace import Workspace, buffer
+from .store import encode_thumbnail, overlay_thumbnail
+from .utils.helpers import decode_image
+
+DEFAULT_PORT = 8765
+MAX_UPLOAD = 32 * 1024 * 1024   # byte per request
+MAX_PARTS = 16                  # bagian per body multipart/form-data
+REQUEST_TIMEOUT = 60.0          # detik menunggu hasil sebelum 504
+METRICS_WINDOW = 10.0           # detik, untuk citra/detik & persentil latensi
+_RESIZED_SHAPE = (ANALYSIS_SIZE[1], ANALYSIS_SIZE[0], 3)
+
+_PIPELINE = None  # satu pipeline (+ Workspace) per proses worker
+
+
+def _init_worker(seg_params, lesion_params):
+    """Pemanasan worker: pipeline dibuat & dijalankan sekali agar request pertama tidak lambat."""
+    global _PIPELINE
+    from .utils.synthetic import make_leaf
+
+    _PIPELINE = LeafPipeline(seg_params, lesion_params, workspace=Workspace())
+    _PIPELINE.run(make_leaf(*ANALYSIS_SIZE)[0])
+
+
+def _ready():
+    return os.getpid()
+
+
+def _json_features(features):
+    return {k: int(features[k]) if k == 'num_lesions' else float(features[k]) for k in FEATURE_ORDER}
+
+
+def _multi_leaf_response(resized, pipeline, profiler, thumbnail):
+    result = analyze_leaves(resized, pipeline.seg_params, pipeline.lesion_params, max_workers=1, profiler=profiler)
+    aggregate = result['aggregate']
+    response = {'label': aggregate['label'], 'confidence': float(aggregate['confidence']),
+                'recommendation': aggregate['recommendation'], 'features': None,
+                'aggregate': {k: float(v) if isinstance(v, float) else v for k, v in aggregate.items()},
+                'leaves': [{'index': leaf['index'], 'bbox': [int(v) for v in leaf['bbox']], 'label': leaf['label'],
+                            'confidence': float(leaf['confidence']), 'features': _json_features(leaf['features'])}
+                           for leaf in result['leaves']]}
+    if thumbnail:
+        response['thumbnail'] = encode_thumbnail(draw_leaves(resized, result))
+    return response
+
+
+def analyze_bytes(data, thumbnail=False, pipeline=None, multi_leaf=False):
+    """
+    Satu citra (byte file) → dict hasil siap-JSON: decode tereduksi → resize → gerbang awal →
+    segmentasi → lesi → fitur → klasifikasi. Error dikembalikan di kunci 'error', tidak dilempar.
+    multi_leaf=True: semua daun di bingkai (analyze_leaves) — hasil per daun & agregat.
+    """
+    pipeline = pipeline or _PIPELINE or LeafPipeline()
+    profiler = StageProfiler()
+    try:
+        with profiler.stage('decode') as record:
+            image = profiler.add_output(record, decode_image(data, target_size=ANALYSIS_SIZE))
+        with profiler.stage('resize'):
+            resized = resize_for_analysis(image, out=buffer(pipeline.workspace, 'resized', _RESIZED_SHAPE))
+        with profiler.stage('validate'):
+            check = check_leaf_image(resized, **{k: pipeline.seg_params[k] for k in ('h_min', 'h_max', 's_min')},
+                                     **({'min_leaf_area': MIN_AREA_RATIO} if multi_leaf else {}))
+        response = {'label': None, 'confidence': None, 'recommendation': None, 'features': None,
+                    'rejected': None if check['ok'] else check['reason']}
+        if check['ok'] and multi_leaf:
+            response.update(_multi_leaf_response(resized, pipeline, profiler, thumbnail))
+        elif check['ok']:
+            pipeline.profiler = profiler
+            result = pipeline.run(resized)
+            response.update(label=result['label'], confidence=float(result['confidence']),
+                            recommendation=result['recommendation'],
+                            features=_json_features(result['features']))
+            if thumbnail:
+                response['thumbnail'] = encode_thumbnail(
+                    overlay_thumbnail(resized, result['leaf_contour'], result['lesions']))
+        elif thumbnail:
+            response['thumbnail'] = encode_thumbnail(resized)
+    except Exception as e:
+        return {'error': str(e)}
+    response['timings'] = {name: round(r['ms'], 3) for name, r in profiler.ordered()}
+    return response
+
+
+def analyze_batch(jobs):
+    """jobs: list (byte citra, thumbnail?, multi_leaf?) → list hasil analyze_bytes, berurutan."""
+    return [analyze_bytes(data, thumbnail, multi_leaf=multi_leaf) for data, thumbnail, multi_leaf in jobs]
+
+
+class Metrics:
+    """Penghitung layanan (aman antar thread) untuk /metrics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.monotonic()
+        self.counts = {'received': 0, 'completed': 0, 'errors': 0, 'rejected': 0, 'overloaded': 0,
+                       'batches': 0, 'batch_items': 0}
+        self._recent = deque(maxlen=4096)  # (waktu selesai, latensi ms)
+
+    def add(self, name, n=1):
+        with self._lock:
+            self.counts[name] += n
+
+    def observe(self, latency_ms, failed=False, rejected=False):
+        with self._lock:
+            self.counts['completed'] += 1
+            self.counts['errors'] += failed
+            self.counts['rejected'] += rejected
+            self._recent.append((time.monotonic(), latency_ms))
+
+    def snapshot(self, **gauges):
+        now = time.monotonic()
+        with self._lock:
+            counts = dict(self.counts)
+            window = [ms for t, ms in self._recent if t >= now - METRICS_WINDOW]
+        span = min(METRICS_WINDOW, now - self.started)
+        lat = np.array(window) if window else None
+        return {
+            **gauges,
+            **counts,
+            'uptime_s': round(now - self.started, 1),
+            'avg_batch_size': round(counts['batch_items'] / counts['batches'], 2) if counts['batches'] else 0.0,
+            'images_per_second': round(len(window) / span, 2) if span > 0 else 0.0,
+            'latency_ms': {f"p{q}": round(float(np.percentile(lat, q)), 1) for q in (50, 95, 99)} if lat is not None else None,
+        }
+
+
+class MicroBatcher:
+    """
+    Antrean request → batch → ProcessPoolExecutor. Batch membesar (sampai max_batch) hanya
+    saat antrean menumpuk; batch yang berjalan dibatasi 2× worker.
+    """
+
+    def __init__(self, executor, workers, metrics, max_batch=8, batch_wait=0.005, max_queue=256):
+        self.executor = executor
+        self.workers = workers
+        self.metrics = metrics
+        self.max_batch = max_batch
+        self.batch_wait = batch_wait
+        self.queue = queue.Queue(max_queue)
+        self._slots = threading.BoundedSemaphore(workers * 2)
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        threading.Thread(target=self._loop, name="micro-batcher", daemon=True).start()
+
+    @property
+    def in_flight(self):
+        with self._lock:
+            return self._in_flight
+
+    def submit(self, data, thumbnail=False, multi_leaf=False):
+        """Future hasil analyze_bytes; melempar queue.Full bila antrean penuh."""
+        future = Future()
+        self.queue.put_nowait((data, thumbnail, multi_leaf, future))
+        self.metrics.add('received')
+        return future
+
+    def _collect(self):
+        batch = [self.queue.get()]
+        target = max(1, min(self.max_batch, math.ceil((1 + self.queue.qsize()) / self.workers)))
+        deadline = time.monotonic() + self.batch_wait
+        while len(batch) < target:
+            timeout = deadline - time.monotonic()
+            try:
+                batch.append(self.queue.get(timeout=timeout) if timeout > 0 else self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _loop(self):
+        while True:
+            self._slots.acquire()  # tunggu slot dulu: selama menunggu, antrean terisi → batch lebih besar
+            batch = self._collect()
+            with self._lock:
+                self._in_flight += 1
+            self.metrics.add('batches')
+            self.metrics.add('batch_items', len(batch))
+            try:
+                task = self.executor.submit(analyze_batch, [job[:3] for job in batch])
+            except Exception as e:  # pool rusak / sedang ditutup
+                self._finish(batch, error=e)
+                continue
+            task.add_done_callback(lambda f, batch=batch: self._finish(batch, f))
+
+    def _finish(self, batch, task=None, error=None):
+        try:
+            results = task.result() if error is None else None
+        except Exception as e:
+            error = e
+        for i, (*_, future) in enumerate(batch):
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(results[i])
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+
+def _multipart_file(body, content_type, field='image'):
+    """
+    Isi field `field` (atau file pertama) dari body multipart/form-data; None bila tidak ada.
+    ValueError bila body bukan multipart yang sah (boundary, header bagian, penutup, jumlah bagian).
+    """
+    boundary = None
+    for param in content_type.split(';')[1:]:
+        name, _, value = param.strip().partition('=')
+        if name.lower() == 'boundary':
+            boundary = value.strip('"')
+    if not boundary or len(boundary) > 70:  # RFC 2046: 1–70 karakter
+        raise ValueError("boundary multipart tidak valid")
+    delimiter = b'--' + boundary.encode('latin-1')
+    start = body.find(delimiter)
+    if start < 0:
+        raise ValueError("boundary multipart tidak ditemukan di body")
+    chunks = body[start + len(delimiter):].split(b'\r\n' + delimiter)
+    if len(chunks) < 2 or not chunks[-1].startswith(b'--'):
+        raise ValueError("multipart tanpa boundary penutup")
+    if len(chunks) - 1 > MAX_PARTS:
+        raise ValueError(f"multipart melebihi {MAX_PARTS} bagian")
+    fallback = None
+    for chunk in chunks[:-1]:
+        head, sep, payload = chunk.partition(b'\r\n\r\n')
+        disposition = next((line for line in head.split(b'\r\n')
+                            if line.lower().startswith(b'content-disposition:')), b'')
+        if not chunk.startswith(b'\r\n') or not sep or b'form-data' not in disposition.lower():
+            raise ValueError("header bagian multipart tidak valid")
+        if f'name="{field}"'.encode() in disposition:
+            return payload
+        if fallback is None and b'filename=' in disposition:
+            fallback = payload
+    return fallback
+
+
+class DiagnosisHandler(BaseHTTPRequestHandler):
+    server_version = "LeafHealthAI/1.0"
+    protocol_version = "HTTP/1.1"  # keep-alive: klien yang mengirim banyak foto memakai satu koneksi
+    disable_nagle_algorithm = True  # header & body ditulis terpisah → tanpa ini tertahan delayed-ACK ~40 ms
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == '/health':
+            self._send_json(200, {'status': 'ok', 'workers': self.server.workers})
+        elif path == '/metrics':
+            batcher = self.server.batcher
+            self._send_json(200, self.server.metrics.snapshot(
+                workers=self.server.workers, queue_depth=batcher.queue.qsize(), batches_in_flight=batcher.in_flight))
+        else:
+            self._send_json(404, {'error': 'tidak ditemukan'})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != '/analyze':
+            self._send_json(404, {'error': 'tidak ditemukan'})
+            return
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+        except ValueError:
+            self.close_connection = True
+            self._send_json(400, {'error': 'Content-Length tidak valid'})
+            return
+        if length <= 0:
+            self._send_json(411, {'error': 'Content-Length wajib diisi'})
+            return
+        if length > MAX_UPLOAD:
+            self.close_connection = True
+            self._send_json(413, {'error': f'citra melebihi {MAX_UPLOAD // 2**20} MB'})
+            return
+        t0 = time.perf_counter()
+        body = self.rfile.read(length)
+        if len(body) < length:
+            self.close_connection = True
+            self._send_json(400, {'error': 'body lebih pendek dari Content-Length'})
+            return
+        content_type = self.headers.get('Content-Type', '')
+        if content_type.lower().startswith('multipart/form-data'):
+            try:
+                body = _multipart_file(body, content_type)
+            except ValueError as e:
+                self._send_json(400, {'error': str(e)})
+                return
+            if not body:
+                self._send_json(400, {'error': "field 'image' tidak ada di form"})
+                return
+        query = parse_qs(url.query)
+        want_thumbnail = query.get('thumbnail', ['0'])[0].lower() in ('1', 'true', 'yes')
+        multi_leaf = query.get('multi_leaf', ['0'])[0].lower() in ('1', 'true', 'yes')
+
+        try:
+            future = self.server.batcher.submit(body, want_thumbnail, multi_leaf)
+        except queue.Full:
+            self.server.metrics.add('overloaded')
+            self._send_json(503, {'error': 'antrean penuh, coba lagi'}, {'Retry-After': '1'})
+            return
+        try:
+            result = future.result(timeout=REQUEST_TIMEOUT)
+        except Exception as e:
+            latency_ms = (time.perf_counter() - t0) * 1000.0
+            self.server.metrics.observe(latency_ms, failed=True)
+            self._send_json(504 if isinstance(e, TimeoutError) else 500, {'error': str(e) or type(e).__name__})
+            return
+
+        latency_ms = (time.perf_counter() - t0) * 1000.0
+        failed = 'error' in result
+        self.server.metrics.observe(latency_ms, failed=failed, rejected=bool(result.get('rejected')))
+        if result.get('thumbnail') is not None:
+            result['thumbnail'] = base64.b64encode(result['thumbnail']).decode('ascii')
+        result['latency_ms'] = round(latency_ms, 1)
+        self._send_json(400 if failed else 200, result)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class DiagnosisServer(ThreadingHTTPServer):
+    """HTTP server + pool worker yang sudah dipanaskan + micro-batcher."""
+
+    daemon_threads = True
+    request_queue_size = 128  # backlog listen(); default 5 → koneksi ditolak saat banyak tablet bersamaan
+
+    def __init__(self, address, workers=None, seg_params=None, lesion_params=None, max_batch=8,
+                 batch_wait=0.005, max_queue=256, verbose=False):
+        self.workers = workers or os.cpu_count() or 1
+        self.verbose = verbose
+        self.metrics = Metrics()
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                            initargs=(seg_params, lesion_params))
+        # Pemanasan: semua proses dibuat & initializer selesai sebelum port dibuka
+        for future in [self.executor.submit(_ready) for _ in range(self.workers)]:
+            future.result()
+        self.batcher = MicroBatcher(self.executor, self.workers, self.metrics, max_batch, batch_wait, max_queue)
+        super().__init__(address, DiagnosisHandler)
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _stop(signum, frame):
+    raise KeyboardInterrupt
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python leafhealth_server.py',
+                                     description='LeafHealthAI — layanan diagnosa HTTP (LAN)')
+    parser.add_argument('--host', default='127.0.0.1',
+                        help='Alamat bind (default: 127.0.0.1, hanya mesin ini; 0.0.0.0 = semua antarmuka/LAN)')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('-j', '--workers', type=int, default=None, help='Jumlah proses (default: jumlah core)')
+    parser.add_argument('--max-batch', type=int, default=8, help='Maks. citra per batch ke worker')
+    parser.add_argument('--batch-wait-ms', type=float, default=5.0, help='Tunggu maks. untuk mengisi batch')
+    parser.add_argument('--max-queue', type=int, default=256, help='Kapasitas antrean request (lebih → 503)')
+    parser.add_argument('--verbose', action='store_true', help='Log setiap request')
+    for name, value in {**DEFAULT_SEG_PARAMS, **DEFAULT_LESION_PARAMS}.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, default=None, help=f"default: {value}")
+    args = parser.parse_args(argv)
+
+    seg_params = {k: getattr(args, k) for k in DEFAULT_SEG_PARAMS if getattr(args, k) is not None}
+    lesion_params = {k: getattr(args, k) for k in DEFAULT_LESION_PARAMS if getattr(args, k) is not None}
+    server = DiagnosisServer((args.host, args.port), args.workers, seg_params, lesion_params,
+                             args.max_batch, args.batch_wait_ms / 1000.0, args.max_queue, args.verbose)
+    signal.signal(signal.SIGTERM, _stop)  # systemd / kill: berhenti rapi seperti Ctrl+C
+    print(f"✓ LeafHealthAI siap di http://{args.host}:{args.port} ({server.workers} worker) — Ctrl+C untuk berhenti")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,258 @@
+# src/store.py
+"""
+Arsip hasil analisis (SQLite) dengan kunci hash isi file + hash parameter.
+
+    python -m src.store [--label Jamur] [--since 2026-01-01] [--min-ratio 0.05] [--limit 50]
+"""
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+from .core.classifier import FEATURE_ORDER, LABELS, RECOMMENDATIONS
+from .core.lesion_detection import LESION_DTYPE
+
+PROCESSED_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'processed')
+DEFAULT_STORE = os.path.join(PROCESSED_DIR, 'results.sqlite')
+STORE_VERSION = 1     # naikkan bila algoritma pipeline berubah → hasil lama tidak dipakai lagi
+THUMB_SIDE = 240      # sisi terpanjang thumbnail overlay
+THUMB_QUALITY = 80
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    image_hash TEXT NOT NULL,
+    param_hash TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    source TEXT,
+    label_code INTEGER NOT NULL,
+    label TEXT NOT NULL,
+    confidence REAL NOT NULL,
+    median_hue REAL, entropy REAL, lesion_area_ratio REAL, num_lesions INTEGER, avg_circularity REAL,
+    params TEXT,
+    lesions BLOB,
+    thumbnail BLOB,
+    PRIMARY KEY (image_hash, param_hash)
+);
+CREATE INDEX IF NOT EXISTS idx_results_created ON results (created_at);
+CREATE INDEX IF NOT EXISTS idx_results_label ON results (label_code, created_at);
+CREATE INDEX IF NOT EXISTS idx_results_ratio ON results (lesion_area_ratio);
+"""
+_SUMMARY_COLUMNS = ('image_hash', 'param_hash', 'created_at', 'source', 'label', 'confidence') + FEATURE_ORDER
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """Hash isi file citra (blake2b) — kunci arsip tanpa perlu decode."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def param_hash(seg_params, lesion_params, mode='standard'):
+    """Hash parameter analisis (+ mode & STORE_VERSION) sebagai bagian kedua kunci arsip."""
+    payload = json.dumps({'seg': seg_params, 'lesion': lesion_params, 'mode': mode, 'version': STORE_VERSION},
+                         sort_keys=True)
+    return hashlib.blake2b(payload.encode(), digest_size=8).hexdigest()
+
+
+def overlay_thumbnail(image_rgb, leaf_contour=None, lesions=None, max_side=THUMB_SIDE):
+    """
+    Thumbnail overlay murah: citra diperkecil dulu, lalu kontur daun (hijau) & lingkaran
+    lesi (merah) digambar pada skala thumbnail — tidak perlu overlay resolusi penuh.
+    """
+    h, w = image_rgb.shape[:2]
+    scale = min(1.0, max_side / max(h, w))
+    thumb = cv2.resize(image_rgb, (max(1, round(w * scale)), max(1, round(h * scale))), interpolation=cv2.INTER_AREA)
+    if leaf_contour is not None:
+        contour = np.round(leaf_contour.astype(np.float64) * scale).astype(np.int32)
+        cv2.drawContours(thumb, [contour], -1, (0, 255, 0), 1)
+    if lesions is not None and len(lesions):
+        cx = ((lesions['x'] + lesions['w'] / 2.0) * scale).astype(int)
+        cy = ((lesions['y'] + lesions['h'] / 2.0) * scale).astype(int)
+        radii = np.maximum((np.hypot(lesions['w'], lesions['h']) / 2.0 * scale).astype(int), 2)
+        for x, y, r in zip(cx.tolist(), cy.tolist(), radii.tolist()):
+            cv2.circle(thumb, (x, y), r, (255, 0, 0), 1)
+    return thumb
+
+
+def encode_thumbnail(thumb_rgb, max_side=THUMB_SIDE):
+    """Citra RGB (mis. overlay GUI) → byte JPEG thumbnail."""
+    h, w = thumb_rgb.shape[:2]
+    if max(h, w) > max_side:
+        scale = max_side / max(h, w)
+        thumb_rgb = cv2.resize(thumb_rgb, (max(1, round(w * scale)), max(1, round(h * scale))),
+                               interpolation=cv2.INTER_AREA)
+    ok, buf = cv2.imencode('.jpg', cv2.cvtColor(np.ascontiguousarray(thumb_rgb), cv2.COLOR_RGB2BGR),
+                           [cv2.IMWRITE_JPEG_QUALITY, THUMB_QUALITY])
+    return buf.tobytes() if ok else None
+
+
+def decode_thumbnail(data):
+    """Byte JPEG thumbnail → citra RGB (atau None)."""
+    if not data:
+        return None
+    img = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    return cv2.cvtColor(img, cv2.COLOR_BGR2RGB) if img is not None else None
+
+
+class ResultStore:
+    """
+    Arsip SQLite (mode WAL: banyak pembaca — mis. proses worker batch — satu penulis).
+    Satu koneksi per objek, aman dipakai dari beberapa thread (dikunci).
+    """
+
+    def __init__(self, path=DEFAULT_STORE, readonly=False):
+        self.path = path
+        if readonly:
+            self.conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self.conn = sqlite3.connect(path, check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.executescript(_SCHEMA)
+        self.conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+
+    def get(self, image_hash, param_hash):
+        """Hasil tersimpan sebagai dict (features, label, confidence, recommendation, lesions, ...) atau None."""
+        with self._lock:
+            row = self.conn.execute("SELECT * FROM results WHERE image_hash = ? AND param_hash = ?",
+                                    (image_hash, param_hash)).fetchone()
+        if row is None:
+            return None
+        code = row['label_code']
+        features = {k: row[k] for k in FEATURE_ORDER}
+        features['num_lesions'] = int(features['num_lesions'])
+        return {
+            'image_hash': image_hash,
+            'param_hash': param_hash,
+            'created_at': row['created_at'],
+            'source': row['source'],
+            'features': features,
+            'label': LABELS[code],
+            'confidence': row['confidence'],
+            'recommendation': RECOMMENDATIONS[code],
+            'params': json.loads(row['params']) if row['params'] else None,
+            'lesions': np.frombuffer(row['lesions'] or b'', dtype=LESION_DTYPE).copy(),
+            'thumbnail': row['thumbnail'],
+        }
+
+    def __contains__(self, key):
+        with self._lock:
+            return self.conn.execute("SELECT 1 FROM results WHERE image_hash = ? AND param_hash = ?",
+                                     key).fetchone() is not None
+
+    def put(self, image_hash, param_hash, result, source=None, params=None, thumbnail=None, commit=True):
+        """
+        Simpan hasil (dict dengan features, label, confidence, lesions opsional).
+        thumbnail: byte JPEG (encode_thumbnail). Entri dengan kunci sama ditimpa.
+        """
+        features = result['features']
+        lesions = result.get('lesions')
+        record = (
+            image_hash, param_hash, datetime.now().isoformat(sep=' ', timespec='seconds'), source,
+            LABELS.index(result['label']), result['label'], float(result['confidence']),
+            *(float(features[k]) for k in FEATURE_ORDER),
+            json.dumps(params, sort_keys=True) if params is not None else None,
+            np.ascontiguousarray(lesions, dtype=LESION_DTYPE).tobytes() if lesions is not None else None,
+            thumbnail,
+        )
+        with self._lock:
+            self.conn.execute(f"INSERT OR REPLACE INTO results VALUES ({', '.join('?' * len(record))})", record)
+            if commit:
+                self.conn.commit()
+
+    def commit(self):
+        with self._lock:
+            self.conn.commit()
+
+    def query(self, label=None, since=None, until=None, min_ratio=None, max_ratio=None, limit=None):
+        """
+        Ringkasan hasil (tanpa blob) terurut terbaru dulu, memakai indeks tanggal/label/rasio.
+        label: teks label (mis. 'Jamur', cocok sebagian) atau kode; since/until: 'YYYY-MM-DD[ HH:MM:SS]'.
+        """
+        where, args = [], []
+        if label is not None:
+            code = label if isinstance(label, int) else next(
+                (i for i, name in enumerate(LABELS) if str(label).lower() in name.lower()), -1)
+            where.append("label_code = ?")
+            args.append(code)
+        if since:
+            where.append("created_at >= ?")
+            args.append(str(since))
+        if until:
+            where.append("created_at < ?")
+            args.append(str(until))
+        if min_ratio is not None:
+            where.append("lesion_area_ratio >= ?")
+            args.append(float(min_ratio))
+        if max_ratio is not None:
+            where.append("lesion_area_ratio <= ?")
+            args.append(float(max_ratio))
+        sql = f"SELECT {', '.join(_SUMMARY_COLUMNS)} FROM results"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY created_at DESC"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        with self._lock:
+            return [dict(row) for row in self.conn.execute(sql, args)]
+
+    def iter_summaries(self, chunk=4096):
+        """Semua ringkasan hasil (tanpa blob, plus label_code) terurut waktu, per list `chunk` baris."""
+        cursor = self.conn.cursor()
+        with self._lock:
+            cursor.execute(f"SELECT label_code, {', '.join(_SUMMARY_COLUMNS)} FROM results ORDER BY created_at")
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(chunk)
+            if not rows:
+                return
+            yield [dict(row) for row in rows]
+
+    def __len__(self):
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m src.store', description='LeafHealthAI — kueri arsip hasil')
+    parser.add_argument('--store', default=DEFAULT_STORE)
+    parser.add_argument('--label', help="Teks label, mis. 'Jamur' / 'Bakteri' / 'Tidak'")
+    parser.add_argument('--since', help='Tanggal awal (YYYY-MM-DD)')
+    parser.add_argument('--until', help='Tanggal akhir, eksklusif (YYYY-MM-DD)')
+    parser.add_argument('--min-ratio', type=float)
+    parser.add_argument('--max-ratio', type=float)
+    parser.add_argument('--limit', type=int, default=50)
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.store):
+        parser.error(f"Arsip tidak ditemukan: {args.store}")
+    with ResultStore(args.store, readonly=True) as store:
+        rows = store.query(args.label, args.since, args.until, args.min_ratio, args.max_ratio, args.limit)
+    for row in rows:
+        print(f"{row['created_at']}  {row['label']:<20} {row['confidence']:4.0%}  "
+              f"rasio {row['lesion_area_ratio']:.3f}  lesi {row['num_lesions']:3d}  {row['source'] or row['image_hash']}")
+    print(f"✓ {len(rows)} hasil")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
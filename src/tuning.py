@@ -0,0 +1,235 @@
+# src/tuning.py
+"""
+Tuning otomatis parameter segmentasi & deteksi lesi terhadap citra berlabel.
+
+    python -m src.tuning <dir> [--strategy coord|grid] [--workers N]
+
+<dir> berisi subfolder Jamur/, Bakteri/ (opsional Tidak_Terdeteksi/); hasilnya untuk `src.batch --params`.
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .batch import IMAGE_EXTS, PROCESSED_DIR
+from .core.cache import StageCache, freeze_params
+from .core.classifier import LABEL_UNDETECTED, LABELS, MIN_LESION_RATIO, classify_condition
+from .core.feature_extraction import extract_features
+from .core.lesion_detection import detect_lesions
+from .core.pipeline import ANALYSIS_SIZE, DEFAULT_LESION_PARAMS, DEFAULT_SEG_PARAMS, LeafPipeline, resize_for_analysis
+from .utils.helpers import load_image
+
+LABEL_KEYS = ('jamur', 'bakteri', 'tidak terdeteksi')
+
+# Nilai kandidat per parameter (grid penuh = perkalian semua daftar)
+PARAM_GRID = {
+    'h_min': [25, 30, 35, 40, 45],
+    'h_max': [75, 85, 95],
+    's_min': [30, 50, 70],
+    'hue_min': [0, 5, 10],
+    'hue_max': [30, 35, 40, 45, 50],
+    'min_area': [50, 100, 150, 250],
+}
+
+_CACHE = None  # StageCache per proses worker
+
+
+def label_key(label):
+    """'🍄 Jamur' → 'jamur', 'Tidak_Terdeteksi' → 'tidak terdeteksi'."""
+    text = label.replace('_', ' ').strip().lower()
+    for key in LABEL_KEYS:
+        if text.endswith(key):
+            return key
+    return None
+
+
+def load_labelled(root):
+    """Daftar (path, label_key) dari subfolder berlabel di bawah root."""
+    samples = []
+    for name in sorted(os.listdir(root)):
+        key = label_key(name)
+        folder = os.path.join(root, name)
+        if key is None or not os.path.isdir(folder):
+            continue
+        for dirpath, dirnames, filenames in os.walk(folder):
+            dirnames.sort()
+            for fname in sorted(filenames):
+                if fname.lower().endswith(IMAGE_EXTS):
+                    samples.append((os.path.join(dirpath, fname), key))
+    return samples
+
+
+def split_params(params):
+    seg = {k: params[k] for k in DEFAULT_SEG_PARAMS}
+    lesion = {k: params[k] for k in DEFAULT_LESION_PARAMS}
+    return seg, lesion
+
+
+def _init_worker(cache_bytes):
+    global _CACHE
+    _CACHE = StageCache(cache_bytes)
+
+
+def _window_labels(result, hue_min, hue_max, min_areas):
+    """
+    Label satu jendela Hue untuk beberapa min_area: threshold dari HueIndex, lesi diukur sekali
+    dengan min_area terkecil lalu difilter per min_area.
+    """
+    image, leaf_mask, hsv = result['image'], result['leaf_mask'], result['hsv']
+    lesion_mask, lesions, _ = detect_lesions(
+        image, leaf_mask, hue_min, hue_max, min(min_areas), hsv=hsv, draw_overlay=False,
+        lesion_thresh=result['hue_index'].mask(hue_min, hue_max))
+    labels = []
+    for min_area in min_areas:
+        features = extract_features(image, leaf_mask, lesion_mask, lesions[lesions['area'] >= min_area], hsv=hsv)
+        labels.append(label_key(classify_condition(features)[0]))
+    return labels
+
+
+def _evaluate_shard(paths, candidates):
+    """
+    Prediksi label tiap (kandidat, citra) pada satu shard. Jendela dengan rasio threshold mentah
+    < MIN_LESION_RATIO langsung Tidak Terdeteksi (rasio setelah opening tidak mungkin lebih besar).
+    """
+    cache = _CACHE if _CACHE is not None else StageCache()
+    # parameter segmentasi → jendela (hue_min, hue_max) → [(indeks kandidat, min_area)]
+    groups = {}
+    for i, c in enumerate(candidates):
+        seg, lesion = split_params(c)
+        windows = groups.setdefault(freeze_params(seg), (seg, {}))[1]
+        windows.setdefault((lesion['hue_min'], lesion['hue_max']), []).append((i, lesion['min_area']))
+    undetected = label_key(LABELS[LABEL_UNDETECTED])
+    preds = [[None] * len(paths) for _ in candidates]
+    for j, path in enumerate(paths):
+        try:
+            image = cache.get_or_compute((path, 'resize'), lambda: {'image': resize_for_analysis(load_image(path, target_size=ANALYSIS_SIZE))})['image']
+        except ValueError:
+            continue
+        for seg, windows in groups.values():
+            # HSV, mask daun & HueIndex lewat cache (dipakai ulang antar putaran)
+            pipeline = LeafPipeline(seg, cache=cache)
+            result = pipeline.index(pipeline.segment(pipeline.prepare(image, image_key=path)))
+            hue_min, hue_max = np.array(list(windows)).T
+            ratios = result['hue_index'].sweep(hue_min, hue_max)['lesion_area_ratio']
+            for (window, members), ratio in zip(windows.items(), ratios.tolist()):
+                if ratio < MIN_LESION_RATIO:
+                    labels = [undetected] * len(members)
+                else:
+                    labels = _window_labels(result, *window, [m for _, m in members])
+                for (i, _), label in zip(members, labels):
+                    preds[i][j] = label
+    return preds
+
+
+class Evaluator:
+    """Menilai daftar kandidat parameter secara paralel; hasil per kandidat di-memo."""
+
+    def __init__(self, samples, workers=None, cache_bytes=512 * 1024 * 1024):
+        self.paths = [p for p, _ in samples]
+        self.labels = [k for _, k in samples]
+        self.workers = workers or os.cpu_count() or 1
+        n_shards = min(len(self.paths), self.workers) or 1
+        self.shards = [list(range(i, len(self.paths), n_shards)) for i in range(n_shards)]
+        self.scores = {}
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                            initargs=(cache_bytes,))
+
+    def close(self):
+        self.executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def accuracy(self, candidates):
+        todo = []
+        for c in candidates:
+            key = tuple(sorted(c.items()))
+            if key not in self.scores and c not in todo:
+                todo.append(c)
+        if todo:
+            correct = [0] * len(todo)
+            futures = [self.executor.submit(_evaluate_shard, [self.paths[j] for j in shard], todo)
+                       for shard in self.shards]
+            for shard, future in zip(self.shards, futures):
+                for i, preds in enumerate(future.result()):
+                    correct[i] += sum(p == self.labels[j] for p, j in zip(preds, shard))
+            for c, n in zip(todo, correct):
+                self.scores[tuple(sorted(c.items()))] = n / len(self.paths) if self.paths else 0.0
+        return [self.scores[tuple(sorted(c.items()))] for c in candidates]
+
+
+def grid_search(evaluator, grid=PARAM_GRID):
+    names = list(grid)
+    candidates = [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+    scores = evaluator.accuracy(candidates)
+    best = max(range(len(candidates)), key=lambda i: scores[i])
+    return candidates[best], scores[best]
+
+
+def coordinate_descent(evaluator, grid=PARAM_GRID, start=None, max_rounds=5):
+    """Optimasi satu parameter per langkah (kandidat satu sumbu dievaluasi paralel) sampai konvergen."""
+    best = dict(start or {**DEFAULT_SEG_PARAMS, **DEFAULT_LESION_PARAMS})
+    best_score = evaluator.accuracy([best])[0]
+    for _ in range(max_rounds):
+        improved = False
+        for name, values in grid.items():
+            candidates = [{**best, name: v} for v in values]
+            scores = evaluator.accuracy(candidates)
+            i = max(range(len(candidates)), key=lambda k: scores[k])
+            if scores[i] > best_score:
+                best, best_score, improved = candidates[i], scores[i], True
+        if not improved:
+            break
+    return best, best_score
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m src.tuning', description='LeafHealthAI — tuning parameter threshold')
+    parser.add_argument('directory', help='Direktori dengan subfolder Jamur/ dan Bakteri/')
+    parser.add_argument('--strategy', choices=('coord', 'grid'), default='coord')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='Jumlah proses (default: jumlah core)')
+    parser.add_argument('--rounds', type=int, default=5, help='Maksimum putaran coordinate descent')
+    parser.add_argument('-o', '--output', help='File JSON hasil (default: data/processed/tuning_<nama_dir>.json)')
+    args = parser.parse_args(argv)
+
+    samples = load_labelled(args.directory)
+    if not samples:
+        parser.error(f"Tidak ada citra berlabel (subfolder Jamur/Bakteri) di: {args.directory}")
+
+    with Evaluator(samples, args.workers) as evaluator:
+        baseline = evaluator.accuracy([{**DEFAULT_SEG_PARAMS, **DEFAULT_LESION_PARAMS}])[0]
+        if args.strategy == 'grid':
+            best, score = grid_search(evaluator)
+        else:
+            best, score = coordinate_descent(evaluator, max_rounds=args.rounds)
+        evaluated = len(evaluator.scores)
+
+    output = args.output or os.path.join(
+        PROCESSED_DIR, f"tuning_{os.path.basename(os.path.normpath(args.directory))}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({
+            'params': best,
+            'accuracy': score,
+            'baseline_accuracy': baseline,
+            'strategy': args.strategy,
+            'n_images': len(samples),
+            'n_candidates': evaluated,
+        }, f, indent=2)
+
+    print(f"Akurasi default : {baseline:.1%}")
+    print(f"Akurasi terbaik : {score:.1%}  ({evaluated} kandidat, {len(samples)} citra)")
+    print("Parameter       : " + ", ".join(f"{k}={v}" for k, v in best.items()))
+    print(f"✓ Disimpan → {output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
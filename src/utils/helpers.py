@@ -1,15 +1,107 @@
 # src/utils/helpers.py
+import io
+import struct
+
 import cv2
 import numpy as np
-from PIL import Image
 
-def load_image(filepath):
-    """Load image using OpenCV and convert BGR → RGB."""
-    img_bgr = cv2.imread(filepath)
+_REDUCED_FLAGS = ((8, cv2.IMREAD_REDUCED_COLOR_8), (4, cv2.IMREAD_REDUCED_COLOR_4), (2, cv2.IMREAD_REDUCED_COLOR_2))
+# Marker SOF JPEG (baseline/progressive/...) yang memuat ukuran frame; C4/C8/CC bukan SOF
+_JPEG_SOF = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+def _jpeg_size(f):
+    """Cari segmen SOF di header JPEG → (lebar, tinggi), atau None."""
+    f.seek(2)
+    while True:
+        byte = f.read(1)
+        while byte and byte != b'\xff':
+            byte = f.read(1)
+        while byte == b'\xff':
+            byte = f.read(1)
+        if not byte:
+            return None
+        marker = byte[0]
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:  # marker tanpa panjang segmen
+            continue
+        seg = f.read(2)
+        if len(seg) < 2:
+            return None
+        if marker in _JPEG_SOF:
+            data = f.read(5)
+            if len(data) < 5:
+                return None
+            height, width = struct.unpack('>HH', data[1:5])
+            return width, height
+        f.seek(struct.unpack('>H', seg)[0] - 2, 1)
+
+def _header_size(f):
+    """(lebar, tinggi) dari header JPEG / PNG pada file object biner; None untuk format lain."""
+    head = f.read(24)
+    if head.startswith(b'\x89PNG\r\n\x1a\n') and head[12:16] == b'IHDR':
+        return struct.unpack('>II', head[16:24])
+    if head.startswith(b'\xff\xd8'):
+        return _jpeg_size(f)
+    return None
+
+def read_image_size(filepath):
+    """
+    Ukuran (lebar, tinggi) dari header file tanpa decode piksel; None jika gagal.
+    JPEG & PNG dibaca langsung (tanpa PIL, agar proses worker tidak memuatnya);
+    format lain lewat PIL yang diimpor saat dibutuhkan.
+    """
+    try:
+        with open(filepath, 'rb') as f:
+            size = _header_size(f)
+            if size is not None:
+                return size
+        from PIL import Image
+        with Image.open(filepath) as img:
+            return img.size
+    except Exception:
+        return None
+
+def decode_scale(image_size, target_size):
+    """Faktor reduksi decode terbesar (1/2/4/8) yang hasilnya masih >= target_size (orientasi bebas)."""
+    if image_size is None or target_size is None:
+        return 1
+    big, small = max(image_size), min(image_size)
+    t_big, t_small = max(target_size), min(target_size)
+    for factor, _ in _REDUCED_FLAGS:
+        if big // factor >= t_big and small // factor >= t_small:
+            return factor
+    return 1
+
+def load_image(filepath, target_size=None):
+    """
+    Load image using OpenCV and convert BGR → RGB.
+    target_size=(lebar, tinggi): decode langsung pada skala tereduksi (IMREAD_REDUCED_COLOR_2/4/8)
+    yang masih >= target_size, sehingga foto kamera 12–48 MP tidak pernah di-decode penuh.
+    Tanpa target_size, citra asli resolusi penuh yang dimuat.
+    """
+    factor = decode_scale(read_image_size(filepath), target_size) if target_size else 1
+    flag = dict(_REDUCED_FLAGS).get(factor, cv2.IMREAD_COLOR)
+    img_bgr = cv2.imread(filepath, flag)
     if img_bgr is None:
         raise ValueError(f"Gambar tidak ditemukan atau format tidak didukung: {filepath}")
     return cv2.cvtColor(img_bgr, cv2.COLOR_BGR2RGB)
 
+def decode_image(data, target_size=None):
+    """
+    Seperti load_image, untuk byte file citra di memori (mis. upload HTTP): decode tereduksi
+    bila ukuran header JPEG/PNG diketahui dan target_size diberikan. Mengembalikan RGB.
+    """
+    factor = 1
+    if target_size:
+        try:
+            factor = decode_scale(_header_size(io.BytesIO(data)), target_size)
+        except (struct.error, ValueError):
+            factor = 1
+    flag = dict(_REDUCED_FLAGS).get(factor, cv2.IMREAD_COLOR)
+    img_bgr = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), flag)
+    if img_bgr is None:
+        raise ValueError("Data bukan citra atau format tidak didukung")
+    return cv2.cvtColor(img_bgr, cv2.COLOR_BGR2RGB)
+
 def save_image(filepath, img_rgb):
     """Save RGB image to file as BGR."""
     if img_rgb.dtype != np.uint8:
@@ -17,12 +109,38 @@ def save_image(filepath, img_rgb):
     img_bgr = cv2.cvtColor(img_rgb, cv2.COLOR_RGB2BGR)
     cv2.imwrite(filepath, img_bgr)
 
-def overlay_contours(image, contours, color=(0, 255, 0), thickness=2):
-    """Draw contours on image copy (RGB format)."""
-    overlay = image.copy()
+def overlay_contours(image, contours, color=(0, 255, 0), thickness=2, out=None):
+    """Draw contours on image copy (RGB format). out: buffer sebesar image yang dipakai ulang."""
+    if out is None:
+        overlay = image.copy()
+    else:
+        overlay = out
+        np.copyto(overlay, image)
     cv2.drawContours(overlay, contours, -1, color, thickness)
     return overlay
 
+def make_gallery(images, tile=150, cols=3, bg=(0, 0, 0)):
+    """
+    Susun beberapa citra RGB (aspek dipertahankan) dalam grid tile×tile untuk tampilan.
+    Tanpa citra (tidak ada lesi) → None; pemanggil menampilkan panel kosong.
+    """
+    if not images:
+        return None
+    cols = max(1, min(cols, len(images)))
+    rows = (len(images) + cols - 1) // cols
+    gallery = np.full((rows * tile, cols * tile, 3), bg, dtype=np.uint8)
+    for i, img in enumerate(images):
+        h, w = img.shape[:2]
+        if h == 0 or w == 0:
+            continue
+        scale = min(tile / w, tile / h)
+        nw, nh = max(1, int(w * scale)), max(1, int(h * scale))
+        interp = cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR
+        r, c = divmod(i, cols)
+        y, x = r * tile + (tile - nh) // 2, c * tile + (tile - nw) // 2
+        gallery[y:y + nh, x:x + nw] = cv2.resize(img, (nw, nh), interpolation=interp)
+    return gallery
+
 def compute_circularity(contour):
     """Calculate circularity = 4π·area / perimeter²."""
     area = cv2.contourArea(contour)
@@ -0,0 +1,131 @@
+# src/utils/synthetic.py
+import cv2
+import numpy as np
+
+BACKGROUNDS = ('plain', 'soil', 'gradient', 'noise')
+
+# Warna RGB lesi: cokelat (Hue ~10-20) & gelap kehitaman
+LESION_COLORS = {
+    'brown': ((95, 55, 20), (140, 80, 35)),
+    'dark': ((35, 25, 15), (70, 45, 25)),
+}
+
+
+def _neutral(rng, lo, hi):
+    """Warna latar netral/hangat (Hue di luar rentang hijau segmentasi)."""
+    v = float(rng.integers(lo, hi))
+    return v * np.array((1.0, rng.uniform(0.85, 1.0), rng.uniform(0.7, 0.95)), dtype=np.float32)
+
+
+def _background(rng, h, w, kind):
+    if kind == 'soil':
+        base = float(rng.integers(100, 150)) * np.array((1.0, 0.72, 0.5), dtype=np.float32)  # cokelat tanah
+        img = base + rng.normal(0, 12, (h, w, 3))
+    elif kind == 'gradient':
+        a, b = _neutral(rng, 150, 230), _neutral(rng, 60, 150)
+        t = np.linspace(0, 1, h, dtype=np.float32)[:, None, None]
+        img = np.broadcast_to(a * (1 - t) + b * t, (h, w, 3))
+    elif kind == 'noise':
+        img = rng.integers(0, 256, (h, w, 3)).astype(np.float32)
+        img = cv2.GaussianBlur(img, (0, 0), max(h, w) / 200)
+    else:
+        img = np.broadcast_to(_neutral(rng, 170, 230), (h, w, 3))
+    return np.clip(img, 0, 255).astype(np.uint8)
+
+
+def make_leaf(width=640, height=480, n_lesions=8, background='plain', lesion_color='brown',
+              irregular=False, seed=0):
+    """
+    Citra sintetis daun mangga (RGB uint8) untuk benchmark & uji regresi:
+    elips hijau memanjang vertikal (aspek lebar/tinggi 0.3–0.55, lolos is_mango_leaf)
+    dengan tulang daun, di atas latar `background`, plus n_lesions bercak `lesion_color`
+    (irregular=True: tiap bercak gugusan elips kecil → circularity rendah, mirip jamur).
+    Mengembalikan (citra, ground truth dict: leaf_mask, lesion_mask, lesion_centers).
+    """
+    rng = np.random.default_rng(seed)
+    img = _background(rng, height, width, background).copy()
+
+    cx, cy = width / 2 + rng.uniform(-0.05, 0.05) * width, height / 2 + rng.uniform(-0.05, 0.05) * height
+    semi_h = 0.42 * height
+    semi_w = semi_h * rng.uniform(0.3, 0.55)
+    angle = rng.uniform(-10, 10)
+    s = 16  # presisi subpiksel untuk cv2.ellipse
+    ellipse = ((int(cx * s), int(cy * s)), (int(semi_w * s), int(semi_h * s)))
+
+    leaf_mask = np.zeros((height, width), dtype=np.uint8)
+    cv2.ellipse(leaf_mask, ellipse[0], ellipse[1], angle, 0, 360, 255, -1, cv2.LINE_8, 4)
+    green = np.array((rng.integers(30, 60), rng.integers(120, 170), rng.integers(30, 60)), dtype=np.float32)
+    shade = green + rng.normal(0, 6, (height, width, 3))
+    img[leaf_mask > 0] = np.clip(shade[leaf_mask > 0], 0, 255).astype(np.uint8)
+
+    # Tulang daun (lebih terang)
+    rad = np.deg2rad(angle)
+    dx, dy = -np.sin(rad) * semi_h * 0.95, np.cos(rad) * semi_h * 0.95
+    cv2.line(img, (int(cx - dx), int(cy - dy)), (int(cx + dx), int(cy + dy)),
+             tuple(int(v) for v in np.clip(green + 40, 0, 255)), max(1, width // 400))
+
+    # Bercak lesi di dalam daun
+    lesion_mask = np.zeros_like(leaf_mask)
+    lo, hi = LESION_COLORS[lesion_color]
+    centers = []
+    r_max = max(3, int(semi_h * 0.07))
+    for _ in range(n_lesions):
+        for _attempt in range(20):
+            u, v = rng.uniform(-0.8, 0.8, 2)
+            if u * u + v * v > 0.64:
+                continue
+            px = cx + u * semi_w * np.cos(rad) - v * semi_h * np.sin(rad)
+            py = cy + u * semi_w * np.sin(rad) + v * semi_h * np.cos(rad)
+            axes = (int(rng.integers(max(2, r_max // 3), r_max + 1)), int(rng.integers(max(2, r_max // 3), r_max + 1)))
+            color = tuple(int(c) for c in rng.integers(lo, hi))
+            blobs = [((int(px), int(py)), axes)]
+            if irregular:
+                for _ in range(int(rng.integers(3, 7))):
+                    off = rng.normal(0, r_max * 0.8, 2)
+                    blobs.append(((int(px + off[0]), int(py + off[1])), (max(2, axes[0] // 2), max(1, axes[1] // 4))))
+            for center, ax in blobs:
+                tilt = rng.uniform(0, 180)
+                cv2.ellipse(img, center, ax, tilt, 0, 360, color, -1)
+                cv2.ellipse(lesion_mask, center, ax, tilt, 0, 360, 255, -1)
+            centers.append((int(px), int(py)))
+            break
+    return img, {'leaf_mask': leaf_mask, 'lesion_mask': lesion_mask, 'lesion_centers': centers}
+
+
+def make_tray(width=1280, height=960, cols=5, rows=4, n_lesions=3, background='plain', seed=0):
+    """
+    Citra sintetis nampan berisi cols × rows daun (mode multi-daun): tiap sel satu make_leaf
+    dengan latar sama. Mengembalikan (citra, list ground truth per daun dengan 'bbox' sel).
+    """
+    img = np.zeros((height, width, 3), dtype=np.uint8)
+    cell_w, cell_h = width // cols, height // rows
+    truths = []
+    for i in range(cols * rows):
+        leaf, truth = make_leaf(cell_w, cell_h, n_lesions, background=background,
+                                irregular=i % 2 == 1, seed=seed * 1000 + i)
+        y, x = (i // cols) * cell_h, (i % cols) * cell_w
+        img[y:y + cell_h, x:x + cell_w] = leaf
+        truths.append({**truth, 'bbox': (x, y, cell_w, cell_h)})
+    return img, truths
+
+
+def write_leaf_video(path, n_frames=300, width=1280, height=720, fps=30.0, n_leaves=6, speed=8, seed=0):
+    """
+    Video sintetis (MJPG .avi) seperti kamera yang berjalan menyusuri barisan daun — untuk
+    menguji mode video secara offline: n_leaves daun berjajar pada kanvas lebar (make_tray
+    satu baris), jendela width×height bergeser `speed` piksel per bingkai bolak-balik.
+    Mengembalikan jumlah bingkai yang ditulis.
+    """
+    canvas, _ = make_tray(width // 2 * n_leaves, height, cols=n_leaves, rows=1, seed=seed)
+    travel = canvas.shape[1] - width
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), fps, (width, height))
+    if not writer.isOpened():
+        raise RuntimeError(f"VideoWriter tidak dapat membuka {path}")
+    try:
+        for i in range(n_frames):
+            x = (i * speed) % (2 * travel) if travel > 0 else 0
+            x = x if x <= travel else 2 * travel - x
+            writer.write(cv2.cvtColor(canvas[:, x:x + width], cv2.COLOR_RGB2BGR))
+    finally:
+        writer.release()
+    return n_frames
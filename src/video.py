@@ -0,0 +1,307 @@
+# src/video.py
+"""
+Mode video / kamera: segmentasi tiap N bingkai, ROI daun dilacak di antaranya, bingkai dibuang adaptif.
+
+    python -m src.video <sumber> [--every 10] [--target-fps 10] [-o data/processed/video.csv]
+                        [--max-frames N] [--show]
+"""
+import argparse
+import math
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from .batch import FEATURE_NAMES, ResultWriter
+from .core.classifier import CONFIDENCES, FEATURE_ORDER, LABEL_UNDETECTED, LABELS, RECOMMENDATIONS, classify_batch
+from .core.multileaf import LEAF_COLORS, analyze_roi
+from .core.pipeline import ANALYSIS_SIZE, DEFAULT_LESION_PARAMS, DEFAULT_SEG_PARAMS
+from .core.segmentation import segment_leaf
+
+SEGMENT_EVERY = 10        # segmentasi penuh tiap N bingkai sumber
+TARGET_FPS = 10.0         # bingkai dianalisis per detik video (batas atas)
+TRACK_MARGIN = 0.25       # jendela korelasi = bbox daun + 25% tiap sisi
+TRACK_SCALE = 2           # korelasi fase pada grayscale 1/2 ukuran analisis (DFT ~4× lebih murah)
+MIN_TRACK_RESPONSE = 0.1  # puncak korelasi fase di bawah ini → daun hilang, segmentasi ulang
+SMOOTHING = 0.3           # bobot bingkai baru pada EMA hasil
+COST_SMOOTHING = 0.2      # bobot bingkai baru pada EMA biaya analisis (penentu frame drop)
+VIDEO_FIELDNAMES = (('frame', 'time_s', 'mode', 'label', 'confidence', 'raw_label') + FEATURE_NAMES
+                    + ('latency_ms', 'dropped'))
+
+
+def open_capture(source):
+    """cv2.VideoCapture dari path file atau indeks kamera ('0', 1, ...)."""
+    is_device = isinstance(source, int) or str(source).isdigit()
+    cap = cv2.VideoCapture(int(source) if is_device else source)
+    if not cap.isOpened():
+        raise ValueError(f"Sumber video tidak dapat dibuka: {source}")
+    if is_device:
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # bingkai lama di buffer driver = latensi tambahan
+    return cap
+
+
+def _box_iou(a, b):
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    iw = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    ih = max(0, min(ay + ah, by + bh) - max(ay, by))
+    inter = iw * ih
+    union = aw * ah + bw * bh - inter
+    return inter / union if union > 0 else 0.0
+
+
+class LeafTracker:
+    """
+    Kontur daun per bingkai: segmentasi tiap `every` bingkai, di antaranya translasi ROI dari
+    cv2.phaseCorrelate. switched=True bila segmentasi menemukan daun lain.
+    """
+
+    def __init__(self, seg_params=None, every=SEGMENT_EVERY):
+        self.seg_params = {**DEFAULT_SEG_PARAMS, **(seg_params or {})}
+        self.every = max(1, every)
+        self.contour = None
+        self._base = None          # kontur hasil segmentasi terakhir
+        self._offset = np.zeros(2)  # pergeseran terakumulasi sejak segmentasi (x, y)
+        self._gray = None
+        self._last_segment = None
+        self.switched = False
+
+    def _track(self, gray, frame_shape):
+        h_img, w_img = frame_shape
+        x, y, w, h = (v // TRACK_SCALE for v in cv2.boundingRect(self.contour))
+        mx, my = int(w * TRACK_MARGIN), int(h * TRACK_MARGIN)
+        x0, y0 = max(0, x - mx), max(0, y - my)
+        x1, y1 = min(gray.shape[1], x + w + mx), min(gray.shape[0], y + h + my)
+        if x1 - x0 < 16 or y1 - y0 < 16:
+            return False
+        window = cv2.createHanningWindow((x1 - x0, y1 - y0), cv2.CV_32F)
+        (dx, dy), response = cv2.phaseCorrelate(np.float32(self._gray[y0:y1, x0:x1]),
+                                                np.float32(gray[y0:y1, x0:x1]), window)
+        if response < MIN_TRACK_RESPONSE:
+            return False
+        self._offset += (dx * TRACK_SCALE, dy * TRACK_SCALE)
+        contour = self._base + np.round(self._offset).astype(np.int32)
+        np.clip(contour[..., 0], 0, w_img - 1, out=contour[..., 0])
+        np.clip(contour[..., 1], 0, h_img - 1, out=contour[..., 1])
+        self.contour = contour
+        return True
+
+    def update(self, frame_rgb, index):
+        """Kontur daun pada bingkai sumber ke-index → (kontur atau None, 'segment' / 'track' / 'reacquire')."""
+        h_img, w_img = frame_rgb.shape[:2]
+        gray = cv2.resize(cv2.cvtColor(frame_rgb, cv2.COLOR_RGB2GRAY),
+                          (w_img // TRACK_SCALE, h_img // TRACK_SCALE), interpolation=cv2.INTER_AREA)
+        if self.contour is None or index - self._last_segment >= self.every:
+            mode = 'segment'
+        else:
+            mode = 'track' if self._track(gray, (h_img, w_img)) else 'reacquire'
+        self.switched = False
+        if mode != 'track':
+            previous = self.contour
+            _, self.contour, _ = segment_leaf(frame_rgb, draw_overlay=False, **self.seg_params)
+            self.switched = (previous is None or self.contour is None
+                             or _box_iou(cv2.boundingRect(previous), cv2.boundingRect(self.contour)) < 0.3)
+            self._base = self.contour
+            self._offset[:] = 0
+            self._last_segment = index
+        self._gray = gray
+        return self.contour, mode
+
+
+class ResultSmoother:
+    """
+    EMA antar bingkai: vektor fitur (FEATURE_ORDER) dan skor per label (confidence label
+    bingkai itu). Label terhalus = skor tertinggi; confidence = skornya, sehingga label yang
+    berkedip menghasilkan confidence lebih rendah. reset() saat tidak ada daun di bingkai.
+    """
+
+    def __init__(self, alpha=SMOOTHING):
+        self.alpha = alpha
+        self.features = None
+        self.scores = np.zeros(len(LABELS))
+
+    def reset(self):
+        self.features = None
+        self.scores[:] = 0
+
+    def update(self, features, code, confidence):
+        vector = np.array([features[k] for k in FEATURE_ORDER], dtype=np.float64)
+        vote = np.zeros(len(LABELS))
+        vote[code] = confidence
+        if self.features is None:
+            self.features, self.scores = vector, vote
+        else:
+            self.features += self.alpha * (vector - self.features)
+            self.scores += self.alpha * (vote - self.scores)
+        code = int(np.argmax(self.scores))
+        return dict(zip(FEATURE_ORDER, self.features.tolist())), code, float(self.scores[code])
+
+
+class VideoAnalyzer:
+    """Pelacak + analisis ROI + penghalusan untuk bingkai RGB berukuran analisis."""
+
+    def __init__(self, seg_params=None, lesion_params=None, every=SEGMENT_EVERY, smoothing=SMOOTHING):
+        self.tracker = LeafTracker(seg_params, every)
+        self.lesion_params = {**DEFAULT_LESION_PARAMS, **(lesion_params or {})}
+        self.smoother = ResultSmoother(smoothing)
+
+    def process(self, frame_rgb, index):
+        """
+        Mengembalikan dict: mode, contour, lesions, raw_label, features (terhalus), label,
+        confidence, recommendation. EMA di-reset saat berpindah ke daun lain; tanpa daun:
+        label Tidak Terdeteksi.
+        """
+        contour, mode = self.tracker.update(frame_rgb, index)
+        if contour is None or self.tracker.switched:
+            self.smoother.reset()
+        if contour is None:
+            return {'mode': mode, 'contour': None, 'lesions': None, 'raw_label': LABELS[LABEL_UNDETECTED],
+                    'features': None, 'label': LABELS[LABEL_UNDETECTED], 'confidence': CONFIDENCES[LABEL_UNDETECTED],
+                    'recommendation': RECOMMENDATIONS[LABEL_UNDETECTED]}
+        leaf = analyze_roi(frame_rgb, contour, self.lesion_params)
+        codes, _ = classify_batch(np.array([[leaf['features'][k] for k in FEATURE_ORDER]]))
+        raw = int(codes[0])
+        features, code, confidence = self.smoother.update(leaf['features'], raw, CONFIDENCES[raw])
+        return {'mode': mode, 'contour': contour, 'lesions': leaf['lesions'], 'raw_label': LABELS[raw],
+                'features': features, 'label': LABELS[code], 'confidence': confidence,
+                'recommendation': RECOMMENDATIONS[code]}
+
+
+def draw_frame(frame_rgb, result, fps):
+    """Overlay pratinjau: kontur daun (warna per label), lingkaran lesi, label & FPS."""
+    overlay = frame_rgb.copy()
+    if result['contour'] is not None:
+        color = LEAF_COLORS[LABELS.index(result['label'])]
+        cv2.drawContours(overlay, [result['contour']], -1, color, 2)
+        for cx, cy in zip(result['lesions']['cx'].astype(int).tolist(), result['lesions']['cy'].astype(int).tolist()):
+            cv2.circle(overlay, (cx, cy), 6, (255, 0, 0), 1)
+    # Font Hershey tidak memuat emoji → hanya teks label
+    text = f"{result['label'].split(' ', 1)[-1]} {result['confidence']:.0%}  {fps:.1f} FPS  [{result['mode']}]"
+    cv2.putText(overlay, text, (8, 22), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+    return overlay
+
+
+def run_video(source, seg_params=None, lesion_params=None, every=SEGMENT_EVERY, target_fps=TARGET_FPS,
+              max_frames=None, on_frame=None, show=False):
+    """
+    Analisis aliran video (path / indeks kamera / VideoCapture terbuka) sampai habis atau max_frames.
+    on_frame(row) dipanggil per bingkai yang dianalisis; mengembalikan laporan FPS & latensi.
+    """
+    cap = source if isinstance(source, cv2.VideoCapture) else open_capture(source)
+    source_fps = cap.get(cv2.CAP_PROP_FPS)
+    source_fps = source_fps if source_fps and math.isfinite(source_fps) and source_fps > 0 else 30.0
+    analyzer = VideoAnalyzer(seg_params, lesion_params, every)
+    min_step = max(1, round(source_fps / target_fps))
+    cost = 1.0 / target_fps  # EMA biaya analisis per bingkai (detik)
+    index = -1
+    dropped = 0
+    latencies = []
+    modes = {'segment': 0, 'track': 0, 'reacquire': 0}
+    t_start = time.perf_counter()
+    try:
+        while max_frames is None or len(latencies) < max_frames:
+            # Lompat ke bingkai "sekarang": selama analisis berlangsung, sumber langsung sudah maju
+            # cost × fps bingkai — bingkai itu di-grab (tanpa decode) lalu dibuang
+            step = max(min_step, math.ceil(cost * source_fps)) if index >= 0 else 1
+            skipped = 0
+            while skipped < step - 1 and cap.grab():
+                skipped += 1
+            ok, frame = cap.read()
+            if not ok:
+                break
+            index += skipped + 1
+            dropped += skipped
+
+            t0 = time.perf_counter()
+            # INTER_LINEAR: INTER_AREA dengan faktor pecahan (mis. 720 → 480) ~4 ms per bingkai
+            small = cv2.resize(frame, ANALYSIS_SIZE, interpolation=cv2.INTER_LINEAR)
+            frame_rgb = cv2.cvtColor(small, cv2.COLOR_BGR2RGB)
+            result = analyzer.process(frame_rgb, index)
+            latency = time.perf_counter() - t0
+            cost += COST_SMOOTHING * (latency - cost)
+            latencies.append(latency * 1000.0)
+            modes[result['mode']] += 1
+
+            if on_frame is not None:
+                row = {'frame': index, 'time_s': round(index / source_fps, 3), 'mode': result['mode'],
+                       'label': result['label'], 'confidence': round(result['confidence'], 4),
+                       'raw_label': result['raw_label'], 'latency_ms': round(latency * 1000.0, 2),
+                       'dropped': skipped}
+                row.update(result['features'] or {})
+                on_frame(row)
+            if show:
+                fps = len(latencies) / max(time.perf_counter() - t_start, 1e-9)
+                cv2.imshow('LeafHealthAI — video', cv2.cvtColor(draw_frame(frame_rgb, result, fps), cv2.COLOR_RGB2BGR))
+                if cv2.waitKey(1) & 0xFF == ord('q'):
+                    break
+    finally:
+        cap.release()
+        if show:
+            cv2.destroyAllWindows()
+
+    wall = time.perf_counter() - t_start
+    lat = np.array(latencies) if latencies else np.zeros(1)
+    return {
+        'frames': len(latencies),
+        'dropped': dropped,
+        'modes': modes,
+        'wall_s': wall,
+        'fps': len(latencies) / wall if wall > 0 else 0.0,
+        'stream_s': (index + 1) / source_fps,
+        'latency_ms': {'p50': float(np.percentile(lat, 50)), 'p95': float(np.percentile(lat, 95)),
+                       'max': float(lat.max())},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m src.video', description='LeafHealthAI — mode video / kamera')
+    parser.add_argument('source', help='File video atau indeks kamera (0, 1, ...)')
+    parser.add_argument('-o', '--output', help='File hasil per bingkai .csv / .jsonl (ditimpa tiap run)')
+    parser.add_argument('--every', type=int, default=SEGMENT_EVERY, help='Segmentasi penuh tiap N bingkai sumber')
+    parser.add_argument('--target-fps', type=float, default=TARGET_FPS,
+                        help='Maks. bingkai dianalisis per detik video; bingkai lain dibuang')
+    parser.add_argument('--max-frames', type=int, default=None, help='Berhenti setelah N bingkai dianalisis')
+    parser.add_argument('--show', action='store_true', help='Tampilkan pratinjau overlay (tekan q untuk keluar)')
+    for name, value in {**DEFAULT_SEG_PARAMS, **DEFAULT_LESION_PARAMS}.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, default=None, help=f"default: {value}")
+    args = parser.parse_args(argv)
+
+    if args.target_fps <= 0:
+        parser.error("--target-fps harus > 0")
+    seg_params = {k: getattr(args, k) for k in DEFAULT_SEG_PARAMS if getattr(args, k) is not None}
+    lesion_params = {k: getattr(args, k) for k in DEFAULT_LESION_PARAMS if getattr(args, k) is not None}
+
+    try:
+        cap = open_capture(args.source)
+    except ValueError as e:
+        parser.error(str(e))
+
+    writer = None
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        if os.path.exists(args.output):
+            os.remove(args.output)
+        writer = ResultWriter(args.output, 'jsonl' if args.output.endswith('.jsonl') else 'csv', VIDEO_FIELDNAMES)
+    try:
+        report = run_video(cap, seg_params, lesion_params, args.every, args.target_fps, args.max_frames,
+                           on_frame=writer.write if writer else None, show=args.show)
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        if writer is not None:
+            writer.close()
+
+    lat = report['latency_ms']
+    print(f"✓ {report['frames']} bingkai dianalisis ({report['dropped']} dibuang) dari {report['stream_s']:.1f} s video "
+          f"dalam {report['wall_s']:.1f} s: {report['fps']:.1f} FPS, latensi p50 {lat['p50']:.1f} ms  "
+          f"p95 {lat['p95']:.1f} ms  maks {lat['max']:.1f} ms")
+    print(f"  segmentasi {report['modes']['segment']}, dilacak {report['modes']['track']}, "
+          f"segmentasi ulang (daun hilang) {report['modes']['reacquire']}"
+          + (f" → {args.output}" if args.output else ''))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,305 @@
+# src/watch.py
+"""
+Mode watch-folder: foto baru di folder dianalisis otomatis lewat tahap berantrean berbatas.
+
+    python -m src.watch <dir> [-o data/processed/watch_<dir>.jsonl] [--interval 1.0]
+                        [--workers N] [--queue-size 16] [--once]
+"""
+import argparse
+import os
+import queue
+import sys
+import threading
+import time
+
+from .batch import BATCH_STAGES, FIELDNAMES, IMAGE_EXTS, PROCESSED_DIR, ResultWriter, load_done, store_key
+from .core.leaf_validation import check_leaf_image
+from .core.pipeline import ANALYSIS_SIZE, LeafPipeline, resize_for_analysis
+from .core.profiling import StageProfiler
+from .core.workspace import Workspace
+from .feature_store import DEFAULT_FEATURES, FeatureStore
+from .store import DEFAULT_STORE, ResultStore, encode_thumbnail, file_hash, overlay_thumbnail
+from .utils.helpers import load_image
+
+WATCH_FIELDNAMES = FIELDNAMES + ('latency_ms',)
+_STOP = object()  # penanda akhir aliran antar tahap
+
+
+def _scan(root):
+    """{path: ukuran} semua citra di bawah root."""
+    sizes = {}
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            if name.lower().endswith(IMAGE_EXTS):
+                path = os.path.join(dirpath, name)
+                try:
+                    sizes[path] = os.path.getsize(path)
+                except OSError:
+                    continue
+    return sizes
+
+
+def poll_new_files(root, interval=1.0, seen=None, once=False):
+    """
+    Generator path citra baru (urut) dengan polling. File dianggap selesai ditulis bila
+    ukurannya sama di dua pemindaian berturut-turut. once=True: berhenti setelah semua
+    file yang ada saat ini dihasilkan.
+    """
+    seen = set() if seen is None else seen
+    previous = {}
+    while True:
+        current = _scan(root)
+        stable = sorted(p for p, size in current.items() if p not in seen and previous.get(p) == size)
+        for path in stable:
+            seen.add(path)
+            yield path
+        if once and all(p in seen for p in current):
+            return
+        previous = current
+        time.sleep(interval)
+
+
+def inotify_new_files(root, interval=1.0, seen=None, once=False):
+    """
+    Seperti poll_new_files tetapi digerakkan event inotify: file dihasilkan saat selesai ditulis
+    (IN_CLOSE_WRITE) atau dipindah masuk (IN_MOVED_TO); subdirektori baru ikut dipantau.
+    Mengangkat ImportError bila paket opsional `inotify_simple` tidak tersedia.
+    """
+    from inotify_simple import INotify, flags
+
+    seen = set() if seen is None else seen
+    watcher = INotify()
+    mask = flags.CLOSE_WRITE | flags.MOVED_TO | flags.CREATE
+    wd_dirs = {}
+
+    def add_tree(top):
+        for dirpath, _, _ in os.walk(top):
+            wd_dirs[watcher.add_watch(dirpath, mask)] = dirpath
+
+    add_tree(root)
+    yield from poll_new_files(root, 0, seen, once=True)  # file yang sudah ada
+    if once:
+        return
+    while True:
+        for event in watcher.read(timeout=int(interval * 1000)):
+            directory = wd_dirs.get(event.wd)
+            if directory is None or not event.name:
+                continue
+            path = os.path.join(directory, event.name)
+            if event.mask & flags.ISDIR:
+                add_tree(path)
+                new = sorted(p for p in _scan(path) if p not in seen)  # folder dipindah masuk beserta isinya
+            elif event.mask & (flags.CLOSE_WRITE | flags.MOVED_TO) and path.lower().endswith(IMAGE_EXTS):
+                new = [path] if path not in seen else []
+            else:
+                continue
+            for p in new:
+                seen.add(p)
+                yield p
+
+
+def watch_files(root, interval=1.0, seen=None, once=False):
+    """inotify bila tersedia, selain itu polling."""
+    try:
+        import inotify_simple  # noqa: F401
+    except ImportError:
+        return poll_new_files(root, interval, seen, once)
+    return inotify_new_files(root, interval, seen, once)
+
+
+class Stage:
+    """
+    Satu tahap: `workers` thread mengambil item dari inq, memanggil fn(item) dan meneruskan
+    hasilnya ke outq (berbatas → backpressure). Item yang sudah error/selesai diteruskan apa
+    adanya (juga yang ditolak gerbang awal). _STOP diteruskan sekali setelah semua thread tahap ini berhenti.
+    """
+
+    def __init__(self, name, fn, inq, outq, workers=1):
+        self.name, self.fn, self.inq, self.outq = name, fn, inq, outq
+        self._alive = workers
+        self._lock = threading.Lock()
+        self.threads = [threading.Thread(target=self._loop, name=f"{name}-{i}", daemon=True) for i in range(workers)]
+        for t in self.threads:
+            t.start()
+
+    def _loop(self):
+        while True:
+            item = self.inq.get()
+            if item is _STOP:
+                self.inq.put(_STOP)  # bangunkan thread saudara
+                with self._lock:
+                    self._alive -= 1
+                    last = self._alive == 0
+                if last:
+                    self.outq.put(_STOP)
+                return
+            if not item['row'].get('error') and not item['row'].get('rejected') and 'result' not in item:
+                try:
+                    self.fn(item)
+                except Exception as e:
+                    item['row']['error'] = f"{self.name}: {e}"
+            self.outq.put(item)
+
+
+def decode_item(item, store=None, key=None):
+    """Hash file → cek arsip; bila belum ada, decode tereduksi + resize ke ukuran analisis."""
+    profiler = item['profiler']
+    if store is not None:
+        with profiler.stage('store'):
+            item['image_hash'] = file_hash(item['path'])
+            stored = store.get(item['image_hash'], key)
+        if stored is not None:
+            item['result'] = stored
+            item['row']['cached'] = 1
+            return
+    with profiler.stage('decode') as record:
+        image = profiler.add_output(record, load_image(item['path'], target_size=ANALYSIS_SIZE))
+    with profiler.stage('resize'):
+        item['image'] = resize_for_analysis(image)
+
+
+def make_validate(seg_params):
+    gate = {k: seg_params[k] for k in ('h_min', 'h_max', 's_min')}
+
+    def validate_item(item):
+        with item['profiler'].stage('validate'):
+            check = check_leaf_image(item['image'], **gate)
+        if not check['ok']:
+            item['row']['rejected'] = check['reason']
+            item.pop('image', None)
+    return validate_item
+
+
+def make_analyze(seg_params, lesion_params, store=None):
+    local = threading.local()  # satu Workspace per thread pipeline
+
+    def analyze_item(item):
+        if not hasattr(local, 'workspace'):
+            local.workspace = Workspace()
+        pipeline = LeafPipeline(seg_params, lesion_params, profiler=item['profiler'], workspace=local.workspace)
+        result = pipeline.run(item['image'])
+        if store is not None:
+            item['thumbnail'] = encode_thumbnail(overlay_thumbnail(item['image'], result['leaf_contour'],
+                                                                   result['lesions']))
+        # Mask menunjuk ke buffer workspace (ditimpa citra berikutnya) → hanya hasil ringkas yang diteruskan
+        item['result'] = {k: result[k] for k in ('features', 'label', 'confidence', 'lesions')}
+        item.pop('image', None)  # lepas piksel sebelum menunggu di antrean sink
+    return analyze_item
+
+
+class WatchPipeline:
+    """Rangkaian tahap watch-folder; sink berjalan di thread pemanggil (run)."""
+
+    def __init__(self, root, output, seg_params=None, lesion_params=None, workers=None,
+                 queue_size=16, interval=1.0, store_path=DEFAULT_STORE, features_dir=DEFAULT_FEATURES):
+        self.root = root
+        self.output = output
+        self.fmt = 'jsonl' if output.endswith('.jsonl') else 'csv'
+        self.interval = interval
+        self.pipeline = LeafPipeline(seg_params, lesion_params)
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.store = ResultStore(store_path) if store_path else None
+        # Dataset fitur butuh hash citra → hanya bersama arsip
+        self.features = FeatureStore(features_dir) if self.store is not None and features_dir else None
+        self.key = store_key(self.pipeline)
+        self.count = 0
+
+    def _produce(self, paths, decode_q):
+        try:
+            for path in paths:
+                item = {'path': path, 'detected': time.monotonic(), 'profiler': StageProfiler(),
+                        'row': {'image': os.path.relpath(path, self.root), 'cached': 0, 'rejected': ''}}
+                decode_q.put(item)  # blok bila antrean penuh
+        finally:
+            decode_q.put(_STOP)
+
+    def _finish_row(self, item):
+        row = item['row']
+        result = item.get('result')
+        if result is not None and not row.get('error'):
+            row['label'] = result['label']
+            row['confidence'] = float(result['confidence'])
+            for name, value in result['features'].items():
+                row[name] = int(value) if name == 'num_lesions' else float(value)
+            row['error'] = ''
+            if self.store is not None and not row['cached']:
+                self.store.put(item['image_hash'], self.key, result, source=row['image'],
+                               params={**self.pipeline.seg_params, **self.pipeline.lesion_params},
+                               thumbnail=item.get('thumbnail'))
+                if self.features is not None:
+                    # Foto datang satu-satu → flush per baris agar langsung terbaca
+                    self.features.append(result['features'], result['label'], result['confidence'],
+                                         item['image_hash'], self.key)
+                    self.features.flush()
+        row.setdefault('error', '')
+        row.update(item['profiler'].columns(BATCH_STAGES))
+        row['latency_ms'] = round((time.monotonic() - item['detected']) * 1000.0, 1)
+        return row
+
+    def run(self, once=False):
+        """Proses file baru sampai dihentikan (Ctrl+C) atau, dengan once=True, sampai folder habis."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.output)), exist_ok=True)
+        seen = {os.path.join(self.root, rel) for rel in load_done(self.output, self.fmt)}
+        paths = watch_files(self.root, self.interval, seen, once)
+
+        size = self.queue_size
+        decode_q, validate_q, analyze_q, sink_q = (queue.Queue(size) for _ in range(4))
+        threading.Thread(target=self._produce, args=(paths, decode_q), name="watch-detect", daemon=True).start()
+        Stage('decode', lambda item: decode_item(item, self.store, self.key), decode_q, validate_q,
+              workers=min(2, self.workers))
+        Stage('validate', make_validate(self.pipeline.seg_params), validate_q, analyze_q)
+        Stage('pipeline', make_analyze(self.pipeline.seg_params, self.pipeline.lesion_params, self.store),
+              analyze_q, sink_q, workers=self.workers)
+
+        with ResultWriter(self.output, self.fmt, WATCH_FIELDNAMES) as writer:
+            while True:
+                item = sink_q.get()
+                if item is _STOP:
+                    break
+                row = self._finish_row(item)
+                writer.write(row)
+                self.count += 1
+                if row['error'] or row['rejected']:
+                    status = row['error'] or f"ditolak: {row['rejected']}"
+                else:
+                    status = f"{row['label']} ({row['confidence']:.0%})"
+                print(f"[{self.count}] {row['image']}: {status} — {row['latency_ms']:.0f} ms", file=sys.stderr)
+        if self.store is not None:
+            self.store.close()
+        if self.features is not None:
+            self.features.close()
+        return self.count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m src.watch', description='LeafHealthAI — analisis watch-folder')
+    parser.add_argument('directory', help='Folder yang dipantau (rekursif)')
+    parser.add_argument('-o', '--output', help='File hasil .csv / .jsonl (default: data/processed/watch_<nama_dir>.jsonl)')
+    parser.add_argument('--interval', type=float, default=1.0, help='Interval pemindaian (detik)')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='Jumlah thread pipeline (default: jumlah core)')
+    parser.add_argument('--queue-size', type=int, default=16, help='Kapasitas tiap antrean antar tahap')
+    parser.add_argument('--once', action='store_true', help='Proses file yang ada lalu keluar')
+    parser.add_argument('--store', default=DEFAULT_STORE, help='Arsip hasil SQLite')
+    parser.add_argument('--no-store', action='store_true', help='Jangan baca/tulis arsip hasil')
+    parser.add_argument('--features', default=DEFAULT_FEATURES, help='Dataset fitur kolumnar untuk hasil baru')
+    parser.add_argument('--no-features', action='store_true', help='Jangan tambahkan hasil ke dataset fitur')
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.directory):
+        parser.error(f"Direktori tidak ditemukan: {args.directory}")
+    output = args.output or os.path.join(
+        PROCESSED_DIR, f"watch_{os.path.basename(os.path.normpath(args.directory))}.jsonl")
+    watcher = WatchPipeline(args.directory, output, workers=args.workers, queue_size=args.queue_size,
+                            interval=args.interval, store_path=None if args.no_store else args.store,
+                            features_dir=None if args.no_features else args.features)
+    try:
+        count = watcher.run(once=args.once)
+    except KeyboardInterrupt:
+        count = watcher.count
+    print(f"✓ {count} citra diproses → {output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
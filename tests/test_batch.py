@@ -0,0 +1,79 @@
+# tests/test_batch.py
+import csv
+import json
+
+import cv2
+
+from src.batch import FIELDNAMES, ResultWriter, _drop_error_rows, load_done, run_batch
+from src.store import ResultStore
+from src.utils.synthetic import make_leaf
+
+
+def test_resume_retries_error_rows(tmp_path):
+    for fmt in ('csv', 'jsonl'):
+        path = str(tmp_path / f"hasil.{fmt}")
+        with ResultWriter(path, fmt, FIELDNAMES) as writer:
+            writer.write({'image': 'ok.jpg', 'label': 'x', 'error': '', 'rejected': ''})
+            writer.write({'image': 'gelap.jpg', 'error': '', 'rejected': 'terlalu gelap'})
+            writer.write({'image': 'io.jpg', 'error': '[Errno 5] Input/output error', 'rejected': ''})
+        assert load_done(path, fmt) == {'ok.jpg', 'gelap.jpg'}
+
+        # Percobaan ulang yang berhasil ditambahkan setelah baris error → selesai
+        with ResultWriter(path, fmt, FIELDNAMES) as writer:
+            writer.write({'image': 'io.jpg', 'label': 'x', 'error': '', 'rejected': ''})
+        assert load_done(path, fmt) == {'ok.jpg', 'gelap.jpg', 'io.jpg'}
+
+
+def test_error_rows_dropped_before_retry(tmp_path):
+    for fmt in ('csv', 'jsonl'):
+        path = str(tmp_path / f"hasil.{fmt}")
+        with ResultWriter(path, fmt, FIELDNAMES) as writer:
+            writer.write({'image': 'ok.jpg', 'label': 'x', 'error': '', 'rejected': ''})
+            writer.write({'image': 'io.jpg', 'error': '[Errno 5] Input/output error', 'rejected': ''})
+        assert _drop_error_rows(path, fmt) == 1
+        assert _drop_error_rows(path, fmt) == 0
+        with ResultWriter(path, fmt, FIELDNAMES) as writer:
+            writer.write({'image': 'io.jpg', 'label': 'x', 'error': '', 'rejected': ''})
+        with open(path, newline='', encoding='utf-8') as f:
+            rows = [json.loads(line) for line in f] if fmt == 'jsonl' else list(csv.DictReader(f))
+        assert [row['image'] for row in rows] == ['ok.jpg', 'io.jpg']
+
+
+def test_resume_ignores_truncated_tail(tmp_path):
+    path = tmp_path / 'hasil.jsonl'
+    path.write_text(json.dumps({'image': 'ok.jpg', 'error': ''}) + '\n{"image": "pot', encoding='utf-8')
+    assert load_done(str(path), 'jsonl') == {'ok.jpg'}
+
+
+def test_workers_read_store_written_by_parent(tmp_path):
+    images = tmp_path / 'foto'
+    images.mkdir()
+    for seed in range(3):
+        cv2.imwrite(str(images / f'daun{seed}.png'), cv2.cvtColor(make_leaf(seed=seed)[0], cv2.COLOR_RGB2BGR))
+    store_path = str(tmp_path / 'results.sqlite')
+    output = str(tmp_path / 'hasil.csv')
+
+    assert run_batch(str(images), output, workers=2, store_path=store_path, features_dir=None) == 3
+    with ResultStore(store_path, readonly=True) as store:
+        assert len(store) == 3
+    assert run_batch(str(images), output, workers=2, resume=False, store_path=store_path, features_dir=None) == 3
+    with open(output, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    assert [row['cached'] for row in rows] == ['1'] * 3
+    assert all(not row['error'] for row in rows)
+
+
+def test_resume_leaves_one_row_per_retried_image(tmp_path):
+    images = tmp_path / 'foto'
+    images.mkdir()
+    for seed in range(2):
+        cv2.imwrite(str(images / f'daun{seed}.png'), cv2.cvtColor(make_leaf(seed=seed)[0], cv2.COLOR_RGB2BGR))
+    output = str(tmp_path / 'hasil.csv')
+    with ResultWriter(output, 'csv', FIELDNAMES) as writer:
+        writer.write({'image': 'daun0.png', 'error': 'galat sesaat', 'rejected': ''})
+
+    assert run_batch(str(images), output, workers=1, store_path=None) == 2
+    with open(output, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    assert sorted(row['image'] for row in rows) == ['daun0.png', 'daun1.png']
+    assert all(row['label'] and not row['error'] for row in rows)
@@ -0,0 +1,50 @@
+# tests/test_cache.py
+import numpy as np
+
+from src.core import pipeline as pipeline_module
+from src.core.cache import StageCache
+from src.core.pipeline import LeafPipeline
+from src.utils.synthetic import make_leaf
+
+
+def counted(monkeypatch, name):
+    calls = []
+    original = getattr(pipeline_module, name)
+
+    def wrapper(*args, **kwargs):
+        calls.append(name)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(pipeline_module, name, wrapper)
+    return calls
+
+
+def test_lesion_change_reuses_segmentation(monkeypatch):
+    segments = counted(monkeypatch, 'segment_leaf')
+    detects = counted(monkeypatch, 'detect_lesions')
+    image, _ = make_leaf(seed=6)
+    cache = StageCache()
+
+    first = LeafPipeline(cache=cache).run(image)
+    LeafPipeline(cache=cache).run(image)
+    assert (len(segments), len(detects)) == (1, 1)
+
+    wider = LeafPipeline(lesion_params={'hue_max': 45}, cache=cache).run(image)
+    assert (len(segments), len(detects)) == (1, 2)
+    assert wider['leaf_mask'] is first['leaf_mask']
+
+    LeafPipeline(seg_params={'s_min': 40}, cache=cache).run(image)
+    assert (len(segments), len(detects)) == (2, 3)
+    assert wider['features'] == LeafPipeline(lesion_params={'hue_max': 45}).run(image)['features']
+
+
+def test_lru_evicts_by_bytes():
+    cache = StageCache(max_bytes=250)
+    for key in 'abc':
+        cache.put(key, {'mask': np.zeros(100, dtype=np.uint8)})
+    assert 'a' not in cache and 'b' in cache and 'c' in cache
+    cache.get('b')
+    cache.put('d', np.zeros(100, dtype=np.uint8))
+    assert 'b' in cache and 'c' not in cache and cache.nbytes == 200
+    cache.put('besar', np.zeros(1000, dtype=np.uint8))
+    assert 'besar' not in cache
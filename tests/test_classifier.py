@@ -0,0 +1,35 @@
+# tests/test_classifier.py
+import itertools
+
+import numpy as np
+
+from src.core.classifier import LABELS, classify_batch, classify_condition, feature_matrix
+
+EPS = 1e-11
+
+
+def around(value):
+    return [value - EPS, value, value + EPS]
+
+
+def test_batch_matches_condition_at_thresholds():
+    features = [
+        {'median_hue': hue, 'entropy': entropy, 'lesion_area_ratio': ratio, 'num_lesions': n, 'avg_circularity': circ}
+        for hue, entropy, ratio, n, circ in itertools.product(
+            around(30.0), around(0.3), around(0.01), [0, 1], around(0.5))
+    ]
+    codes, confidence = classify_batch(feature_matrix(features))
+    expected = [classify_condition(f) for f in features]
+    assert [LABELS[c] for c in codes.tolist()] == [label for label, _, _ in expected]
+    assert np.allclose(confidence, [conf for _, conf, _ in expected])
+    assert len(set(codes.tolist())) == 3
+
+
+def test_thresholds_compared_in_float64():
+    f = {'median_hue': 10.0, 'entropy': 0.30000000001, 'lesion_area_ratio': 0.2, 'num_lesions': 3,
+         'avg_circularity': 0.3}
+    codes, _ = classify_batch(feature_matrix([f]))
+    assert LABELS[int(codes[0])] == classify_condition(f)[0] == LABELS[1]
+    # Matriks float32 (mis. FeatureStore): ambang tetap dibandingkan dalam float64
+    single = feature_matrix([f], dtype=np.float32)
+    assert classify_batch(single)[0].tolist() == classify_batch(single.astype(np.float64))[0].tolist()
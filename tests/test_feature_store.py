@@ -0,0 +1,83 @@
+# tests/test_feature_store.py
+import json
+import os
+
+import numpy as np
+import pytest
+
+from src.core.classifier import LABELS, classify_condition
+from src.feature_store import FeatureStore
+
+
+def features(k):
+    return {'median_hue': 10.0 + k, 'entropy': 0.5, 'lesion_area_ratio': 0.02 * k, 'num_lesions': k,
+            'avg_circularity': 0.3}
+
+
+def fill(directory, n=10, chunk_rows=4):
+    with FeatureStore(directory, chunk_rows=chunk_rows) as store:
+        for k in range(n):
+            label = classify_condition(features(k))[0]
+            store.append(features(k), label, 0.8, f'{k % 4:032x}', 'p1', f'2026-0{1 + k % 3}-15T10:00:00')
+        assert len(store) == 8          # 2 chunk penuh sudah tertulis, 2 baris masih di buffer
+    return FeatureStore(directory, readonly=True)
+
+
+def test_round_trip_select_and_summary(tmp_path):
+    store = fill(str(tmp_path))
+    assert len(store) == 10
+    assert store.column('num_lesions').tolist() == list(range(10))
+    assert np.allclose(store.column('lesion_area_ratio'), [0.02 * k for k in range(10)])
+
+    assert store.select(since='2026-02-01', until='2026-03-01').tolist() == [1, 4, 7]
+    assert store.select(min_ratio=0.1, max_ratio=0.14).tolist() == [5, 6, 7]
+    # image_hash berulang tiap 4 baris → baris terakhir per citra
+    assert store.select(latest=True).tolist() == [6, 7, 8, 9]
+    codes = store.column('label_code')
+    for name in LABELS:
+        assert store.select(label=name.split()[-1]).tolist() == np.flatnonzero(codes == LABELS.index(name)).tolist()
+
+    summary = store.summary(by='month')
+    assert [row['period'] for row in summary] == ['2026-01', '2026-02', '2026-03']
+    assert [row['count'] for row in summary] == [4, 3, 3]
+
+
+def test_reclassify_counts_changed_labels(tmp_path):
+    directory = str(tmp_path)
+    fill(directory)
+    assert FeatureStore(directory, readonly=True).reclassify(chunk_rows=3)[1] == 0
+
+    with FeatureStore(directory) as store:
+        store.append(features(9), LABELS[0], 0.1, 'f' * 32)   # label lama yang kini salah
+    store = FeatureStore(directory, readonly=True)
+    codes, changed = store.reclassify(chunk_rows=3)
+    assert changed == 1
+    assert codes.tolist()[-1] == LABELS.index(classify_condition(features(9))[0])
+
+
+def test_truncated_column_tail_ignored_and_trimmed(tmp_path):
+    directory = str(tmp_path)
+    fill(directory)
+    with open(os.path.join(directory, 'entropy.bin'), 'ab') as f:
+        f.write(b'\0\0')                 # tulis sebelumnya terpotong di tengah baris
+    assert len(FeatureStore(directory, readonly=True)) == 10
+    with FeatureStore(directory) as store:
+        store.append(features(1), LABELS[0], 0.5, 'a' * 32)
+    store = FeatureStore(directory, readonly=True)
+    assert len(store) == 11
+    assert os.path.getsize(os.path.join(directory, 'entropy.bin')) == 11 * 4
+    assert store.column('num_lesions')[-1] == 1
+
+
+def test_schema_mismatch_and_missing_dataset(tmp_path):
+    directory = str(tmp_path / 'features')
+    FeatureStore(directory).close()
+    path = os.path.join(directory, 'schema.json')
+    with open(path, encoding='utf-8') as f:
+        schema = json.load(f)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({**schema, 'version': 0}, f)
+    with pytest.raises(ValueError):
+        FeatureStore(directory)
+    with pytest.raises(FileNotFoundError):
+        FeatureStore(str(tmp_path / 'tidak_ada'), readonly=True)
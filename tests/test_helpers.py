@@ -0,0 +1,14 @@
+# tests/test_helpers.py
+import numpy as np
+
+from src.utils.helpers import make_gallery
+
+
+def test_gallery_without_crops_is_none():
+    assert make_gallery([]) is None
+
+
+def test_gallery_grid_shape():
+    crops = [np.full((40, 20, 3), i * 50, dtype=np.uint8) for i in range(4)]
+    gallery = make_gallery(crops, tile=100, cols=3)
+    assert gallery.shape == (200, 300, 3)
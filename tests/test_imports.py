@@ -0,0 +1,11 @@
+# tests/test_imports.py
+import pytest
+
+from benchmarks.check_imports import FORBIDDEN, HEADLESS_MODULES, probe
+
+
+@pytest.mark.parametrize('module', HEADLESS_MODULES)
+def test_headless_import_skips_gui_and_pdf_stack(module):
+    # Interpreter baru per modul: sys.modules proses pytest tidak ikut terhitung
+    _, modules = probe(module, runs=1)
+    assert not [m for m in FORBIDDEN if m in modules]
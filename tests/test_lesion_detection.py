@@ -0,0 +1,52 @@
+# tests/test_lesion_detection.py
+import cv2
+import numpy as np
+import pytest
+
+from src.core.lesion_detection import measure_lesions
+
+
+def reference(mask, min_area):
+    """Versi berbasis cv2.findContours pada seluruh mask (kontur luar, filter contourArea)."""
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    rows = []
+    for c in contours:
+        area = cv2.contourArea(c)
+        if area >= min_area:
+            rows.append((*cv2.boundingRect(c), np.float32(area), np.float32(cv2.arcLength(c, True))))
+    return sorted(rows)
+
+
+def random_mask(seed):
+    rng = np.random.default_rng(seed)
+    mask = np.zeros((240, 320), dtype=np.uint8)
+    for _ in range(25):
+        center = (int(rng.integers(0, 320)), int(rng.integers(0, 240)))
+        axes = (int(rng.integers(2, 30)), int(rng.integers(2, 30)))
+        cv2.ellipse(mask, center, axes, float(rng.uniform(0, 180)), 0, 360, 255, -1)
+    cv2.circle(mask, (160, 120), 12, 0, -1)   # lubang di dalam lesi
+    return mask
+
+
+@pytest.mark.parametrize('seed', range(10))
+@pytest.mark.parametrize('min_area', [0, 50, 150])
+def test_matches_find_contours(seed, min_area):
+    mask = random_mask(seed)
+    table = measure_lesions(mask, min_area)
+    rows = sorted(zip(*(table[k].tolist() for k in ('x', 'y', 'w', 'h', 'area', 'perimeter'))))
+    assert rows == reference(mask, min_area)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        circ = np.where(table['perimeter'] > 0, 4 * np.pi * table['area'] / table['perimeter'] ** 2, 0)
+    assert np.allclose(table['circularity'], circ, rtol=1e-5)
+
+
+def test_mean_hue_ignores_filled_holes():
+    mask = np.zeros((100, 100), dtype=np.uint8)
+    cv2.rectangle(mask, (20, 20), (79, 79), 255, -1)
+    mask[40:60, 40:60] = 0
+    hue = np.full(mask.shape, 10, dtype=np.uint8)
+    hue[40:60, 40:60] = 170
+    table = measure_lesions(mask, 150, hue)
+    assert len(table) == 1
+    assert table['mean_hue'][0] == 10
+    assert len(measure_lesions(np.zeros((50, 50), dtype=np.uint8))) == 0
@@ -0,0 +1,47 @@
+# tests/test_multileaf.py
+import cv2
+import numpy as np
+
+from src.core.classifier import LABELS, classify_condition
+from src.core.lesion_detection import detect_lesions
+from src.core.multileaf import analyze_leaves, draw_leaves
+from src.utils.synthetic import make_tray
+
+
+def _rows(lesions):
+    return sorted(zip(*(lesions[k].tolist() for k in ('x', 'y', 'w', 'h', 'area', 'perimeter'))))
+
+
+def test_roi_results_match_full_frame():
+    tray, truths = make_tray(1280, 960, cols=3, rows=2, seed=1)
+    result = analyze_leaves(tray, max_workers=3)
+    leaves = result['leaves']
+    assert len(leaves) == len(truths) == 6
+    assert [leaf['index'] for leaf in leaves] == list(range(1, 7))
+    assert all(a['leaf_area'] >= b['leaf_area'] for a, b in zip(leaves, leaves[1:]))
+
+    for leaf in leaves:
+        # Lesi per ROI = lesi pada bingkai penuh dengan mask daun yang sama
+        mask = np.zeros(tray.shape[:2], dtype=np.uint8)
+        cv2.drawContours(mask, [leaf['contour']], -1, 255, thickness=cv2.FILLED)
+        _, lesions, _ = detect_lesions(tray, mask, draw_overlay=False)
+        assert _rows(leaf['lesions']) == _rows(lesions)
+        assert leaf['label'] == classify_condition(leaf['features'])[0]
+    assert sum(len(leaf['lesions']) for leaf in leaves) > 0
+    assert len({leaf['label'] for leaf in leaves}) > 1
+
+    serial = analyze_leaves(tray, max_workers=1)
+    assert [leaf['label'] for leaf in serial['leaves']] == [leaf['label'] for leaf in leaves]
+    assert serial['aggregate'] == result['aggregate']
+
+
+def test_aggregate_counts_and_overlay():
+    tray, _ = make_tray(1280, 960, cols=3, rows=2, seed=2)
+    result = analyze_leaves(tray)
+    aggregate = result['aggregate']
+    assert aggregate['n_leaves'] == 6
+    assert sum(aggregate['label_counts'].values()) == 6
+    assert aggregate['label'] in LABELS
+    assert aggregate['num_lesions'] == sum(len(leaf['lesions']) for leaf in result['leaves'])
+    overlay = draw_leaves(tray, result)
+    assert overlay.shape == tray.shape and not np.array_equal(overlay, tray)
@@ -0,0 +1,40 @@
+# tests/test_pipeline.py
+import cv2
+import numpy as np
+
+from src.core.classifier import classify_condition
+from src.core.feature_extraction import extract_features
+from src.core.lesion_detection import detect_lesions
+from src.core.pipeline import LeafPipeline, analyze_leaf
+from src.core.segmentation import segment_leaf
+from src.utils.synthetic import make_leaf
+
+
+def test_pipeline_matches_independent_calls():
+    image, _ = make_leaf(seed=4, irregular=True)
+    leaf_mask, leaf_contour, _ = segment_leaf(image)
+    lesion_mask, lesions, _ = detect_lesions(image, leaf_mask)
+    features = extract_features(image, leaf_mask, lesion_mask, lesions)
+    label, confidence, _ = classify_condition(features)
+
+    result = analyze_leaf(image, draw_overlays=True)
+    assert np.array_equal(result['leaf_mask'], leaf_mask)
+    assert np.array_equal(result['lesion_mask'], lesion_mask)
+    assert result['lesions'].tobytes() == lesions.tobytes()
+    assert result['features'] == features
+    assert (result['label'], result['confidence']) == (label, confidence)
+    assert result['leaf_overlay'] is not None and result['lesion_overlay'] is not None
+
+
+def test_hsv_converted_once(monkeypatch):
+    calls = []
+    convert = cv2.cvtColor
+
+    def counting(src, code, *args, **kwargs):
+        calls.append(code)
+        return convert(src, code, *args, **kwargs)
+
+    monkeypatch.setattr(cv2, 'cvtColor', counting)
+    result = LeafPipeline().run(make_leaf(seed=5)[0])
+    assert calls.count(cv2.COLOR_RGB2HSV) == 1
+    assert result['leaf_overlay'] is None
@@ -0,0 +1,109 @@
+# tests/test_preview.py
+import numpy as np
+import pytest
+from PIL import ImageTk
+
+from src.gui.preview import SIZES_PER_STAGE, PreviewRenderer, fit_image
+
+
+class FakeRoot:
+    def __init__(self):
+        self.pending = []
+
+    def after(self, ms, fn):
+        self.pending.append(fn)
+        return len(self.pending)
+
+    def after_cancel(self, job):
+        pass
+
+
+class FakeCanvas:
+    def __init__(self, size):
+        self.size = size
+        self.image = None
+        self.drawn = 0
+
+    def bind(self, event, fn):
+        self.on_configure = fn
+
+    def winfo_width(self):
+        return self.size[0]
+
+    def winfo_height(self):
+        return self.size[1]
+
+    def delete(self, tag):
+        self.image = None
+
+    def create_image(self, x, y, anchor, image):
+        self.drawn += 1
+
+
+class FakePhoto:
+    created = 0
+
+    def __init__(self, img):
+        FakePhoto.created += 1
+        self.w, self.h = img.size
+
+    def width(self):
+        return self.w
+
+    def height(self):
+        return self.h
+
+
+@pytest.fixture
+def renderer(monkeypatch):
+    monkeypatch.setattr(ImageTk, 'PhotoImage', FakePhoto)
+    FakePhoto.created = 0
+    root, canvas = FakeRoot(), FakeCanvas((400, 300))
+    r = PreviewRenderer(root, [canvas])
+    yield r, root, canvas
+    r._executor.shutdown()
+
+
+def run_pending(r, root):
+    r._executor.submit(lambda: None).result()   # worker tunggal: resize sebelumnya sudah selesai
+    while root.pending:
+        root.pending.pop(0)()
+        r._executor.submit(lambda: None).result()
+
+
+def test_fit_image_keeps_aspect():
+    img = np.zeros((480, 640, 3), dtype=np.uint8)
+    assert fit_image(img, (320, 320)).shape == (240, 320, 3)
+    assert fit_image(img, (1280, 960)).shape == (960, 1280, 3)
+    assert fit_image(img, (640, 480)) is img
+
+
+def test_photo_cached_per_canvas_size(renderer):
+    r, root, canvas = renderer
+    r.show(0, np.zeros((480, 640, 3), dtype=np.uint8))
+    run_pending(r, root)
+    assert FakePhoto.created == 1 and canvas.drawn == 1
+    assert canvas.image.width() == 400
+
+    canvas.size = (200, 150)
+    canvas.on_configure(None)
+    run_pending(r, root)
+    canvas.size = (400, 300)
+    canvas.on_configure(None)
+    run_pending(r, root)
+    assert FakePhoto.created == 2   # ukuran 400x300 diambil dari cache
+    assert canvas.drawn == 3 and canvas.image.width() == 400
+
+    for k in range(SIZES_PER_STAGE + 1):
+        canvas.size = (100 + 10 * k, 100)
+        canvas.on_configure(None)
+        run_pending(r, root)
+    assert len(r.cache[0]) == SIZES_PER_STAGE
+
+
+def test_stale_resize_is_dropped(renderer):
+    r, root, canvas = renderer
+    r.show(0, np.zeros((480, 640, 3), dtype=np.uint8))
+    r.show(0, np.full((240, 320, 3), 255, dtype=np.uint8))
+    run_pending(r, root)
+    assert FakePhoto.created == 1 and canvas.drawn == 1
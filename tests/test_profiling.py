@@ -0,0 +1,33 @@
+# tests/test_profiling.py
+import threading
+
+import numpy as np
+
+from src.core.profiling import StageProfiler, stage_columns
+from src.gui.preview import PreviewRenderer
+
+
+def test_stages_from_several_threads_are_summed():
+    profiler = StageProfiler()
+
+    def work():
+        for _ in range(500):
+            with profiler.stage('display') as record:
+                record['bytes'] += 1
+            profiler.summary()
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert profiler.snapshot()['display']['bytes'] == 8 * 500
+    assert set(profiler.columns()) == set(stage_columns())
+
+
+def test_preview_resize_recorded_as_display():
+    profiler = StageProfiler()
+    thumb = PreviewRenderer._fit(profiler, np.zeros((960, 1280, 3), dtype=np.uint8), (320, 240))
+    assert thumb.shape == (240, 320, 3)
+    assert profiler.snapshot()['display']['ms'] > 0
+    assert PreviewRenderer._fit(None, thumb, (320, 240)) is thumb
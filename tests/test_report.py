@@ -0,0 +1,50 @@
+# tests/test_report.py
+import io
+import re
+
+import cv2
+import pytest
+from reportlab import rl_config
+
+from src.core.pipeline import LeafPipeline
+from src import report
+from src.report import build_bulk_report, build_report
+from src.utils.synthetic import make_leaf
+
+
+def diagnosis():
+    image, _ = make_leaf(seed=2)
+    result = LeafPipeline().run(image)
+    return image, {k: result[k] for k in ('label', 'confidence', 'recommendation', 'features')}
+
+
+def test_single_report_binary_streams_without_global_change():
+    image, diag = diagnosis()
+    before = rl_config.useA85
+    pdf = build_report(io.BytesIO(), diag, image).getvalue()
+    assert pdf.startswith(b'%PDF') and b'/DCTDecode' in pdf
+    assert b'/ASCII85Decode' not in pdf
+    assert rl_config.useA85 == before
+
+
+def test_a85_setting_restored_on_error(monkeypatch):
+    def fail(c, diagnosis, image=None):
+        raise RuntimeError('gagal menggambar')
+
+    monkeypatch.setattr(report, 'draw_diagnosis_page', fail)
+    before = rl_config.useA85
+    with pytest.raises(RuntimeError):
+        build_report(io.BytesIO(), {})
+    assert rl_config.useA85 == before
+
+
+def test_bulk_report_one_page_per_row(tmp_path):
+    image, diag = diagnosis()
+    cv2.imwrite(str(tmp_path / 'daun.jpg'), cv2.cvtColor(image, cv2.COLOR_RGB2BGR))
+    rows = [{'image': 'daun.jpg', 'label': diag['label'], 'confidence': diag['confidence'], 'error': '',
+             'rejected': '', **diag['features']}] * 3
+    output = str(tmp_path / 'laporan.pdf')
+    build_bulk_report(rows, output, root=str(tmp_path))
+    with open(output, 'rb') as f:
+        pdf = f.read()
+    assert len(re.findall(rb'/Type /Page\b(?!s)', pdf)) == 4   # ringkasan + 3 halaman diagnosa
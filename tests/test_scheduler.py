@@ -0,0 +1,53 @@
+# tests/test_scheduler.py
+import threading
+
+from src.gui.scheduler import LatestWinsScheduler
+
+
+def test_latest_request_wins():
+    started, release, idle = threading.Event(), threading.Event(), threading.Event()
+    finished, cancelled = [], []
+
+    def run(job, token):
+        if job == 'a':
+            started.set()
+            release.wait(5)
+        try:
+            token.check()
+        except Exception:
+            cancelled.append(job)
+            raise
+        finished.append(job)
+
+    scheduler = LatestWinsScheduler(run, on_idle=idle.set)
+    first = scheduler.submit('a')
+    assert started.wait(5)
+    scheduler.submit('b')           # digantikan sebelum sempat berjalan
+    last = scheduler.submit('c')
+    assert first.cancelled and not last.cancelled
+    release.set()
+    assert idle.wait(5)
+    assert finished == ['c'] and cancelled == ['a']
+    assert not scheduler.busy
+
+
+def test_cancel_drops_pending_job():
+    started, release, idle = threading.Event(), threading.Event(), threading.Event()
+    ran = []
+
+    def run(job, token):
+        ran.append(job)
+        if job == 'a':
+            started.set()
+            release.wait(5)
+        token.check()
+
+    scheduler = LatestWinsScheduler(run, on_idle=idle.set)
+    token = scheduler.submit('a')
+    assert started.wait(5)
+    scheduler.submit('b')
+    scheduler.cancel()
+    assert token.cancelled
+    release.set()
+    assert idle.wait(5)
+    assert ran == ['a']
@@ -0,0 +1,100 @@
+# tests/test_server.py
+import http.client
+import json
+import threading
+
+import cv2
+import pytest
+
+from src.server import MAX_PARTS, DiagnosisServer, _multipart_file, main
+from src.utils.synthetic import make_leaf
+
+BOUNDARY = 'xYz123'
+CONTENT_TYPE = f'multipart/form-data; boundary={BOUNDARY}'
+
+
+def multipart(*parts):
+    body = b''
+    for head, payload in parts:
+        body += f'--{BOUNDARY}\r\n'.encode() + head + b'\r\n\r\n' + payload + b'\r\n'
+    return body + f'--{BOUNDARY}--\r\n'.encode()
+
+
+def field(name, payload, filename=None):
+    head = f'Content-Disposition: form-data; name="{name}"'
+    if filename:
+        head += f'; filename="{filename}"\r\nContent-Type: image/png'
+    return head.encode(), payload
+
+
+def test_multipart_picks_image_field_or_first_file():
+    body = multipart(field('catatan', b'daun 1'), field('image', b'\x89PNG\r\n\r\ndata', 'a.png'))
+    assert _multipart_file(body, CONTENT_TYPE) == b'\x89PNG\r\n\r\ndata'
+    body = multipart(field('catatan', b'daun 1'), field('foto', b'abc', 'a.png'))
+    assert _multipart_file(body, CONTENT_TYPE) == b'abc'
+    assert _multipart_file(multipart(field('catatan', b'x')), CONTENT_TYPE) is None
+
+
+@pytest.mark.parametrize('body, content_type', [
+    (multipart(field('image', b'abc')), 'multipart/form-data'),                   # tanpa boundary
+    (b'bukan multipart', CONTENT_TYPE),
+    (multipart(field('image', b'abc'))[:-12], CONTENT_TYPE),                      # tanpa penutup
+    (multipart((b'X-Header: 1', b'abc')), CONTENT_TYPE),                           # tanpa Content-Disposition
+    (multipart(*[field(f'f{i}', b'x') for i in range(MAX_PARTS + 1)]), CONTENT_TYPE),
+])
+def test_malformed_multipart_rejected(body, content_type):
+    with pytest.raises(ValueError):
+        _multipart_file(body, content_type)
+
+
+@pytest.fixture(scope='module')
+def server():
+    srv = DiagnosisServer(('127.0.0.1', 0), workers=1)
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def post(server, body, headers):
+    conn = http.client.HTTPConnection(*server.server_address, timeout=30)
+    try:
+        conn.request('POST', '/analyze', body=body, headers=headers)
+        response = conn.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        conn.close()
+
+
+def test_analyze_multipart_upload(server):
+    ok, png = cv2.imencode('.png', cv2.cvtColor(make_leaf(seed=1)[0], cv2.COLOR_RGB2BGR))
+    status, result = post(server, multipart(field('image', png.tobytes(), 'daun.png')),
+                          {'Content-Type': CONTENT_TYPE})
+    assert status == 200
+    assert result['label'] and set(result['features']) >= {'median_hue', 'num_lesions'}
+
+
+def test_bad_requests_get_400_not_decoded(server):
+    received = server.metrics.snapshot(workers=1, queue_depth=0, batches_in_flight=0)['received']
+    status, result = post(server, multipart(field('image', b'abc'))[:-12], {'Content-Type': CONTENT_TYPE})
+    assert status == 400 and 'penutup' in result['error']
+    status, _ = post(server, b'abc', {'Content-Length': 'tiga'})
+    assert status == 400
+    assert server.metrics.snapshot(workers=1, queue_depth=0, batches_in_flight=0)['received'] == received
+
+
+def test_default_host_is_loopback(monkeypatch):
+    seen = {}
+
+    class Stop(Exception):
+        pass
+
+    def fake_server(address, *args):
+        seen['address'] = address
+        raise Stop
+
+    monkeypatch.setattr('src.server.DiagnosisServer', fake_server)
+    with pytest.raises(Stop):
+        main([])
+    assert seen['address'][0] == '127.0.0.1'
@@ -0,0 +1,36 @@
+# tests/test_store.py
+import numpy as np
+
+from src.core.pipeline import LeafPipeline
+from src.store import ResultStore, decode_thumbnail, encode_thumbnail, overlay_thumbnail, param_hash
+from src.utils.synthetic import make_leaf
+
+
+def test_put_get_query_round_trip(tmp_path):
+    image, _ = make_leaf(seed=3)
+    pipeline = LeafPipeline()
+    result = pipeline.run(image)
+    assert len(result['lesions']) > 0
+    key = param_hash(pipeline.seg_params, pipeline.lesion_params)
+    thumb = encode_thumbnail(overlay_thumbnail(image, result['leaf_contour'], result['lesions']))
+
+    path = str(tmp_path / 'results.sqlite')
+    with ResultStore(path) as store:
+        store.put('a' * 32, key, result, source='daun.jpg', params={'h_min': 35}, thumbnail=thumb)
+        assert ('a' * 32, key) in store and len(store) == 1
+    with ResultStore(path, readonly=True) as store:
+        stored = store.get('a' * 32, key)
+        assert store.get('b' * 32, key) is None
+        rows = store.query(label=result['label'])
+        assert store.query(min_ratio=result['features']['lesion_area_ratio'] + 0.1) == []
+
+    assert stored['label'] == result['label'] and stored['source'] == 'daun.jpg'
+    assert stored['params'] == {'h_min': 35}
+    for name, value in result['features'].items():
+        assert stored['features'][name] == value
+    assert stored['lesions'].dtype == result['lesions'].dtype
+    assert stored['lesions'].tobytes() == result['lesions'].tobytes()
+    decoded = decode_thumbnail(stored['thumbnail'])
+    assert decoded.shape == (180, 240, 3) and decoded.dtype == np.uint8
+    assert [row['image_hash'] for row in rows] == ['a' * 32]
+    assert rows[0]['num_lesions'] == len(result['lesions'])
@@ -0,0 +1,56 @@
+# tests/test_tiled.py
+import tracemalloc
+
+import cv2
+import numpy as np
+import pytest
+
+from src.core.tiled import analyze_leaf_highres
+
+LESION_COLOR = (120, 60, 20)   # Hue ~10 → di dalam rentang lesi default 0–40
+
+
+def big_leaf(width=4000, height=6000, spacing=150, radius=14):
+    """Daun elips hijau resolusi tinggi dengan grid bercak kecil (banyak yang melintasi batas tile)."""
+    img = np.full((height, width, 3), 200, dtype=np.uint8)
+    cv2.ellipse(img, (width // 2, height // 2), (width * 11 // 40, height * 13 // 30), 0, 0, 360, (40, 140, 40), -1)
+    for y in range(height // 6, height * 5 // 6, spacing):
+        for x in range(width * 2 // 5, width * 3 // 5, spacing):
+            cv2.circle(img, (x, y), radius, LESION_COLOR, -1)
+    return img
+
+
+def _rows(lesions):
+    return sorted(zip(*(lesions[k].tolist() for k in ('x', 'y', 'w', 'h', 'area', 'perimeter', 'mean_hue'))))
+
+
+@pytest.mark.parametrize('tile_size', [97, 256])
+def test_seams_match_single_tile(tile_size):
+    img = big_leaf(1200, 1800, spacing=61, radius=9)
+    # Cincin lesi dengan titik di lubangnya, melintasi beberapa batas tile: titik tidak dihitung
+    for cx, cy in ((600, 900), (512, 768), (700, 1100)):
+        cv2.circle(img, (cx, cy), 80, LESION_COLOR, 18)
+        cv2.circle(img, (cx, cy), 20, LESION_COLOR, -1)
+
+    single = analyze_leaf_highres(img, tile_size=4096, max_workers=1)
+    tiled = analyze_leaf_highres(img, tile_size=tile_size, max_workers=2)
+    assert _rows(tiled['lesions']) == _rows(single['lesions'])
+    for name in ('median_hue', 'entropy', 'num_lesions', 'avg_circularity'):
+        assert tiled['features'][name] == single['features'][name]
+    # Rasterisasi kontur daun per tile bisa berbeda beberapa piksel di tepi daun
+    assert tiled['features']['lesion_area_ratio'] == pytest.approx(single['features']['lesion_area_ratio'], rel=1e-4)
+    assert tiled['label'] == single['label']
+
+
+def test_peak_memory_bounded_by_tile():
+    img = big_leaf()
+    tracemalloc.start()
+    try:
+        result = analyze_leaf_highres(img, tile_size=512, max_workers=1)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    x0, y0, x1, y1 = result['leaf_bbox']
+    assert result['features']['num_lesions'] > 100
+    # Lebih kecil dari setengah satu mask uint8 seukuran bbox daun (versi full-frame butuh ~4 B/piksel)
+    assert peak < (x1 - x0) * (y1 - y0) / 2
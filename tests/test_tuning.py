@@ -0,0 +1,44 @@
+# tests/test_tuning.py
+import itertools
+
+import cv2
+import numpy as np
+
+from src.core.pipeline import ANALYSIS_SIZE, LeafPipeline
+from src.tuning import PARAM_GRID, _evaluate_shard, label_key, split_params
+from src.utils.helpers import load_image
+
+
+def leaf(lesions):
+    """Daun elips hijau 640×480; lesions = list (pusat, radius, warna RGB)."""
+    rng = np.random.default_rng(0)
+    img = np.full((ANALYSIS_SIZE[1], ANALYSIS_SIZE[0], 3), 210, dtype=np.uint8)
+    cv2.ellipse(img, (320, 240), (260, 180), 0, 0, 360, (40, 140, 40), -1)
+    for center, radius, color in lesions:
+        cv2.circle(img, center, radius, color, -1)
+    noise = rng.integers(-12, 13, img.shape)
+    return np.clip(img.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+
+def test_shard_matches_full_pipeline(tmp_path):
+    images = [
+        leaf([((200, 200), 40, (90, 50, 20)), ((420, 260), 25, (120, 80, 30)), ((300, 330), 8, (100, 40, 10))]),
+        leaf([((320, 240), 60, (150, 70, 60)), ((180, 180), 12, (140, 100, 30))]),
+        leaf([]),
+    ]
+    paths = []
+    for k, img in enumerate(images):
+        path = str(tmp_path / f'leaf{k}.png')
+        cv2.imwrite(path, cv2.cvtColor(img, cv2.COLOR_RGB2BGR))
+        paths.append(path)
+
+    grid = {**PARAM_GRID, 'h_min': [35], 'h_max': [85, 95], 's_min': [50]}
+    names = list(grid)
+    candidates = [dict(zip(names, v)) for v in itertools.product(*(grid[n] for n in names))]
+    candidates.append({**candidates[0], 'hue_min': 30, 'hue_max': 20})   # jendela terbalik → kosong
+
+    preds = _evaluate_shard(paths, candidates)
+    loaded = [load_image(p) for p in paths]
+    expected = [[label_key(LeafPipeline(*split_params(c)).run(img)['label']) for img in loaded] for c in candidates]
+    assert preds == expected
+    assert len({p for row in preds for p in row}) > 1
@@ -0,0 +1,39 @@
+# tests/test_video.py
+import csv
+
+import pytest
+
+from src import video
+from src.utils.synthetic import write_leaf_video
+
+
+@pytest.fixture(scope='module')
+def clip(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('video') / 'daun.avi')
+    write_leaf_video(path, n_frames=40, width=640, height=480, n_leaves=3, speed=12)
+    return path
+
+
+def test_run_video_tracks_and_writes_rows(clip, tmp_path):
+    output = tmp_path / 'bingkai.csv'
+    assert video.main([clip, '-o', str(output), '--target-fps', '1000', '--every', '5']) == 0
+    with open(output, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 40
+    assert {row['mode'] for row in rows} >= {'segment', 'track'}
+
+
+def test_unopenable_source_is_usage_error(tmp_path, capsys):
+    with pytest.raises(SystemExit) as exc:
+        video.main([str(tmp_path / 'tidak_ada.avi')])
+    assert exc.value.code == 2
+    assert 'tidak dapat dibuka' in capsys.readouterr().err
+
+
+def test_processing_errors_propagate(clip, monkeypatch):
+    def fail(self, frame_rgb, index):
+        raise ValueError('galat di tengah aliran')
+
+    monkeypatch.setattr(video.VideoAnalyzer, 'process', fail)
+    with pytest.raises(ValueError, match='galat di tengah aliran'):
+        video.main([clip])
@@ -0,0 +1,52 @@
+# tests/test_watch.py
+import json
+
+import cv2
+import numpy as np
+
+from src.feature_store import FeatureStore
+from src.store import ResultStore
+from src.watch import WatchPipeline, poll_new_files
+from src.utils.synthetic import make_leaf
+
+
+def write_images(folder):
+    (folder / 'sub').mkdir(parents=True)
+    for seed in range(2):
+        cv2.imwrite(str(folder / f'daun{seed}.png'), cv2.cvtColor(make_leaf(seed=seed)[0], cv2.COLOR_RGB2BGR))
+    cv2.imwrite(str(folder / 'sub' / 'daun2.png'), cv2.cvtColor(make_leaf(seed=2)[0], cv2.COLOR_RGB2BGR))
+    cv2.imwrite(str(folder / 'kosong.png'), np.full((480, 640, 3), 128, dtype=np.uint8))
+    (folder / 'catatan.txt').write_text('bukan citra')
+
+
+def test_poll_once_yields_existing_images(tmp_path):
+    write_images(tmp_path)
+    seen = {str(tmp_path / 'daun0.png')}
+    paths = list(poll_new_files(str(tmp_path), interval=0, seen=seen, once=True))
+    assert paths == sorted(str(tmp_path / p) for p in ('daun1.png', 'kosong.png', 'sub/daun2.png'))
+
+
+def test_watch_once_writes_rows_store_and_features(tmp_path):
+    folder = tmp_path / 'foto'
+    write_images(folder)
+    output = str(tmp_path / 'hasil.jsonl')
+    store_path = str(tmp_path / 'results.sqlite')
+    features_dir = str(tmp_path / 'features')
+
+    watcher = WatchPipeline(str(folder), output, workers=2, interval=0, store_path=store_path,
+                            features_dir=features_dir)
+    assert watcher.run(once=True) == 4
+    with open(output, encoding='utf-8') as f:
+        rows = {row['image']: row for row in map(json.loads, f)}
+    assert set(rows) == {'daun0.png', 'daun1.png', 'kosong.png', 'sub/daun2.png'}
+    assert rows['kosong.png']['rejected'] and not rows['kosong.png'].get('label')
+    leaves = [rows[name] for name in ('daun0.png', 'daun1.png', 'sub/daun2.png')]
+    assert all(row['label'] and not row['error'] and row['latency_ms'] > 0 for row in leaves)
+    with ResultStore(store_path, readonly=True) as store:
+        assert len(store) == 3
+    with FeatureStore(features_dir, readonly=True) as features:
+        assert len(features) == 3
+
+    # Jalan ulang: file yang sudah tercatat di output dilewati
+    again = WatchPipeline(str(folder), output, interval=0, store_path=store_path, features_dir=features_dir)
+    assert again.run(once=True) == 0
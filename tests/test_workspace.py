@@ -0,0 +1,40 @@
+# tests/test_workspace.py
+import numpy as np
+import pytest
+
+from src.core.cache import StageCache
+from src.core.pipeline import LeafPipeline
+from src.core.workspace import Workspace
+from src.utils.synthetic import make_leaf
+
+
+def test_results_match_and_buffers_reused():
+    workspace = Workspace()
+    pipeline = LeafPipeline(workspace=workspace, draw_overlays=True)
+    hsv_buffers, counts = [], []
+    for seed, size in ((0, (640, 480)), (1, (640, 480)), (2, (500, 400))):
+        image, _ = make_leaf(*size, seed=seed, irregular=True)
+        expected = LeafPipeline(draw_overlays=True).run(image)
+        result = pipeline.run(image)
+        for name in ('hsv', 'leaf_mask', 'lesion_mask', 'leaf_overlay', 'lesion_overlay'):
+            assert np.array_equal(result[name], expected[name]), name
+        assert result['lesions'].tobytes() == expected['lesions'].tobytes()
+        assert (result['features'], result['label']) == (expected['features'], expected['label'])
+        hsv_buffers.append(result['hsv'])
+        counts.append(len(workspace))
+    assert hsv_buffers[0] is hsv_buffers[1]          # ukuran sama → buffer dipakai ulang
+    assert hsv_buffers[2] is not hsv_buffers[1]      # ukuran berubah → dialokasikan ulang
+    assert counts[0] == counts[1] == counts[2]       # tidak ada buffer baru per citra
+
+
+def test_region_only_grows():
+    workspace = Workspace()
+    big = workspace.region('roi', (40, 30))
+    small = workspace.region('roi', (10, 20))
+    assert small.shape == (10, 20) and np.shares_memory(big, small)
+    assert workspace.nbytes == 40 * 30
+
+
+def test_cache_and_workspace_are_exclusive():
+    with pytest.raises(ValueError):
+        LeafPipeline(cache=StageCache(), workspace=Workspace())